@@ -42,6 +42,21 @@ import asyncio
 import aiohttp
 import openpyxl
 import io
+import contextlib
+import contextvars
+import heapq
+import itertools
+import collections
+import bisect
+import hashlib
+import math
+
+try:
+    import season_matrix  # Needs NumPy - analytics fall back to SQL without it
+except ImportError:
+    season_matrix = None
+
+import snapshot_checks
 
 # ============================================================
 # LOGGING SYSTEM
@@ -85,6 +100,7 @@ FALLBACK_DAYS = 6  # Days to fallback when data is empty
 
 # Discord ID -> Call of Stats Account ID mapping
 # For members who may not have numeric roles in server
+# Only seeds the accounts table on first run - edit live with !registry
 DISCORD_TO_ACCOUNT_ID = {
     1244330800019804180: "7979635",  # Havi
 }
@@ -92,7 +108,7 @@ DISCORD_TO_ACCOUNT_ID = {
 # ============================================================
 # USERNAME LOOKUP (Map Discord usernames to Discord IDs)
 # ============================================================
-# Hardcoded mapping - add your members here
+# Only seeds the accounts table on first run - edit live with !registry
 # Username: Discord ID
 USERNAME_TO_DISCORD_ID = {
     "rekz": 1084884048884797490,
@@ -194,38 +210,289 @@ def pretty_hours(hours):
     return ", ".join(f"{h:02}:00" for h in sorted(hours))
 
 
-async def dm_abyss_role(guild: discord.Guild, embed: discord.Embed):
+DM_CONCURRENCY = 5   # DMs in flight at once; each DM channel is its own rate-limit bucket
+
+# member id -> DMChannel. discord.py only keeps the most recent private channels
+# in its state cache, so with a big role create_dm would hit the API every time.
+_dm_channels = {}
+
+async def _send_dm(member, embeds, sem):
+    async with sem:
+        dm = _dm_channels.get(member.id)
+        if dm is None:
+            dm = await member.create_dm()
+            _dm_channels[member.id] = dm
+        await dm.send(embeds=embeds)
+
+async def dm_abyss_role(guild: discord.Guild, embed=None, embeds=None):
     """
     Send a DM to all members with the Abyss reminder role.
     
     Args:
         guild: Discord guild/server
         embed: Discord embed to send
+        embeds: Several embeds to send together as one DM (e.g. Round 1 + Round 2)
     
     Returns:
-        None (logs success/errors)
+        {"sent", "forbidden", "failed", "total", "seconds"} or None if the role is missing
     """
     role = guild.get_role(ABYSS_ROLE_ID)
     if not role:
         log_info(f"[ABYSS] Role not found in guild {guild.id}")
-        return
+        return None
+
+    embeds = embeds or [embed]
+
+    # Members are cached (members intent); only fall back to chunking if they aren't yet
+    if not guild.chunked:
+        await guild.chunk()
+    members = [m for m in role.members if not m.bot]
+
+    started = asyncio.get_running_loop().time()
+    sem = asyncio.Semaphore(DM_CONCURRENCY)
+    results = await asyncio.gather(*(_send_dm(m, embeds, sem) for m in members), return_exceptions=True)
 
-    count = 0
-    async for member in guild.fetch_members(limit=None):
-        if role in member.roles:
+    sent = forbidden = failed = 0
+    for member, res in zip(members, results):
+        if res is None:
+            sent += 1
+        elif isinstance(res, discord.Forbidden):
+            forbidden += 1
+        else:
+            failed += 1
+            _dm_channels.pop(member.id, None)
+            log_info(f"[ABYSS] DM error for {member.id}: {res}")
+
+    seconds = asyncio.get_running_loop().time() - started
+    log_info(
+        f"[ABYSS] Sent DM to {sent}/{len(members)} members with role {ABYSS_ROLE_ID} in {seconds:.1f}s "
+        f"({forbidden} DMs closed, {failed} failed)"
+    )
+    return {"sent": sent, "forbidden": forbidden, "failed": failed, "total": len(members), "seconds": seconds}
+
+
+
+# ============================================================
+# OUTBOUND MESSAGE QUEUE
+# ============================================================
+# Multi-part outputs go through a per-channel outbox: parts queued together
+# are merged into as few messages as fit Discord's 2000-char limit, and sends
+# are paced to the channel's 5-messages-per-5s bucket so we don't get 429'd.
+
+DISCORD_MESSAGE_LIMIT = 2000
+OUTBOX_BURST = 5              # Messages per channel per OUTBOX_BURST_WINDOW
+OUTBOX_BURST_WINDOW = 5.0
+OUTBOX_COALESCE_DELAY = 0.05  # Let parts queued back-to-back land in the same batch
+OUTBOX_MAX_EMBEDS = 10
+
+def split_message(content, limit=DISCORD_MESSAGE_LIMIT):
+    """Split text into chunks under the limit, on line boundaries where possible"""
+    chunks, current = [], ""
+    for line in content.split("\n"):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+class ChannelOutbox:
+    """Serialises sends to one channel, merging queued parts into as few messages as fit"""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.queue = collections.deque()   # (content, embed, future, batch)
+        self.sent_at = collections.deque(maxlen=OUTBOX_BURST)
+        self.task = None
+        self.parts_sent = 0
+        self.messages_sent = 0
+
+    def put(self, content=None, embed=None, batch=None):
+        """Queue a part; only parts sharing a batch key are merged into one message"""
+        fut = asyncio.get_running_loop().create_future()
+        if not content and embed is None:
+            fut.set_result(None)
+            return fut
+        if len(content or "") > DISCORD_MESSAGE_LIMIT:
+            *head, content = split_message(content)
+            for chunk in head:
+                self.queue.append((chunk, None, None, batch))
+        self.queue.append((content, embed, fut, batch))
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._drain())
+        return fut
+
+    def _take_batch(self):
+        text, embeds, futures = "", [], []
+        first_batch = self.queue[0][3] if self.queue else None
+        while self.queue:
+            content, embed, fut, batch = self.queue[0]
+            content = content or ""
+            joined = f"{text}\n{content}" if text and content else (text or content)
+            if futures or text or embeds:
+                # Text can't follow an embed in the same message (it would render above it)
+                if batch is None or batch is not first_batch or len(joined) > DISCORD_MESSAGE_LIMIT or \
+                        (embeds and content) or (embed is not None and len(embeds) >= OUTBOX_MAX_EMBEDS):
+                    break
+            self.queue.popleft()
+            text = joined
+            if embed is not None:
+                embeds.append(embed)
+            futures.append(fut)
+        return text, embeds, futures
+
+    async def _pace(self):
+        if len(self.sent_at) == OUTBOX_BURST:
+            wait = self.sent_at[0] + OUTBOX_BURST_WINDOW - asyncio.get_running_loop().time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    async def _drain(self):
+        await asyncio.sleep(OUTBOX_COALESCE_DELAY)
+        while self.queue:
+            text, embeds, futures = self._take_batch()
+            await self._pace()
             try:
-                dm = await member.create_dm()
-                await dm.send(embed=embed)
-                count += 1
-                # Rate limiting - wait 0.5 seconds between DMs to prevent hitting rate limits
-                await asyncio.sleep(0.5)
-            except discord.Forbidden:
-                continue
+                msg = await self.channel.send(content=text or None, embeds=embeds or None)
+                result, error = msg, None
             except Exception as e:
-                log_info(f"[ABYSS] DM error: {e}")
-    
-    log_info(f"[ABYSS] Sent DM to {count} members with role {ABYSS_ROLE_ID}")
+                log_error(f"[OUTBOX] Send to {getattr(self.channel, 'id', '?')} failed: {type(e).__name__}: {e}")
+                result, error = None, e
+            self.sent_at.append(asyncio.get_running_loop().time())
+            self.messages_sent += 1
+            self.parts_sent += len(futures)
+            for fut in futures:
+                if fut is None or fut.done():
+                    continue
+                if error:
+                    fut.set_exception(error)
+                else:
+                    fut.set_result(result)
+
+_outboxes = {}
+
+def get_outbox(channel):
+    box = _outboxes.get(channel.id)
+    if box is None:
+        box = _outboxes[channel.id] = ChannelOutbox(channel)
+    box.channel = channel
+    return box
+
+async def outbox_send(channel, *parts):
+    """
+    Queue text and embeds for a channel, in order, and wait until they're sent.
+    The parts of one call are merged into as few messages as fit (never with
+    another call's parts); empty ones are skipped. Returns the last Message.
+    """
+    box = get_outbox(channel)
+    batch = object()
+    futures = [
+        box.put(embed=part, batch=batch) if isinstance(part, discord.Embed) else box.put(content=part, batch=batch)
+        for part in parts if isinstance(part, discord.Embed) or part
+    ]
+    results = await asyncio.gather(*futures)
+    return results[-1] if results else None
+
+
+# ============================================================
+# PROGRESS REPORTING
+# ============================================================
+
+PROGRESS_INTERVAL_SECONDS = 10   # Edit a progress message at most this often
+
+def cos_requests_served():
+    """Total Call of Stats requests let through the gate since startup"""
+    return sum(_cos_gate.served.values())
+
+class ProgressReporter:
+    """
+    Keeps one status message up to date for a long-running task: done/total,
+    rate, ETA and Call of Stats requests used. Edits at most every `interval`
+    seconds, however often tick() is called.
+    """
+
+    def __init__(self, message, title, total, header=None, unit="items", interval=PROGRESS_INTERVAL_SECONDS):
+        self.message = message
+        self.title = title
+        self.total = total
+        self.header = header
+        self.unit = unit
+        self.interval = interval
+        self.done = 0
+        self.detail = None
+        loop = asyncio.get_running_loop()
+        self.started = self.last_edit = loop.time()
+        self.requests_at_start = cos_requests_served()
+        self._editing = False
+
+    @classmethod
+    async def start(cls, channel, title, total, **kwargs):
+        reporter = cls(None, title, total, **kwargs)
+        reporter.message = await channel.send(reporter.render())
+        return reporter
+
+    def render(self, final=False):
+        elapsed = asyncio.get_running_loop().time() - self.started
+        requests = cos_requests_served() - self.requests_at_start
+        lines = [f"{'✅' if final else '⏳'} {self.title}"]
+        if self.header:
+            lines.append(self.header)
+        if final:
+            lines.append(f"{self.done} {self.unit} in {_fmt_duration(elapsed)} · 🌐 {requests} requests")
+        else:
+            pct = self.done / self.total * 100 if self.total else 0
+            filled = int(pct // 10)
+            line = f"[{'█' * filled}{'░' * (10 - filled)}] {self.done}/{self.total} {self.unit} ({pct:.0f}%)"
+            if self.done and elapsed > 0:
+                rate = self.done / elapsed
+                line += f" · {rate:.1f}/s · ETA {_fmt_duration((self.total - self.done) / rate)}"
+            line += f" · 🌐 {requests} requests"
+            lines.append(line)
+        if self.detail:
+            lines.append(self.detail)
+        return "\n".join(lines)
+
+    async def tick(self, n=1, detail=None, done=None):
+        """Count n more items done (or set the absolute count with done=)"""
+        self.done = done if done is not None else self.done + n
+        if detail is not None:
+            self.detail = detail
+        now = asyncio.get_running_loop().time()
+        if self._editing or now - self.last_edit < self.interval:
+            return
+        self._editing = True
+        self.last_edit = now
+        try:
+            await self.message.edit(content=self.render())
+        except Exception as e:
+            log_info(f"[PROGRESS] Edit failed: {e}")
+        finally:
+            self._editing = False
+
+    async def finish(self, detail=None):
+        if detail is not None:
+            self.detail = detail
+        try:
+            await self.message.edit(content=self.render(final=True))
+        except Exception as e:
+            log_info(f"[PROGRESS] Edit failed: {e}")
 
+async def gather_with_progress(aws, progress):
+    """asyncio.gather(..., return_exceptions=True) that ticks `progress` as each awaitable finishes"""
+    async def run(aw):
+        try:
+            return await aw
+        finally:
+            await progress.tick()
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=True)
 
 
 # ============================================================
@@ -278,30 +545,106 @@ def make_backup():
             z.write(ABYSS_CONFIG_FILE)
 
     cleanup_old_backups()
-
-    if bot.loop.is_running():
-        bot.loop.create_task(upload_backup(path))
+    return path
 
 def silent_backup():
+    """Queue a background backup (coalesced with any backup already waiting)"""
     try:
-        make_backup()
+        db_enqueue_job("backup", dedupe=True)
     except Exception as e:
         pass
 
-def get_all_lords_from_guild(guild):
-    """Get all numeric roles (account IDs) from the guild"""
-    lords = []
-    
-    # Scan ALL roles in the server
-    for role in guild.roles:
-        if role.name.isdigit() and role.name != "@everyone":
-            lords.append({
-                "name": role.name,
-                "account_id": role.name,
-                "role": role
-            })
-    
-    return lords
+# ============================================================
+# CALLOFSTATS REQUEST PRIORITY LANES
+# ============================================================
+# Every upstream Call of Stats request takes a slot from one shared gate.
+# Waiting requests are served strictly by priority, and the last few slots
+# are reserved for interactive commands so a bulk refresh or backfill can
+# never starve a member's !progress.
+
+COS_PRIORITY_INTERACTIVE = 0
+COS_PRIORITY_REFRESH = 1
+COS_PRIORITY_BACKFILL = 2
+COS_PRIORITY_NAMES = {0: "interactive", 1: "refresh", 2: "backfill"}
+
+COS_MAX_CONCURRENT = 6          # Upstream requests in flight at once
+COS_INTERACTIVE_RESERVED = 2    # Of those, slots only interactive requests may take
+
+# Priority of the current task; job workers set this, commands keep the default
+_cos_priority = contextvars.ContextVar("cos_priority", default=COS_PRIORITY_INTERACTIVE)
+
+
+class CosRequestGate:
+    """Priority-ordered concurrency limiter with capacity reserved for interactive requests"""
+
+    def __init__(self, capacity, reserved):
+        self.capacity = capacity
+        self.reserved = reserved
+        self.in_flight = 0
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self.served = {p: 0 for p in COS_PRIORITY_NAMES}
+        self.total_wait = {p: 0.0 for p in COS_PRIORITY_NAMES}
+
+    def _can_start(self, priority):
+        limit = self.capacity if priority == COS_PRIORITY_INTERACTIVE else self.capacity - self.reserved
+        return self.in_flight < limit
+
+    def queued_by_priority(self):
+        counts = {p: 0 for p in COS_PRIORITY_NAMES}
+        for priority, _, fut in self._waiters:
+            if not fut.done():
+                counts[priority] += 1
+        return counts
+
+    async def acquire(self, priority):
+        started = asyncio.get_running_loop().time()
+        if self._can_start(priority) and (not self._waiters or self._waiters[0][0] > priority):
+            self.in_flight += 1
+        else:
+            fut = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # Slot was handed over just as we were cancelled - give it back
+                if fut.done() and not fut.cancelled():
+                    self.release()
+                raise
+        waited = asyncio.get_running_loop().time() - started
+        self.served[priority] += 1
+        self.total_wait[priority] += waited
+        if waited > 5:
+            log_info(f"[COS GATE] {COS_PRIORITY_NAMES[priority]} request waited {waited:.1f}s for a slot")
+
+    def release(self):
+        self.in_flight -= 1
+        # Wake the best waiter(s); strict priority means a blocked head blocks everyone behind it
+        while self._waiters:
+            priority, _, fut = self._waiters[0]
+            if fut.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_start(priority):
+                break
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            fut.set_result(None)
+
+
+_cos_gate = CosRequestGate(COS_MAX_CONCURRENT, COS_INTERACTIVE_RESERVED)
+
+
+@contextlib.asynccontextmanager
+async def cos_slot(priority=None):
+    """Hold one upstream request slot at the given (or the current task's) priority"""
+    if priority is None:
+        priority = _cos_priority.get()
+    await _cos_gate.acquire(priority)
+    try:
+        yield
+    finally:
+        _cos_gate.release()
 
 # ============================================================
 # CALLOFSTATS CACHE SYSTEM
@@ -318,7 +661,7 @@ async def fetch_alliance_tag(account_id):
     try:
         async with aiohttp.ClientSession() as session:
             url = f"https://www.callofstats.com/lord/{account_id}"
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            async with cos_slot(), session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as resp:
                 if resp.status == 200:
                     html = await resp.text()
                     
@@ -368,7 +711,7 @@ async def fetch_highest_power(account_id):
                 await asyncio.sleep(2)
                 continue
 
-            async with session.get(url, allow_redirects=True) as response:
+            async with cos_slot(), session.get(url, allow_redirects=True) as response:
                 if response.status != 200:
                     log_info(f"[HIGHEST POWER] HTTP {response.status} attempt {attempt+1} for {account_id}")
                     await asyncio.sleep(1)
@@ -449,7 +792,7 @@ async def fetch_achievement_stats(account_id):
                 await asyncio.sleep(2)
                 continue
 
-            async with session.get(url, allow_redirects=True) as response:
+            async with cos_slot(), session.get(url, allow_redirects=True) as response:
                 if response.status != 200:
                     log_info(f"[ACHIEVEMENTS] HTTP {response.status} attempt {attempt+1} for {account_id}")
                     await asyncio.sleep(1)
@@ -513,7 +856,7 @@ async def fetch_current_t_kills(account_id):
         session = await get_callofstats_session()
         url = f"https://callofstats.com/lord/{account_id}"
         
-        async with session.get(url, allow_redirects=True) as response:
+        async with cos_slot(), session.get(url, allow_redirects=True) as response:
             if response.status != 200:
                 log_info(f"[CURRENT T-KILLS] Failed to fetch {url}: {response.status}")
                 return {}
@@ -578,7 +921,7 @@ async def fetch_latest_data_date(account_id):
         session = await get_callofstats_session()
         url = f"https://callofstats.com/lord/{account_id}"
         
-        async with session.get(url, allow_redirects=True) as response:
+        async with cos_slot(), session.get(url, allow_redirects=True) as response:
             if response.status != 200:
                 log_info(f"[LATEST DATA DATE] Failed to fetch {url}: {response.status}")
                 return None
@@ -657,6 +1000,63 @@ async def fetch_stats_with_fallback(account_id, start_date, end_date):
     return last_stats, end_date
 
 
+HISTORY_FLOOR_DATE = date(2025, 12, 1)  # Oldest date Call of Stats may have data for
+HISTORY_PROBE_ATTEMPTS = 3               # Tries per earliest-date probe before the search gives up
+
+async def find_earliest_data_date(account_id, floor_date, ceiling_date):
+    """
+    Find the earliest date with Call of Stats data for an account.
+    Probes the range floor_date → d, which is non-empty as soon as any day
+    inside it has data, so the check only flips once: gallop forward from
+    floor_date in doubling steps, then binary-search the last gap.
+    Returns (date or None, probes_used). None means no data in the whole range;
+    a probe that keeps failing (HTTP error, timeout) raises RuntimeError, as
+    treating it as empty would silently move the earliest date.
+    """
+    probes = 0
+    floor_str = floor_date.isoformat()
+
+    async def has_data_until(d):
+        nonlocal probes
+        for attempt in range(1, HISTORY_PROBE_ATTEMPTS + 1):
+            probes += 1
+            stats = await fetch_stats_for_account(account_id, floor_str, d.isoformat(), skip_cache=True)
+            if stats is not None:
+                return not is_stats_empty(stats)
+            if attempt < HISTORY_PROBE_ATTEMPTS:
+                await asyncio.sleep(2 * attempt)
+        raise RuntimeError(f"lookup up to {d.isoformat()} failed {HISTORY_PROBE_ATTEMPTS} times")
+
+    if not await has_data_until(ceiling_date):
+        log_info(f"[EARLIEST DATE] {account_id}: no data between {floor_date} and {ceiling_date} ({probes} probes)")
+        return None, probes
+
+    # Gallop: lo is known empty (or before the floor), hi is known non-empty
+    lo = floor_date - timedelta(days=1)
+    step = 1
+    hi = ceiling_date
+    while True:
+        probe = floor_date + timedelta(days=step - 1)
+        if probe >= ceiling_date:
+            break
+        if await has_data_until(probe):
+            hi = probe
+            break
+        lo = probe
+        step *= 2
+
+    # Binary search in (lo, hi]
+    while (hi - lo).days > 1:
+        mid = lo + timedelta(days=(hi - lo).days // 2)
+        if await has_data_until(mid):
+            hi = mid
+        else:
+            lo = mid
+
+    log_info(f"[EARLIEST DATE] {account_id}: {hi.isoformat()} ({probes} probes)")
+    return hi, probes
+
+
 def get_cached_stats(account_id, start_date, end_date):
     """Get stats from cache if valid (not expired)"""
     cache_key = f"{account_id}_{start_date}_{end_date}"
@@ -765,9 +1165,107 @@ def init_db():
             team2_json TEXT NOT NULL
         );
     """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_type TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            run_after TEXT NOT NULL,
+            lease_until TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT,
+            last_error TEXT,
+            result TEXT
+        );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, run_after, priority)")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS account_freshness (
+            account_id TEXT PRIMARY KEY,
+            season_id INTEGER NOT NULL,
+            last_data_date TEXT,
+            content_hash TEXT,
+            unchanged_streak INTEGER DEFAULT 0,
+            last_checked_at TEXT,
+            last_changed_at TEXT
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS reminder_ledger (
+            fire_key TEXT PRIMARY KEY,
+            fire_at TEXT NOT NULL,
+            sent_at TEXT NOT NULL
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS publish_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data_date TEXT NOT NULL UNIQUE,
+            detected_at TEXT NOT NULL,
+            last_miss_at TEXT,
+            latency_seconds INTEGER,
+            polls INTEGER
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            discord_id INTEGER UNIQUE,
+            account_id TEXT UNIQUE,
+            aliases TEXT DEFAULT '',
+            created_at TEXT
+        );
+    """)
+
+    # First run: seed the registry from the old hardcoded maps
+    c.execute("SELECT COUNT(*) FROM accounts")
+    if c.fetchone()[0] == 0:
+        now = datetime.utcnow().isoformat()
+        account_by_discord = dict(DISCORD_TO_ACCOUNT_ID)
+        for username, discord_id in USERNAME_TO_DISCORD_ID.items():
+            c.execute(
+                "INSERT INTO accounts (username, discord_id, account_id, created_at) VALUES (?, ?, ?, ?)",
+                (username, discord_id, account_by_discord.pop(discord_id, None), now)
+            )
+        for discord_id, account_id in account_by_discord.items():
+            c.execute(
+                "INSERT INTO accounts (username, discord_id, account_id, created_at) VALUES (?, ?, ?, ?)",
+                (account_id, discord_id, account_id, now)
+            )
     conn.commit()
     conn.close()
 
+# Stats kept as integers in daily_deltas: the cumulative season-to-date value
+# under the same column name as in season_progress (RSS spent stays negative,
+# as stored), and the change since the account's previous snapshot as <column>_delta
+DELTA_STATS = ["power_gain", "merits", "kills_gain", "deads_gain", "healed_gain",
+               "t5_gain", "t4_gain", "t3_gain", "t2_gain", "t1_gain",
+               "gold_spent", "wood_spent", "ore_spent", "mana_spent",
+               "gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered",
+               "infantry_merits", "cavalry_merits", "mage_merits", "marksman_merits", "other_merits",
+               "t45_healed", "t45_dead"]
+
+# Stats lords are ranked on (rank_history and !progress/!q ranks)
+RANK_STATS = ["power_gain", "merits", "kills_gain", "deads_gain", "healed_gain",
+              "t5_gain", "t4_gain", "t3_gain", "t2_gain", "t1_gain",
+              "gold_spent", "wood_spent", "ore_spent", "mana_spent",
+              "gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered"]
+# Stored negative, so ranked by absolute value (biggest spender first)
+RANK_ABSOLUTE_STATS = {"gold_spent", "wood_spent", "ore_spent", "mana_spent"}
+
+# Stats summed alliance-wide per data date in alliance_daily
+ALLIANCE_STATS = ["merits", "kills_gain", "deads_gain", "mana_gathered"]
+
+def sql_stat_int(column):
+    """SQL expression turning a stored stat string like '+12,345' into an integer"""
+    return f"CAST(REPLACE(REPLACE(COALESCE({column}, '0'), ',', ''), '+', '') AS INTEGER)"
+
 def init_db_progress():
     """Initialize separate database for season progress tracking"""
     conn = sqlite3.connect(DB_PROGRESS)
@@ -808,6 +1306,98 @@ def init_db_progress():
             UNIQUE(season_id, account_id, data_date)
         );
     """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS lord_names (
+            account_id TEXT PRIMARY KEY,
+            lord_name TEXT NOT NULL,
+            name_key TEXT NOT NULL,
+            updated_at TEXT
+        );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_season_progress_dates ON season_progress(season_id, data_date)")
+    stat_columns = "".join(
+        f"            {stat} INTEGER NOT NULL DEFAULT 0,\n            {stat}_delta INTEGER NOT NULL DEFAULT 0,\n"
+        for stat in DELTA_STATS
+    )
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS daily_deltas (
+            season_id INTEGER NOT NULL,
+            account_id TEXT NOT NULL,
+            data_date TEXT NOT NULL,
+            prev_date TEXT,
+            lord_name TEXT,
+{stat_columns}            PRIMARY KEY (season_id, account_id, data_date)
+        );
+    """)
+    c.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_season_progress_delete AFTER DELETE ON season_progress
+        BEGIN
+            DELETE FROM daily_deltas
+            WHERE season_id = OLD.season_id AND account_id = OLD.account_id AND data_date = OLD.data_date;
+        END
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_lord_names_key ON lord_names(name_key)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_daily_deltas_dates ON daily_deltas(season_id, data_date)")
+    alliance_columns = "".join(f"            {stat}_delta INTEGER NOT NULL DEFAULT 0,\n" for stat in ALLIANCE_STATS)
+    c.execute(f"""
+        CREATE TABLE IF NOT EXISTS alliance_daily (
+            season_id INTEGER NOT NULL,
+            data_date TEXT NOT NULL,
+            lords INTEGER NOT NULL,
+            new_lords INTEGER NOT NULL,
+            active INTEGER NOT NULL,
+{alliance_columns}            PRIMARY KEY (season_id, data_date)
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS rank_history (
+            season_id INTEGER NOT NULL,
+            data_date TEXT NOT NULL,
+            stat TEXT NOT NULL,
+            account_id TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            total INTEGER NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (season_id, data_date, stat, account_id)
+        );
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_rank_history_account ON rank_history(season_id, account_id, data_date)")
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS progress_reports (
+            season_id INTEGER NOT NULL,
+            account_id TEXT NOT NULL,
+            data_date TEXT NOT NULL,
+            report TEXT NOT NULL,
+            built_at TEXT NOT NULL,
+            PRIMARY KEY (season_id, account_id)
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS delta_moments (
+            season_id INTEGER NOT NULL,
+            account_id TEXT NOT NULL,
+            stat TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            mean REAL NOT NULL,
+            m2 REAL NOT NULL,
+            last_date TEXT NOT NULL,
+            PRIMARY KEY (season_id, account_id, stat)
+        );
+    """)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS quarantine (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            season_id INTEGER NOT NULL,
+            account_id TEXT NOT NULL,
+            data_date TEXT NOT NULL,
+            lord_name TEXT,
+            stats TEXT NOT NULL,
+            reasons TEXT NOT NULL,
+            flagged_at TEXT NOT NULL,
+            reported INTEGER NOT NULL DEFAULT 0,
+            UNIQUE(season_id, account_id, data_date)
+        );
+    """)
     conn.commit()
     conn.close()
 
@@ -853,6 +1443,7 @@ def db_add_event(name, dt, reminder):
     log_info(f"[DB ADD EVENT] writing to: {DB}")
     conn.commit()
     conn.close()
+    reschedule_reminders()
     silent_backup()
 
 def db_get_events():
@@ -878,6 +1469,7 @@ def db_update_event(event_id, name=None, dt=None, reminder=None):
 
     conn.commit()
     conn.close()
+    reschedule_reminders()
     silent_backup()
 
 def db_delete_event(event_id):
@@ -886,6 +1478,7 @@ def db_delete_event(event_id):
     c.execute("DELETE FROM events WHERE id=?", (event_id,))
     conn.commit()
     conn.close()
+    reschedule_reminders()
     silent_backup()
 
 init_db()
@@ -1004,6 +1597,365 @@ def db_get_server_lord_stats(server_num):
     return [dict(zip(cols, r)) for r in rows]
 migrate_db_progress()
 
+# ============================================================
+# DAILY DELTAS
+# ============================================================
+# daily_deltas mirrors season_progress as integers: per (season, account,
+# date) the cumulative value of every stat and its change since the previous
+# snapshot. Cumulative values are prefix sums of the deltas, so any range gain
+# is end row minus start row and a per-day series is a plain column read.
+
+def _rebuild_daily_deltas(c, season_id=None, account_id=None, since=None):
+    """Recompute daily_deltas from season_progress on cursor c (all, a season, or an account from `since` on)"""
+    where, params = [], []
+    if season_id is not None:
+        where.append("season_id = ?")
+        params.append(season_id)
+    if account_id is not None:
+        where.append("account_id = ?")
+        params.append(account_id)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    if since is None:
+        c.execute(f"DELETE FROM daily_deltas {where_sql}", params)
+    
+    columns = ", ".join(DELTA_STATS)
+    delta_columns = ", ".join(f"{stat}_delta" for stat in DELTA_STATS)
+    values = ", ".join(f"{sql_stat_int(stat)} AS {stat}" for stat in DELTA_STATS)
+    previous = ", ".join(f"LAG({sql_stat_int(stat)}) OVER w AS prev_{stat}" for stat in DELTA_STATS)
+    deltas = ", ".join(f"{stat} - COALESCE(prev_{stat}, 0)" for stat in DELTA_STATS)
+    c.execute(f"""
+        INSERT OR REPLACE INTO daily_deltas
+            (season_id, account_id, data_date, prev_date, lord_name, {columns}, {delta_columns})
+        SELECT season_id, account_id, data_date, prev_date, lord_name, {columns}, {deltas}
+        FROM (
+            SELECT season_id, account_id, data_date, lord_name,
+                   LAG(data_date) OVER w AS prev_date, {values}, {previous}
+            FROM season_progress
+            {where_sql}
+            WINDOW w AS (PARTITION BY season_id, account_id ORDER BY data_date)
+        )
+        {"WHERE data_date >= ?" if since is not None else ""}
+    """, params + ([since] if since is not None else []))
+    return c.rowcount
+
+# alliance_daily holds, per season and data date, the sum of every stat's change
+# over the snapshots dated that day, plus how many lords were published, were
+# new and were active (same rule as !active). Those sums telescope, so the
+# alliance total on a date - each lord's latest value on or before it - is a
+# running sum over dates. A saved snapshot only changes the deltas of its own
+# date and the account's next one, so ingestion re-aggregates just those two.
+
+def _rebuild_alliance_daily(c, season_id=None, dates=None):
+    """Re-aggregate alliance_daily from daily_deltas on cursor c (all, a season, or some of its dates)"""
+    where, params = [], []
+    if season_id is not None:
+        where.append("season_id = ?")
+        params.append(season_id)
+    if dates is not None:
+        where.append(f"data_date IN ({','.join('?' * len(dates))})")
+        params.extend(dates)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    c.execute(f"DELETE FROM alliance_daily {where_sql}", params)
+    
+    columns = ", ".join(f"{stat}_delta" for stat in ALLIANCE_STATS)
+    sums = ", ".join(f"SUM({stat}_delta)" for stat in ALLIANCE_STATS)
+    c.execute(f"""
+        INSERT INTO alliance_daily (season_id, data_date, lords, new_lords, active, {columns})
+        SELECT season_id, data_date, COUNT(*), SUM(prev_date IS NULL),
+               SUM(prev_date IS NOT NULL AND (power_gain_delta > 0 OR merits_delta > 0 OR mana_gathered_delta > 0)),
+               {sums}
+        FROM daily_deltas
+        {where_sql}
+        GROUP BY season_id, data_date
+    """, params)
+    return c.rowcount
+
+def _update_alliance_daily(c, season_id, account_id, data_date):
+    """After an account's snapshot for data_date was (re)written: re-aggregate that date and the account's next one"""
+    c.execute(
+        "SELECT MIN(data_date) FROM daily_deltas WHERE season_id = ? AND account_id = ? AND data_date > ?",
+        (season_id, account_id, data_date)
+    )
+    next_date = c.fetchone()[0]
+    _rebuild_alliance_daily(c, season_id, [data_date] + ([next_date] if next_date else []))
+
+def _prune_rank_history(c, season_id=None):
+    """Drop rank_history rows for data dates no longer in alliance_daily (deleted snapshots)"""
+    c.execute(f"""
+        DELETE FROM rank_history
+        WHERE {"season_id = ? AND" if season_id is not None else ""} NOT EXISTS (
+            SELECT 1 FROM alliance_daily a
+            WHERE a.season_id = rank_history.season_id AND a.data_date = rank_history.data_date
+        )
+    """, [season_id] if season_id is not None else [])
+    return c.rowcount
+
+def db_rebuild_daily_deltas(season_id=None):
+    """Rebuild daily_deltas for one season (or everything) - after bulk deletes from season_progress"""
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    rows = _rebuild_daily_deltas(c, season_id)
+    _rebuild_alliance_daily(c, season_id)
+    _prune_rank_history(c, season_id)
+    conn.commit()
+    conn.close()
+    mark_season_matrix_dirty(season_id)
+    return rows
+
+def db_get_daily_deltas(season_id, account_id, data_date):
+    """The daily_deltas row for an account's snapshot as a dict, or None"""
+    conn = sqlite3.connect(DB_PROGRESS)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute(
+        "SELECT * FROM daily_deltas WHERE season_id = ? AND account_id = ? AND data_date = ?",
+        (season_id, account_id, data_date)
+    )
+    row = c.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def backfill_daily_deltas():
+    """Rebuild daily_deltas when it doesn't cover season_progress (first run, or out of sync)"""
+    try:
+        conn = sqlite3.connect(DB_PROGRESS)
+        c = conn.cursor()
+        c.execute("SELECT (SELECT COUNT(*) FROM season_progress), (SELECT COUNT(*) FROM daily_deltas)")
+        snapshots, deltas = c.fetchone()
+        if snapshots != deltas:
+            rows = _rebuild_daily_deltas(c)
+            conn.commit()
+            log_info(f"[DAILY DELTAS] Backfilled {rows} rows ({deltas} before)")
+        c.execute("""
+            SELECT (SELECT COUNT(*) FROM (SELECT DISTINCT season_id, data_date FROM daily_deltas)),
+                   (SELECT COUNT(*) FROM alliance_daily)
+        """)
+        dates, aggregated = c.fetchone()
+        if snapshots != deltas or dates != aggregated:
+            rows = _rebuild_alliance_daily(c)
+            _prune_rank_history(c)
+            conn.commit()
+            log_info(f"[ALLIANCE DAILY] Backfilled {rows} rows ({aggregated} before)")
+        conn.close()
+    except Exception as e:
+        log_error(f"[DAILY DELTAS] Backfill error: {e}")
+
+backfill_daily_deltas()
+
+# ============================================================
+# ANOMALY DETECTION
+# ============================================================
+# Snapshots are checked by snapshot_checks.check_snapshot before they're
+# stored (see there for the rules). Flagged snapshots go to the quarantine
+# table instead of season_progress and are reported to the backup channel;
+# a stored spike that a later snapshot undoes is moved there as well.
+
+ANOMALY_REPORT_DELAY = 60      # Seconds - gathers a refresh's quarantines into one report
+
+def db_quarantine_snapshot(c, season_id, account_id, lord_name, stats, data_date, reasons):
+    """Hold a flagged snapshot back (a re-flag of the same date keeps its reported state)"""
+    c.execute("""
+        INSERT INTO quarantine (season_id, account_id, data_date, lord_name, stats, reasons, flagged_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(season_id, account_id, data_date) DO UPDATE SET
+            lord_name = excluded.lord_name, stats = excluded.stats, reasons = excluded.reasons
+    """, (season_id, account_id, data_date, lord_name, json.dumps(stats), json.dumps(reasons),
+          datetime.utcnow().isoformat()))
+
+def db_quarantine_stored_snapshot(c, season_id, account_id, data_date, reasons):
+    """Move a stored snapshot to the quarantine and drop what was derived from it (on cursor c)"""
+    c.execute(
+        f"SELECT lord_name, {', '.join(DELTA_STATS)} FROM season_progress "
+        "WHERE season_id = ? AND account_id = ? AND data_date = ?",
+        (season_id, account_id, data_date)
+    )
+    row = c.fetchone()
+    if not row:
+        return
+    db_quarantine_snapshot(c, season_id, account_id, row[0], dict(zip(DELTA_STATS, row[1:])), data_date, reasons)
+    c.execute(
+        "DELETE FROM season_progress WHERE season_id = ? AND account_id = ? AND data_date = ?",
+        (season_id, account_id, data_date)
+    )
+    _rebuild_alliance_daily(c, season_id, [data_date])
+    # Without ranks the date is ranked again on the next fill
+    c.execute("DELETE FROM rank_history WHERE season_id = ? AND data_date = ?", (season_id, data_date))
+    log_info(f"[ANOMALY] Quarantined stored {row[0]} ({account_id}) for {data_date}: {'; '.join(reasons)}")
+
+def db_get_quarantine(unreported_only=False):
+    """Quarantined snapshots as dicts, oldest first"""
+    conn = sqlite3.connect(DB_PROGRESS)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute(f"SELECT * FROM quarantine {'WHERE reported = 0' if unreported_only else ''} ORDER BY id")
+    rows = [dict(row) for row in c.fetchall()]
+    conn.close()
+    for row in rows:
+        row["stats"] = json.loads(row["stats"])
+        row["reasons"] = json.loads(row["reasons"])
+    return rows
+
+def db_mark_quarantine_reported(ids):
+    conn = sqlite3.connect(DB_PROGRESS)
+    conn.executemany("UPDATE quarantine SET reported = 1 WHERE id = ?", [(i,) for i in ids])
+    conn.commit()
+    conn.close()
+
+def db_delete_quarantine(quarantine_id):
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute("DELETE FROM quarantine WHERE id = ?", (quarantine_id,))
+    deleted = c.rowcount
+    conn.commit()
+    conn.close()
+    return deleted > 0
+
+# ============================================================
+# COLUMNAR SEASON STORE
+# ============================================================
+# With NumPy installed, the current season's daily_deltas are also held in a
+# season_matrix.SeasonMatrix (lords × data dates × stats) so rankings, window
+# gains and forecasts are array operations. Saves mark the matrix dirty from
+# their data date and the next use loads just those rows into a copy that
+# replaces the shared matrix, so a matrix handed out is never changed again.
+
+_matrix = None
+_matrix_dirty_since = {}    # season_id -> oldest data date saved since the last load
+_matrix_lock = threading.Lock()
+
+def db_get_matrix_rows(season_id, since=None):
+    """(account_id, lord_name, data_date, *DELTA_STATS) rows of a season, optionally from `since` on"""
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    query = f"SELECT account_id, lord_name, data_date, {', '.join(DELTA_STATS)} FROM daily_deltas WHERE season_id = ?"
+    params = [season_id]
+    if since:
+        query += " AND data_date >= ?"
+        params.append(since)
+    c.execute(query, params)
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def mark_season_matrix_dirty(season_id=None, data_date=None):
+    """Note new snapshots from data_date on (data_date None = reload the season, season None = the loaded one)"""
+    if season_id is None:
+        if not _matrix:
+            return
+        season_id = _matrix.season_id
+    current = _matrix_dirty_since.get(season_id, "9999-12-31")
+    _matrix_dirty_since[season_id] = min(current, data_date or "")
+
+def get_season_matrix(season_id):
+    """The season's SeasonMatrix, brought up to date first. None without NumPy."""
+    global _matrix
+    if season_matrix is None:
+        return None
+    with _matrix_lock:
+        since = _matrix_dirty_since.pop(season_id, None)
+        if _matrix is None or _matrix.season_id != season_id or since == "":
+            started = datetime.utcnow()
+            matrix = season_matrix.SeasonMatrix(season_id, DELTA_STATS)
+            matrix.upsert(db_get_matrix_rows(season_id))
+            _matrix = matrix
+            log_info(
+                f"[SEASON MATRIX] Loaded season {season_id}: {len(matrix.accounts)} lords × "
+                f"{len(matrix.dates)} dates in {(datetime.utcnow() - started).total_seconds():.2f}s"
+            )
+        elif since:
+            # Update a copy and swap it in, so readers never see a half-applied upsert
+            matrix = _matrix.copy()
+            rows = matrix.upsert(db_get_matrix_rows(season_id, since))
+            _matrix = matrix
+            log_info(f"[SEASON MATRIX] Updated {rows} snapshot(s) from {since}")
+        return _matrix
+
+def get_current_season_matrix(season_id):
+    """The matrix if season_id is the current season (the only one kept in memory), else None"""
+    current = db_get_current_season()
+    if not current or current[0] != season_id:
+        return None
+    try:
+        return get_season_matrix(season_id)
+    except Exception as e:
+        log_error(f"[SEASON MATRIX] Load failed, using SQL: {e}")
+        return None
+
+# ============================================================
+# SEASON FORECASTS
+# ============================================================
+# Growth rates for every lord come from one SeasonMatrix.trends() call per
+# stat and are cached against the matrix version, so they're computed once per
+# publish (or save) instead of once per !forecast.
+
+SEASON_LENGTH_DAYS = int(os.getenv("SEASON_LENGTH_DAYS", "56"))   # Projection horizon from the season start
+FORECAST_RECENT_DAYS = 7
+FORECAST_STATS = {
+    "merits": ("merits", "🏅 Merits"),
+    "power": ("power_gain", "⚡ Power"),
+    "kills": ("kills_gain", "⚔️ Kills"),
+}
+
+_forecast_cache = {}    # season_id -> (matrix version, forecasts)
+
+def season_end_date(start_date):
+    return (datetime.strptime(start_date, "%Y-%m-%d").date() + timedelta(days=SEASON_LENGTH_DAYS)).isoformat()
+
+def get_season_forecasts(season_id):
+    """
+    {account_id: {"lord_name", "data_date", column: {"value", "slope", "recent"}}}
+    for every lord of the current season, slope being the least-squares gain
+    per day over the season and recent the gain per day over the last
+    FORECAST_RECENT_DAYS (None without enough history). None without NumPy.
+    """
+    matrix = get_current_season_matrix(season_id)
+    if not matrix:
+        return None
+    with _matrix_lock:
+        cached = _forecast_cache.get(season_id)
+        if cached and cached[0] == matrix.version:
+            return cached[1]
+        
+        started = datetime.utcnow()
+        forecasts = {}
+        for column, _ in FORECAST_STATS.values():
+            rows, values, cols, slopes, recent = matrix.trends(column, FORECAST_RECENT_DAYS)
+            for row, value, col, slope, rate in zip(rows, values, cols, slopes, recent):
+                lord = forecasts.setdefault(matrix.accounts[row], {
+                    "lord_name": matrix.names[row],
+                    "data_date": matrix.dates[col],
+                })
+                lord[column] = {
+                    "value": int(value),
+                    "slope": None if math.isnan(slope) else float(slope),
+                    "recent": None if math.isnan(rate) else float(rate),
+                }
+        _forecast_cache.clear()
+        _forecast_cache[season_id] = (matrix.version, forecasts)
+    log_info(
+        f"[FORECAST] Fitted {len(forecasts)} lords in {(datetime.utcnow() - started).total_seconds():.2f}s"
+    )
+    return forecasts
+
+def project(value, rate, data_date, end_date):
+    """Value at end_date if it keeps growing at rate per day (None without a rate)"""
+    if rate is None:
+        return None
+    days_left = max((datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(data_date, "%Y-%m-%d")).days, 0)
+    return int(value + rate * days_left)
+
+def parse_amount(text):
+    """'5m' / '750k' / '1,200,000' -> int, None if it isn't a positive number"""
+    text = text.lower().replace(",", "")
+    multiplier = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}.get(text[-1:], 1)
+    if multiplier > 1:
+        text = text[:-1]
+    try:
+        amount = int(float(text) * multiplier)
+    except (ValueError, OverflowError):
+        return None
+    return amount if amount > 0 else None
+
 # ============================================================
 # SEASON TRACKER DATABASE FUNCTIONS
 # ============================================================
@@ -1190,8 +2142,11 @@ def is_stats_empty(stats):
     
     return True
 
-def db_save_season_progress(season_id, account_id, lord_name, stats, data_date=None):
-    """Save a member's progress for a specific date in a season"""
+def db_save_season_progress(season_id, account_id, lord_name, stats, data_date=None, check=True):
+    """
+    Save a member's progress for a specific date in a season.
+    Returns False if it failed or the snapshot was quarantined (check=False stores it regardless).
+    """
     try:
         if not data_date:
             data_date = date.today().isoformat()
@@ -1201,6 +2156,14 @@ def db_save_season_progress(season_id, account_id, lord_name, stats, data_date=N
             c = conn.cursor()
             now = datetime.utcnow().isoformat()
             
+            reasons, spike = snapshot_checks.check_snapshot(c, season_id, account_id, stats, data_date) if check else ([], None)
+            if reasons:
+                db_quarantine_snapshot(c, season_id, account_id, lord_name, stats, data_date, reasons)
+                conn.commit()
+                log_info(f"[ANOMALY] Quarantined {lord_name} ({account_id}) for {data_date}: {'; '.join(reasons)}")
+                db_enqueue_job("anomaly_report", delay_seconds=ANOMALY_REPORT_DELAY, dedupe=True)
+                return False
+            
             c.execute("""
                 INSERT OR REPLACE INTO season_progress 
                 (season_id, account_id, data_date, lord_name, power_gain, merits, kills_gain, deads_gain, healed_gain,
@@ -1224,11 +2187,24 @@ def db_save_season_progress(season_id, account_id, lord_name, stats, data_date=N
                 stats.get("marksman_merits"), stats.get("other_merits"),
                 stats.get("t45_healed"), stats.get("t45_dead"), now
             ))
+            if spike:
+                db_quarantine_stored_snapshot(c, season_id, account_id, *spike)
+            _rebuild_daily_deltas(c, season_id, account_id, since=data_date)
+            _update_alliance_daily(c, season_id, account_id, data_date)
+            # A good copy of a quarantined snapshot supersedes it
+            c.execute(
+                "DELETE FROM quarantine WHERE season_id = ? AND account_id = ? AND data_date = ?",
+                (season_id, account_id, data_date)
+            )
             conn.commit()
+            mark_season_matrix_dirty(season_id, spike[0] if spike else data_date)
+            if spike:
+                db_enqueue_job("anomaly_report", delay_seconds=ANOMALY_REPORT_DELAY, dedupe=True)
             log_info(f"[DB SAVE] {lord_name} ({account_id}) for {data_date}")
-            return True
         finally:
             conn.close()
+        note_lord_name(account_id, lord_name)
+        return True
     except Exception as e:
         log_error(f"[DB SAVE PROGRESS] Error: {e}")
         return False
@@ -1356,20 +2332,404 @@ def db_get_latest_season_progress(season_id, account_id):
         log_error(f"[DB GET LATEST PROGRESS] Error: {e}")
         return None
 
-def db_get_lord(account_id):
-    try:
-        conn = sqlite3.connect(DB)
-        try:
-            c = conn.cursor()
-            c.execute("SELECT id, lord_name, account_id FROM lords WHERE account_id=?", (account_id,))
-            row = c.fetchone()
-            return row
-        finally:
-            conn.close()
-    except Exception as e:
-        log_error(f"[DB GET LORD] Error: {e}")
-        return None
-
+def db_get_activity(season_id, account_ids):
+    """
+    Activity of every account in one query over daily_deltas: the latest
+    snapshot, its gains since the previous snapshot and how long the current
+    no-gain streak is. A snapshot counts as active if power, merits or mana
+    gathered went up. Returns a list of dicts (account_id, lord_name,
+    data_date, prev_date, power, merits, mana, idle_days, as_of); gains and
+    idle_days are None for accounts with a single snapshot.
+    """
+    account_ids = list(account_ids)
+    if not account_ids:
+        return []
+    placeholders = ",".join("?" * len(account_ids))
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute(f"""
+        WITH deltas AS (
+            SELECT account_id, lord_name, data_date, prev_date,
+                   power_gain_delta AS d_power, merits_delta AS d_merits, mana_gathered_delta AS d_mana,
+                   ROW_NUMBER() OVER (PARTITION BY account_id ORDER BY data_date DESC) AS recency,
+                   MIN(data_date) OVER (PARTITION BY account_id) AS first_date,
+                   MAX(data_date) OVER () AS as_of
+            FROM daily_deltas
+            WHERE season_id = ? AND account_id IN ({placeholders})
+        ),
+        streaks AS (
+            SELECT account_id,
+                   MAX(CASE WHEN prev_date IS NOT NULL AND (d_power > 0 OR d_merits > 0 OR d_mana > 0)
+                            THEN data_date END) AS last_gain_date
+            FROM deltas
+            GROUP BY account_id
+        )
+        SELECT d.account_id, d.lord_name, d.data_date, d.prev_date,
+               CASE WHEN d.prev_date IS NULL THEN NULL ELSE d.d_power END,
+               CASE WHEN d.prev_date IS NULL THEN NULL ELSE d.d_merits END,
+               CASE WHEN d.prev_date IS NULL THEN NULL ELSE d.d_mana END,
+               CASE WHEN d.prev_date IS NULL THEN NULL
+                    ELSE CAST(julianday(d.as_of) - julianday(COALESCE(s.last_gain_date, d.first_date)) AS INTEGER)
+               END AS idle_days,
+               d.as_of
+        FROM deltas d JOIN streaks s ON s.account_id = d.account_id
+        WHERE d.recency = 1
+    """, (season_id, *account_ids))
+    rows = c.fetchall()
+    conn.close()
+    keys = ["account_id", "lord_name", "data_date", "prev_date", "power", "merits", "mana", "idle_days", "as_of"]
+    return [dict(zip(keys, row)) for row in rows]
+
+GAINS_FIELDS = [("power", "power_gain"), ("merits", "merits"), ("kills", "kills_gain"),
+                ("deaths", "deads_gain"), ("mana", "mana_gathered")]
+GAINS_SPENT_FIELDS = ["gold_spent", "wood_spent", "ore_spent", "mana_spent"]
+
+def db_get_gains_between(season_id, start, end, account_ids=None):
+    """
+    Gains of every lord between two stored dates, as end minus start of the
+    cumulative values in daily_deltas: power, merits, kills, deaths, mana
+    gathered and RSS spent (as positive amounts). Lords without a snapshot
+    on both dates are left out. Sorted by power gain.
+    """
+    account_filter = ""
+    params = [start, season_id, end]
+    if account_ids is not None:
+        account_ids = list(account_ids)
+        if not account_ids:
+            return []
+        account_filter = f"AND e.account_id IN ({','.join('?' * len(account_ids))})"
+        params += account_ids
+    gains = ",\n               ".join(f"e.{column} - s.{column} AS {key}" for key, column in GAINS_FIELDS)
+    spent = ",\n               ".join(f"ABS(e.{column}) - ABS(s.{column}) AS {column}" for column in GAINS_SPENT_FIELDS)
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT e.account_id, e.lord_name,
+               {gains},
+               {spent}
+        FROM daily_deltas e
+        JOIN daily_deltas s
+          ON s.season_id = e.season_id AND s.account_id = e.account_id AND s.data_date = ?
+        WHERE e.season_id = ? AND e.data_date = ? {account_filter}
+        ORDER BY power DESC
+    """, params)
+    keys = ["account_id", "lord_name"] + [key for key, _ in GAINS_FIELDS] + GAINS_SPENT_FIELDS
+    rows = [dict(zip(keys, row)) for row in c.fetchall()]
+    conn.close()
+    return rows
+
+def db_get_alliance_daily(season_id, limit=None):
+    """
+    A season's alliance_daily rows, newest first, as dicts with each stat's
+    day change (<stat>_delta), alliance total (<stat>) and members so far
+    """
+    deltas = ", ".join(f"{stat}_delta" for stat in ALLIANCE_STATS)
+    totals = ", ".join(f"SUM({stat}_delta) OVER w AS {stat}" for stat in ALLIANCE_STATS)
+    query = f"""
+        SELECT * FROM (
+            SELECT data_date, lords, active, SUM(new_lords) OVER w AS members, {deltas}, {totals}
+            FROM alliance_daily
+            WHERE season_id = ?
+            WINDOW w AS (ORDER BY data_date)
+        )
+        ORDER BY data_date DESC
+    """
+    params = [season_id]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    conn = sqlite3.connect(DB_PROGRESS)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute(query, params)
+    rows = [dict(row) for row in c.fetchall()]
+    conn.close()
+    return rows
+
+def db_get_alliance_season_totals():
+    """{season_id: dict(first_date, last_date, members, <stat> season totals)} from alliance_daily"""
+    totals = ", ".join(f"SUM({stat}_delta) AS {stat}" for stat in ALLIANCE_STATS)
+    conn = sqlite3.connect(DB_PROGRESS)
+    conn.row_factory = sqlite3.Row
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT season_id, MIN(data_date) AS first_date, MAX(data_date) AS last_date,
+               SUM(new_lords) AS members, {totals}
+        FROM alliance_daily
+        GROUP BY season_id
+    """)
+    rows = {row["season_id"]: dict(row) for row in c.fetchall()}
+    conn.close()
+    return rows
+
+def db_get_season_dates(season_id, prefix="", limit=None):
+    """Stored data dates of a season starting with prefix, newest first (uses idx_season_progress_dates)"""
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    query = """
+        SELECT DISTINCT data_date FROM season_progress
+        WHERE season_id = ? AND data_date >= ? AND data_date < ?
+        ORDER BY data_date DESC
+    """
+    params = [season_id, prefix, prefix + "\x7f"]
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    c.execute(query, params)
+    dates = [row[0] for row in c.fetchall()]
+    conn.close()
+    return dates
+
+def db_get_window_gains(season_id, account_ids, column, days, absolute=False, season_start=None):
+    """
+    Gain in one stat over the last `days` days up to the season's latest data
+    date, from daily_deltas (or the season matrix when it's loaded): each
+    lord's latest cumulative value minus the one from their latest snapshot
+    on or before the window start. Lords without a snapshot inside the window,
+    or without one on or before its start, are left out - their season-to-date
+    value isn't a window gain - unless the window reaches back before
+    season_start. Returns a list of dicts (account_id, lord_name, data_date,
+    base_date, gain, as_of); base_date is None for such season-to-date gains.
+    absolute compares ABS() values (for the negative RSS spent columns).
+    """
+    if column not in DELTA_STATS:
+        return []
+    account_ids = list(account_ids)
+    if not account_ids:
+        return []
+    
+    matrix = get_current_season_matrix(season_id)
+    if matrix:
+        window_start = (datetime.strptime(matrix.dates[-1], "%Y-%m-%d").date() - timedelta(days=days)).isoformat() \
+            if matrix.dates else ""
+        from_start = bool(season_start) and window_start < season_start
+        rows, gains, cols, base_cols = matrix.window_gains(column, days, account_ids, absolute, from_start)
+        result = [
+            {"account_id": matrix.accounts[row], "lord_name": matrix.names[row], "data_date": matrix.dates[col],
+             "base_date": matrix.dates[base] if base >= 0 else None, "gain": int(gain), "as_of": matrix.dates[-1]}
+            for row, gain, col, base in zip(rows, gains, cols, base_cols)
+        ]
+        result.sort(key=lambda r: r["gain"], reverse=True)
+        return result
+    
+    value = "ABS({t}." + column + ")" if absolute else "{t}." + column
+    placeholders = ",".join("?" * len(account_ids))
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute(f"""
+        WITH bounds AS (
+            SELECT MAX(data_date) AS as_of, date(MAX(data_date), ?) AS start
+            FROM daily_deltas WHERE season_id = ?
+        ),
+        latest AS (
+            SELECT account_id, lord_name, data_date, value FROM (
+                SELECT p.account_id, p.lord_name, p.data_date, {value.format(t="p")} AS value,
+                       ROW_NUMBER() OVER (PARTITION BY p.account_id ORDER BY p.data_date DESC) AS recency
+                FROM daily_deltas p
+                WHERE p.season_id = ? AND p.account_id IN ({placeholders})
+            ) WHERE recency = 1 AND data_date > (SELECT start FROM bounds)
+        ),
+        base AS (
+            SELECT l.account_id, MAX(b.data_date) AS base_date
+            FROM latest l
+            JOIN daily_deltas b
+              ON b.season_id = ? AND b.account_id = l.account_id AND b.data_date <= (SELECT start FROM bounds)
+            GROUP BY l.account_id
+        )
+        SELECT l.account_id, l.lord_name, l.data_date, base.base_date,
+               l.value - COALESCE({value.format(t="b")}, 0) AS gain, (SELECT as_of FROM bounds)
+        FROM latest l
+        LEFT JOIN base ON base.account_id = l.account_id
+        LEFT JOIN daily_deltas b
+          ON b.season_id = ? AND b.account_id = l.account_id AND b.data_date = base.base_date
+        WHERE base.base_date IS NOT NULL OR (SELECT start FROM bounds) < ?
+        ORDER BY gain DESC
+    """, (f"-{int(days)} days", season_id, season_id, *account_ids, season_id, season_id, season_start or ""))
+    keys = ["account_id", "lord_name", "data_date", "base_date", "gain", "as_of"]
+    rows = [dict(zip(keys, row)) for row in c.fetchall()]
+    conn.close()
+    return rows
+
+_cross_season_cache = {}    # (column, absolute, season_ids) -> (data epoch, rows)
+
+def db_data_epoch(c):
+    """Changes whenever a snapshot is saved, replaced or deleted (on a DB_PROGRESS cursor)"""
+    c.execute("SELECT MAX(id), COUNT(*) FROM season_progress")
+    return c.fetchone()
+
+def db_get_cross_season_totals(column, season_ids=None, absolute=False):
+    """
+    Each lord's stat summed over seasons, from every season's final stored
+    snapshot (the lord's latest data date in it). season_ids None means all
+    seasons. Returns dicts (account_id, lord_name, total, seasons), highest
+    first; cached until the stored data changes.
+    """
+    if column not in DELTA_STATS:
+        return []
+    key = (column, absolute, tuple(sorted(season_ids)) if season_ids is not None else None)
+    value = f"ABS({sql_stat_int('p.' + column)})" if absolute else sql_stat_int("p." + column)
+    
+    conn = sqlite3.connect(DB_PROGRESS)
+    try:
+        c = conn.cursor()
+        epoch = db_data_epoch(c)
+        cached = _cross_season_cache.get(key)
+        if cached and cached[0] == epoch:
+            return cached[1]
+        
+        c.execute("ATTACH DATABASE ? AS core", (DB,))
+        season_filter = ""
+        params = []
+        if season_ids is not None:
+            season_filter = f"WHERE p.season_id IN ({','.join('?' * len(season_ids))})"
+            params.extend(season_ids)
+        # Bare lord_name with MAX() comes from the lord's newest season
+        c.execute(f"""
+            WITH finals AS (
+                SELECT p.account_id, p.lord_name, s.created_at, {value} AS value,
+                       ROW_NUMBER() OVER (PARTITION BY p.season_id, p.account_id ORDER BY p.data_date DESC) AS recency
+                FROM season_progress p
+                JOIN core.seasons s ON s.id = p.season_id
+                {season_filter}
+            )
+            SELECT account_id, lord_name, MAX(created_at), SUM(value) AS total, COUNT(*)
+            FROM finals
+            WHERE recency = 1
+            GROUP BY account_id
+            ORDER BY total DESC
+        """, params)
+        rows = [
+            {"account_id": account_id, "lord_name": lord_name, "total": total, "seasons": seasons}
+            for account_id, lord_name, _, total, seasons in c.fetchall()
+        ]
+    finally:
+        conn.close()
+    # Entries from an older epoch are stale
+    if any(entry[0] != epoch for entry in _cross_season_cache.values()):
+        _cross_season_cache.clear()
+    _cross_season_cache[key] = (epoch, rows)
+    return rows
+
+# ============================================================
+# RANK HISTORY
+# ============================================================
+# rank_history keeps every lord's rank in each RANK_STATS stat on every data
+# date (their latest value on or before it), written by one set-based RANK()
+# pass per batch of dates after refreshes and history loads. !progress, !q and
+# the leaderboards read the latest ranked date and the one before it for
+# rank movement instead of ranking on every command.
+
+def db_fill_rank_history(season_id, account_ids, since=None):
+    """
+    Rank account_ids on every data date of the season that has no ranks yet,
+    plus all dates from `since` on (their data changed). Returns the dates ranked.
+    """
+    account_ids = list(account_ids)
+    if not account_ids:
+        return []
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute("""
+        SELECT data_date FROM alliance_daily
+        WHERE season_id = ?
+          AND (data_date >= ? OR data_date NOT IN (SELECT DISTINCT data_date FROM rank_history WHERE season_id = ?))
+        ORDER BY data_date
+    """, (season_id, since or "9999-12-31", season_id))
+    dates = [row[0] for row in c.fetchall()]
+    if not dates:
+        conn.close()
+        return []
+    
+    date_placeholders = ",".join("?" * len(dates))
+    account_placeholders = ",".join("?" * len(account_ids))
+    unpivot = " UNION ALL ".join(
+        f"SELECT as_of, account_id, '{stat}' AS stat, {stat} AS value, "
+        f"{f'ABS({stat})' if stat in RANK_ABSOLUTE_STATS else stat} AS sort_value FROM latest"
+        for stat in RANK_STATS
+    )
+    c.execute(f"DELETE FROM rank_history WHERE season_id = ? AND data_date IN ({date_placeholders})", (season_id, *dates))
+    c.execute(f"""
+        INSERT INTO rank_history (season_id, data_date, stat, account_id, rank, total, value)
+        WITH target(as_of) AS (VALUES {",".join(["(?)"] * len(dates))}),
+        spans AS (
+            SELECT account_id, data_date,
+                   LEAD(data_date) OVER (PARTITION BY account_id ORDER BY data_date) AS next_date,
+                   {", ".join(RANK_STATS)}
+            FROM daily_deltas
+            WHERE season_id = ? AND account_id IN ({account_placeholders})
+        ),
+        latest AS (
+            SELECT t.as_of, s.* FROM target t
+            JOIN spans s ON s.data_date <= t.as_of AND (s.next_date IS NULL OR s.next_date > t.as_of)
+        ),
+        unpivot AS ({unpivot})
+        SELECT ?, as_of, stat, account_id,
+               RANK() OVER (PARTITION BY as_of, stat ORDER BY sort_value DESC),
+               COUNT(*) OVER (PARTITION BY as_of, stat),
+               value
+        FROM unpivot
+    """, (*dates, season_id, *account_ids, season_id))
+    rows = c.rowcount
+    conn.commit()
+    conn.close()
+    log_info(f"[RANK HISTORY] Ranked {len(dates)} date(s) of season {season_id} ({rows} rows)")
+    return dates
+
+def db_get_rank_history(season_id, stat_keys, account_id=None):
+    """
+    {stat: {account_id: (rank, total, change)}} on the season's latest ranked
+    date, change being places gained since the previous ranked date (None if
+    the lord wasn't ranked then). Empty when the season has no rank history.
+    """
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute("SELECT MAX(data_date) FROM rank_history WHERE season_id = ?", (season_id,))
+    latest = c.fetchone()[0]
+    if not latest:
+        conn.close()
+        return {}
+    c.execute("SELECT MAX(data_date) FROM rank_history WHERE season_id = ? AND data_date < ?", (season_id, latest))
+    previous = c.fetchone()[0]
+    
+    query = f"""
+        SELECT cur.stat, cur.account_id, cur.rank, cur.total, prev.rank
+        FROM rank_history cur
+        LEFT JOIN rank_history prev
+          ON prev.season_id = cur.season_id AND prev.data_date = ?
+         AND prev.stat = cur.stat AND prev.account_id = cur.account_id
+        WHERE cur.season_id = ? AND cur.data_date = ? AND cur.stat IN ({",".join("?" * len(stat_keys))})
+    """
+    params = [previous, season_id, latest, *stat_keys]
+    if account_id is not None:
+        query += " AND cur.account_id = ?"
+        params.append(account_id)
+    c.execute(query, params)
+    history = {}
+    for stat, account, rank, total, prev_rank in c.fetchall():
+        history.setdefault(stat, {})[account] = (rank, total, prev_rank - rank if prev_rank else None)
+    conn.close()
+    return history
+
+def rank_arrow(change):
+    """'↑2' / '↓1' for a rank change, '' when unchanged or unknown"""
+    if not change:
+        return ""
+    return f"↑{change}" if change > 0 else f"↓{-change}"
+
+def db_get_lord(account_id):
+    try:
+        conn = sqlite3.connect(DB)
+        try:
+            c = conn.cursor()
+            c.execute("SELECT id, lord_name, account_id FROM lords WHERE account_id=?", (account_id,))
+            row = c.fetchone()
+            return row
+        finally:
+            conn.close()
+    except Exception as e:
+        log_error(f"[DB GET LORD] Error: {e}")
+        return None
+
 # ============================================================
 # CALLOFSTATS LOGIN & STATS FETCHING
 # ============================================================
@@ -1407,7 +2767,7 @@ async def get_callofstats_session():
         session = aiohttp.ClientSession(timeout=timeout)
         
         log_info("[CALLOFSTATS] Logging in...")
-        async with session.post(
+        async with cos_slot(), session.post(
             "https://callofstats.com/login",
             data={"username": username, "password": password},
             allow_redirects=True
@@ -1478,7 +2838,7 @@ async def fetch_stats_for_account(account_id, start_date, end_date, skip_cache=F
         url = f"https://callofstats.com/lord/{account_id}?start_date={start_date_formatted}&end_date={end_date_formatted}"
         log_info(f"[CALLOFSTATS] Fetching: {url}")
         
-        async with session.get(url, allow_redirects=True) as resp:
+        async with cos_slot(), session.get(url, allow_redirects=True) as resp:
             if resp.status == 200:
                 html = await resp.text()
                 log_info(f"[CALLOFSTATS] Fetch successful ({len(html)} bytes)")
@@ -1665,6 +3025,456 @@ intents.message_content = True
 bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
 bot.active_edit = None
 
+# ============================================================
+# ROSTER INDEX
+# ============================================================
+# Lords are numeric roles named after their Call of Stats account ID. Rather
+# than scanning guild.roles / member.roles on every command, the mapping
+# account_id <-> role <-> member is built once in on_ready and kept current
+# from role and member gateway events. Usernames live in the account registry.
+
+class RosterIndex:
+    def __init__(self):
+        self.guild_id = None
+        self.lords = []                 # [{"name", "account_id", "role"}] in guild.roles order
+        self.role_by_account = {}       # account_id -> Role
+        self.account_by_member = {}     # member id -> account_id (lowest numeric role)
+        self.members_by_account = {}    # account_id -> {member id}
+
+    def covers(self, guild):
+        return guild is not None and self.guild_id == guild.id
+
+    def rebuild(self, guild):
+        self.guild_id = guild.id
+        self.lords = [
+            {"name": role.name, "account_id": role.name, "role": role}
+            for role in guild.roles
+            if role.name.isdigit() and role.name != "@everyone"
+        ]
+        self.role_by_account = {lord["account_id"]: lord["role"] for lord in self.lords}
+        self.account_by_member = {}
+        self.members_by_account = {}
+        for member in guild.members:
+            self.update_member(member)
+        log_info(f"[ROSTER] Indexed {len(self.lords)} lords, {len(self.account_by_member)} linked members")
+
+    def update_member(self, member):
+        self.remove_member(member.id)
+        account_id = next((r.name for r in member.roles if r.name.isdigit()), None)
+        if account_id:
+            self.account_by_member[member.id] = account_id
+            self.members_by_account.setdefault(account_id, set()).add(member.id)
+
+    def remove_member(self, member_id):
+        account_id = self.account_by_member.pop(member_id, None)
+        if account_id:
+            self.members_by_account.get(account_id, set()).discard(member_id)
+
+roster = RosterIndex()
+
+def get_all_lords_from_guild(guild):
+    """Get all numeric roles (account IDs) from the guild"""
+    if not roster.covers(guild):
+        roster.rebuild(guild)
+    return list(roster.lords)
+
+def get_member_account_id(guild, member_id):
+    """Account ID from a member's numeric role, else their registry entry, or None"""
+    account_id = None
+    if guild is not None:
+        if not roster.covers(guild):
+            roster.rebuild(guild)
+        account_id = roster.account_by_member.get(member_id)
+    if not account_id:
+        entry = registry.by_discord_id.get(member_id)
+        account_id = entry["account_id"] if entry else None
+    return account_id
+
+@bot.event
+async def on_member_update(before, after):
+    if roster.covers(after.guild) and before.roles != after.roles:
+        roster.update_member(after)
+
+@bot.event
+async def on_member_remove(member):
+    if roster.covers(member.guild):
+        roster.remove_member(member.id)
+
+@bot.event
+async def on_guild_role_create(role):
+    if roster.covers(role.guild) and role.name.isdigit():
+        roster.rebuild(role.guild)
+
+@bot.event
+async def on_guild_role_delete(role):
+    if roster.covers(role.guild) and role.name.isdigit():
+        roster.rebuild(role.guild)
+
+@bot.event
+async def on_guild_role_update(before, after):
+    if roster.covers(after.guild) and (before.name != after.name or before.position != after.position) \
+            and (before.name.isdigit() or after.name.isdigit()):
+        roster.rebuild(after.guild)
+
+
+# ============================================================
+# ACCOUNT REGISTRY
+# ============================================================
+# Usernames, aliases and Discord links for accounts, editable live with
+# !registry. Rows with an account_id are always tracked (even without a
+# numeric role); rows without one resolve through the member's numeric role.
+
+def db_get_accounts():
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute("SELECT id, username, discord_id, account_id, aliases FROM accounts ORDER BY username COLLATE NOCASE")
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def db_upsert_account(username, account_id=None, discord_id=None):
+    """
+    Create or update the registry entry for `username`; None leaves a field
+    unchanged. Raises sqlite3.IntegrityError (with nothing changed) when the
+    account or Discord ID already belongs to another entry.
+    """
+    conn = sqlite3.connect(DB)
+    try:
+        c = conn.cursor()
+        c.execute("SELECT id FROM accounts WHERE username=? COLLATE NOCASE", (username,))
+        row = c.fetchone()
+        if row:
+            if account_id is not None:
+                c.execute("UPDATE accounts SET account_id=? WHERE id=?", (account_id or None, row[0]))
+            if discord_id is not None:
+                c.execute("UPDATE accounts SET discord_id=? WHERE id=?", (discord_id or None, row[0]))
+        else:
+            c.execute(
+                "INSERT INTO accounts (username, discord_id, account_id, aliases, created_at) VALUES (?, ?, ?, '', ?)",
+                (username, discord_id or None, account_id or None, datetime.utcnow().isoformat())
+            )
+        conn.commit()
+    finally:
+        conn.close()
+    silent_backup()
+
+def db_set_account_aliases(username, aliases):
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute("UPDATE accounts SET aliases=? WHERE username=? COLLATE NOCASE", (",".join(aliases), username))
+    updated = c.rowcount
+    conn.commit()
+    conn.close()
+    silent_backup()
+    return updated > 0
+
+def db_delete_account(username):
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute("DELETE FROM accounts WHERE username=? COLLATE NOCASE", (username,))
+    deleted = c.rowcount
+    conn.commit()
+    conn.close()
+    silent_backup()
+    return deleted > 0
+
+class AccountRegistry:
+    """In-memory index over the accounts table"""
+
+    def __init__(self):
+        self.entries = []
+        self.by_name = {}        # lowercased username/alias -> entry
+        self.by_discord_id = {}
+        self.by_account_id = {}
+
+    def load(self):
+        self.entries = [
+            {"id": r[0], "username": r[1], "discord_id": r[2], "account_id": r[3],
+             "aliases": [a for a in (r[4] or "").split(",") if a]}
+            for r in db_get_accounts()
+        ]
+        self.by_name, self.by_discord_id, self.by_account_id = {}, {}, {}
+        for entry in self.entries:
+            for name in [entry["username"], *entry["aliases"]]:
+                self.by_name.setdefault(name.lower(), entry)
+            if entry["discord_id"]:
+                self.by_discord_id[entry["discord_id"]] = entry
+            if entry["account_id"]:
+                self.by_account_id[entry["account_id"]] = entry
+        log_info(f"[REGISTRY] Loaded {len(self.entries)} accounts")
+
+    def lookup(self, name):
+        return self.by_name.get(name.lower())
+
+    def usernames(self):
+        return [e["username"] for e in self.entries]
+
+    def tracked_account_ids(self):
+        """Accounts tracked regardless of guild roles"""
+        return [e["account_id"] for e in self.entries if e["account_id"]]
+
+registry = AccountRegistry()
+registry.load()
+
+def resolve_registry_entry(guild, entry):
+    """Account ID for a registry entry: its own, or its member's numeric role"""
+    if entry["account_id"]:
+        return entry["account_id"]
+    if entry["discord_id"]:
+        return get_member_account_id(guild, entry["discord_id"])
+    return None
+
+def get_account_id_for_name(guild, name):
+    entry = registry.lookup(name)
+    return resolve_registry_entry(guild, entry) if entry else None
+
+def get_tracked_account_ids(guild):
+    """Every account to track: numeric guild roles + registry accounts, deduplicated"""
+    account_ids = [lord["account_id"] for lord in get_all_lords_from_guild(guild)] if guild else []
+    return list(dict.fromkeys(account_ids + registry.tracked_account_ids()))
+
+
+@bot.command(name="registry")
+async def registry_cmd(ctx, action: str = None, username: str = None, *args):
+    """
+    [ADMIN] Edit the account registry.
+
+    Usage:
+      !registry                                   (list entries)
+      !registry set <username> [account_id] [@member]
+      !registry alias <username> <alias> [alias...]
+      !registry unalias <username> <alias>
+      !registry remove <username>
+    """
+    if ctx.author.id != OWNER_ID and not ctx.author.guild_permissions.administrator:
+        return await ctx.send("❌ Admin only.")
+
+    action = (action or "list").lower()
+
+    if action == "list":
+        output = "```📇 Account Registry\n\n"
+        output += f"{'Username':<16} {'Account':<10} {'Discord':<20} Aliases\n"
+        output += "-" * 60 + "\n"
+        for e in registry.entries:
+            account = e["account_id"] or ("(role)" if e["discord_id"] else "—")
+            linked = get_member_account_id(ctx.guild, e["discord_id"]) if e["discord_id"] and not e["account_id"] else None
+            if linked:
+                account = f"{linked}*"
+            output += f"{e['username'][:16]:<16} {account:<10} {str(e['discord_id'] or '—'):<20} {', '.join(e['aliases']) or '—'}\n"
+        if not registry.entries:
+            output += "(empty)\n"
+        output += "\n* = from the member's numeric role```"
+        return await ctx.send(output)
+
+    if not username:
+        return await ctx.send("❌ Usage: `!registry set|alias|unalias|remove <username> ...`")
+
+    if action == "set":
+        account_id = discord_id = None
+        for arg in args:
+            mention = arg.strip("<@!>")
+            if arg.startswith("<@") and mention.isdigit():
+                discord_id = int(mention)
+            elif arg.isdigit() and len(arg) >= 15:
+                discord_id = int(arg)
+            elif arg.isdigit():
+                account_id = arg
+            elif arg == "-":
+                account_id = ""
+            else:
+                return await ctx.send(f"❌ Don't know what `{arg}` is — use an account ID, a @mention or `-` to clear the account ID.")
+        try:
+            db_upsert_account(username, account_id, discord_id)
+        except sqlite3.IntegrityError:
+            registry.load()
+            owner = registry.by_account_id.get(account_id) if account_id else None
+            if owner and owner["username"].lower() != username.lower():
+                return await ctx.send(f"❌ Account {account_id} already belongs to **{owner['username']}**.")
+            owner = registry.by_discord_id.get(discord_id) if discord_id else None
+            if owner and owner["username"].lower() != username.lower():
+                return await ctx.send(f"❌ <@{discord_id}> is already linked to **{owner['username']}**.")
+            return await ctx.send("❌ That account or Discord ID is already used by another entry.")
+        registry.load()
+        entry = registry.lookup(username)
+        discord_txt = f"<@{entry['discord_id']}>" if entry["discord_id"] else "—"
+        return await ctx.send(
+            f"✅ **{entry['username']}** → account {entry['account_id'] or '(from role)'}, discord {discord_txt}"
+        )
+
+    entry = registry.lookup(username)
+    if not entry:
+        return await ctx.send(f"❌ '{username}' is not in the registry.")
+
+    if action == "alias":
+        if not args:
+            return await ctx.send("❌ Usage: `!registry alias <username> <alias> [alias...]`")
+        taken = [a for a in args if registry.lookup(a) and registry.lookup(a) is not entry]
+        if taken:
+            return await ctx.send(f"❌ Already in use: {', '.join(taken)}")
+        aliases = list(dict.fromkeys(entry["aliases"] + [a.lower() for a in args]))
+        db_set_account_aliases(entry["username"], aliases)
+    elif action == "unalias":
+        aliases = [a for a in entry["aliases"] if a.lower() not in {x.lower() for x in args}]
+        db_set_account_aliases(entry["username"], aliases)
+    elif action == "remove":
+        db_delete_account(entry["username"])
+        registry.load()
+        return await ctx.send(f"🗑️ Removed **{entry['username']}** from the registry.")
+    else:
+        return await ctx.send("❌ Unknown action. Use `set`, `alias`, `unalias` or `remove`.")
+
+    registry.load()
+    entry = registry.lookup(entry["username"])
+    await ctx.send(f"✅ **{entry['username']}** aliases: {', '.join(entry['aliases']) or '—'}")
+
+
+# ============================================================
+# LORD NAME INDEX
+# ============================================================
+# In-game lord names (from saved snapshots) -> account IDs, so commands accept
+# e.g. `!progress Drakk`. Names are persisted in lord_names and indexed in
+# memory by trigram and prefix; db_save_season_progress keeps both current.
+
+NAME_MATCH_MIN_SCORE = 0.3
+NAME_SUGGESTIONS = 5
+
+def db_get_lord_names():
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM lord_names")
+    if c.fetchone()[0] == 0:
+        # First run: backfill from the newest snapshot per account
+        c.execute("""
+            INSERT OR REPLACE INTO lord_names (account_id, lord_name, name_key, updated_at)
+            SELECT account_id, lord_name, lower(lord_name), created_at FROM season_progress
+            WHERE id IN (SELECT MAX(id) FROM season_progress GROUP BY account_id)
+              AND lord_name IS NOT NULL AND lord_name != '' AND lord_name != 'Unknown'
+        """)
+        conn.commit()
+    c.execute("SELECT account_id, lord_name FROM lord_names")
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def db_set_lord_name(account_id, lord_name):
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute(
+        "INSERT OR REPLACE INTO lord_names (account_id, lord_name, name_key, updated_at) VALUES (?, ?, ?, ?)",
+        (account_id, lord_name, lord_name.lower(), datetime.utcnow().isoformat())
+    )
+    conn.commit()
+    conn.close()
+
+class LordNameIndex:
+    def __init__(self):
+        self.names = {}          # account_id -> lord_name
+        self.trigrams = {}       # trigram -> {account_id}
+        self.by_key = []         # sorted [(name_key, account_id)] for prefix search
+
+    @staticmethod
+    def _grams(key):
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def load(self):
+        self.__init__()
+        for account_id, lord_name in db_get_lord_names():
+            self.add(account_id, lord_name)
+        log_info(f"[NAMES] Indexed {len(self.names)} lord names")
+
+    def add(self, account_id, lord_name):
+        """Index (or re-index) a name. Returns True if it changed."""
+        old = self.names.get(account_id)
+        if old == lord_name:
+            return False
+        if old is not None:
+            old_key = old.lower()
+            for gram in self._grams(old_key):
+                self.trigrams.get(gram, set()).discard(account_id)
+            i = bisect.bisect_left(self.by_key, (old_key, account_id))
+            if i < len(self.by_key) and self.by_key[i] == (old_key, account_id):
+                del self.by_key[i]
+        key = lord_name.lower()
+        self.names[account_id] = lord_name
+        for gram in self._grams(key):
+            self.trigrams.setdefault(gram, set()).add(account_id)
+        bisect.insort(self.by_key, (key, account_id))
+        return True
+
+    def search(self, query, limit=NAME_SUGGESTIONS):
+        """Ranked [(score, account_id, lord_name)]: exact 1.0, prefix 0.9, substring 0.8, else trigram overlap"""
+        key = query.strip().lower()
+        if not key:
+            return []
+        scores = {}
+
+        i = bisect.bisect_left(self.by_key, (key,))
+        while i < len(self.by_key) and self.by_key[i][0].startswith(key):
+            name_key, account_id = self.by_key[i]
+            scores[account_id] = 1.0 if name_key == key else 0.9
+            i += 1
+
+        if len(scores) >= limit:
+            return sorted(((s, a, self.names[a]) for a, s in scores.items()), key=lambda r: (-r[0], r[2].lower()))[:limit]
+
+        grams = self._grams(key)
+        overlap = collections.Counter()
+        for gram in grams:
+            overlap.update(self.trigrams.get(gram, ()))
+        # A substring of 3+ characters shares at least one trigram, so every
+        # substring match is a candidate here - check it before the overlap cutoff
+        min_common = NAME_MATCH_MIN_SCORE * len(grams)
+        for account_id, common in overlap.items():
+            if account_id in scores:
+                continue
+            if key in self.names[account_id].lower():
+                scores[account_id] = 0.8
+            elif common >= min_common:
+                union = len(grams | self._grams(self.names[account_id].lower()))
+                scores[account_id] = common / union
+
+        ranked = sorted(
+            ((s, a, self.names[a]) for a, s in scores.items() if s >= NAME_MATCH_MIN_SCORE),
+            key=lambda r: (-r[0], r[2].lower())
+        )
+        return ranked[:limit]
+
+    def resolve(self, query):
+        """The one account a name clearly refers to, or None if unknown/ambiguous"""
+        matches = self.search(query)
+        if not matches:
+            return None
+        exact = [m for m in matches if m[0] == 1.0]
+        if exact:
+            return exact[0][1] if len(exact) == 1 else None
+        for tier in (0.9, 0.8):
+            strong = [m for m in matches if m[0] >= tier]
+            if strong:
+                return strong[0][1] if len(strong) == 1 else None
+        if len(matches) == 1 or matches[0][0] - matches[1][0] >= 0.15:
+            return matches[0][1] if matches[0][0] >= 0.5 else None
+        return None
+
+lord_names = LordNameIndex()
+lord_names.load()
+
+def note_lord_name(account_id, lord_name):
+    """Keep the name index current as snapshots are saved"""
+    if not lord_name or lord_name == "Unknown" or lord_name == account_id:
+        return
+    if lord_names.add(account_id, lord_name):
+        db_set_lord_name(account_id, lord_name)
+
+def account_not_found_message(user_input):
+    """'Could not find' with ranked lord-name suggestions"""
+    matches = lord_names.search(user_input) if user_input else []
+    if not matches:
+        return f"❌ Could not find '{user_input}'."
+    suggestions = ", ".join(f"**{name}** (`{account_id}`)" for _, account_id, name in matches)
+    return f"❌ '{user_input}' is ambiguous or unknown. Did you mean: {suggestions}?"
+
+
 # ============================================================
 # BACKUP SLASH COMMANDS (OWNER ONLY)
 # ============================================================
@@ -1720,8 +3530,8 @@ async def forcebackup(inter):
     if inter.user.id != OWNER_ID:
         return await inter.response.send_message("❌ Owner only.", ephemeral=True)
 
-    make_backup()
-    await inter.response.send_message("✅ Backup created.", ephemeral=True)
+    job_id = db_enqueue_job("backup", dedupe=True)
+    await inter.response.send_message(f"✅ Backup queued (job #{job_id}).", ephemeral=True)
 
 @bot.tree.command(name="restorebackup", description="Restore a backup")
 async def restorebackup(inter):
@@ -1733,48 +3543,548 @@ async def restorebackup(inter):
         reverse=True
     )
 
-    if not files:
-        return await inter.response.send_message("❌ No backups found.", ephemeral=True)
+    if not files:
+        return await inter.response.send_message("❌ No backups found.", ephemeral=True)
+
+    await inter.response.defer(ephemeral=True)  # ✅ CRITICAL
+
+    select = Select(
+        placeholder="Select a backup to restore",
+        options=[discord.SelectOption(label=f, value=f) for f in files]
+    )
+
+    async def cb(i):
+        await i.response.defer(ephemeral=True)
+
+        path = os.path.join(BACKUP_DIR, select.values[0])
+
+        with zipfile.ZipFile(path, "r") as z:
+            z.extractall(".")
+
+        await i.followup.send(
+            f"♻️ Restored `{select.values[0]}`. Restarting bot...",
+            ephemeral=True
+        )
+
+        await asyncio.sleep(2)
+       # auto-restart on Koyeb
+
+    select.callback = cb
+    view = View(timeout=60)
+    view.add_item(select)
+
+    await inter.followup.send("Choose a backup to restore:", view=view, ephemeral=True)
+
+# ============================================================
+# BACKGROUND JOB QUEUE (SQLITE-BACKED)
+# ============================================================
+# Long-running work (refreshes, backfills, backups, KvK fetches) is queued in
+# the jobs table and executed by lane workers, so it survives restarts, is
+# visible in !jobs and never runs two heavy jobs at the same time.
+
+JOB_LEASE_SECONDS = 300       # A running job must heartbeat within this window
+JOB_RETRY_BASE_SECONDS = 60   # Retry backoff: 1m, 2m, 4m, ...
+JOB_POLL_SECONDS = 5          # Idle worker poll interval
+JOB_KEEP_DAYS = 7             # Finished jobs older than this are pruned
+
+JOB_PRIORITIES = {
+    "kvk_fetch": 30,
+    "backup": 20,
+    "refresh_all": 20,
+    "forcefetch": 10,
+    "anomaly_report": 10,
+    "loadhistory": 0,
+}
+
+# Attempts per job type (default 3). These post progress and results as they
+# go and start over from scratch, so a retry would repeat all of it.
+JOB_MAX_ATTEMPTS = {
+    "forcefetch": 1,
+    "loadhistory": 1,
+}
+
+# Each lane has ONE worker: jobs in the same lane are serialised. Jobs a user
+# is waiting on get a lane of their own, so a backup never delays them.
+JOB_LANES = {
+    "heavy": ["refresh_all", "forcefetch", "loadhistory"],
+    "interactive": ["kvk_fetch"],
+    "light": ["backup", "anomaly_report"],
+}
+
+# Upstream Call of Stats priority used while each job type runs
+JOB_COS_PRIORITIES = {
+    "refresh_all": COS_PRIORITY_REFRESH,
+    "forcefetch": COS_PRIORITY_REFRESH,
+    "loadhistory": COS_PRIORITY_BACKFILL,
+}
+
+JOB_HANDLERS = {}
+_job_wakeup = asyncio.Event()
+_job_waiters = {}
+_job_worker_tasks = {}
+
+def job_handler(job_type):
+    """Register an async handler(payload) -> result for a job type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+def db_enqueue_job(job_type, payload=None, priority=None, delay_seconds=0, max_attempts=None, dedupe=False):
+    """
+    Queue a background job. Returns the job id.
+    With dedupe=True an identical job that is still queued is reused instead.
+    """
+    payload_json = json.dumps(payload or {}, sort_keys=True)
+    if priority is None:
+        priority = JOB_PRIORITIES.get(job_type, 0)
+    if max_attempts is None:
+        max_attempts = JOB_MAX_ATTEMPTS.get(job_type, 3)
+    now = datetime.utcnow()
+    run_after = (now + timedelta(seconds=delay_seconds)).isoformat()
+
+    conn = sqlite3.connect(DB)
+    try:
+        c = conn.cursor()
+        if dedupe:
+            c.execute(
+                "SELECT id FROM jobs WHERE job_type=? AND payload=? AND status='queued' LIMIT 1",
+                (job_type, payload_json)
+            )
+            row = c.fetchone()
+            if row:
+                return row[0]
+        c.execute(
+            "INSERT INTO jobs (job_type, payload, priority, status, attempts, max_attempts, run_after, created_at) "
+            "VALUES (?, ?, ?, 'queued', 0, ?, ?, ?)",
+            (job_type, payload_json, priority, max_attempts, run_after, now.isoformat())
+        )
+        job_id = c.lastrowid
+        conn.commit()
+    finally:
+        conn.close()
+
+    log_info(f"[JOBS] Queued #{job_id} {job_type} (priority {priority})")
+    _job_wakeup.set()
+    return job_id
+
+def db_claim_job(job_types):
+    """
+    Atomically claim the next runnable job for the given types.
+    Running jobs whose lease expired (worker died) are claimable again if they
+    have attempts left.
+    Returns (id, job_type, payload_dict, attempts, max_attempts) or None.
+    """
+    now = datetime.utcnow()
+    placeholders = ",".join("?" for _ in job_types)
+    conn = sqlite3.connect(DB, isolation_level=None)
+    try:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        c.execute(f"""
+            SELECT id, job_type, payload, attempts, max_attempts FROM jobs
+            WHERE job_type IN ({placeholders})
+              AND ((status='queued' AND run_after <= ?)
+                   OR (status='running' AND lease_until < ? AND attempts < max_attempts))
+            ORDER BY priority DESC, id ASC
+            LIMIT 1
+        """, (*job_types, now.isoformat(), now.isoformat()))
+        row = c.fetchone()
+        if not row:
+            c.execute("COMMIT")
+            return None
+        job_id, job_type, payload, attempts, max_attempts = row
+        c.execute(
+            "UPDATE jobs SET status='running', attempts=?, started_at=?, lease_until=? WHERE id=?",
+            (attempts + 1, now.isoformat(),
+             (now + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat(), job_id)
+        )
+        c.execute("COMMIT")
+        return job_id, job_type, json.loads(payload or "{}"), attempts + 1, max_attempts
+    except Exception as e:
+        log_error(f"[JOBS] Claim error: {e}")
+        try:
+            c.execute("ROLLBACK")
+        except Exception:
+            pass
+        return None
+    finally:
+        conn.close()
+
+def db_extend_job_lease(job_id):
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    lease = (datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat()
+    c.execute("UPDATE jobs SET lease_until=? WHERE id=? AND status='running'", (lease, job_id))
+    conn.commit()
+    conn.close()
+
+def db_finish_job(job_id, result=None):
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute(
+        "UPDATE jobs SET status='done', finished_at=?, lease_until=NULL, result=?, last_error=NULL WHERE id=?",
+        (datetime.utcnow().isoformat(), json.dumps(result, default=str), job_id)
+    )
+    conn.commit()
+    conn.close()
+
+def db_fail_job(job_id, error, attempts, max_attempts):
+    """Requeue with exponential backoff, or mark failed once attempts are used up. Returns final status."""
+    now = datetime.utcnow()
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    if attempts < max_attempts:
+        delay = JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+        c.execute(
+            "UPDATE jobs SET status='queued', run_after=?, lease_until=NULL, last_error=? WHERE id=?",
+            ((now + timedelta(seconds=delay)).isoformat(), error, job_id)
+        )
+        status = "queued"
+    else:
+        c.execute(
+            "UPDATE jobs SET status='failed', finished_at=?, lease_until=NULL, last_error=? WHERE id=?",
+            (now.isoformat(), error, job_id)
+        )
+        status = "failed"
+    conn.commit()
+    conn.close()
+    return status
+
+def db_requeue_orphaned_jobs():
+    """On startup, any job still marked running belonged to the previous process"""
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute(
+        "UPDATE jobs SET status='failed', finished_at=?, lease_until=NULL, last_error='Interrupted by restart' "
+        "WHERE status='running' AND attempts >= max_attempts",
+        (datetime.utcnow().isoformat(),)
+    )
+    interrupted = c.rowcount
+    c.execute("UPDATE jobs SET status='queued', lease_until=NULL WHERE status='running'")
+    count = c.rowcount
+    cutoff = (datetime.utcnow() - timedelta(days=JOB_KEEP_DAYS)).isoformat()
+    c.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,))
+    conn.commit()
+    conn.close()
+    if count:
+        log_info(f"[JOBS] Requeued {count} job(s) interrupted by restart")
+    if interrupted:
+        log_info(f"[JOBS] {interrupted} job(s) interrupted by restart had no attempts left - marked failed")
+
+def db_get_job(job_id):
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute("SELECT status, result, last_error FROM jobs WHERE id=?", (job_id,))
+    row = c.fetchone()
+    conn.close()
+    return row
+
+def db_get_jobs_overview(limit=10):
+    """Return (running, queued, finished) job rows for !jobs"""
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    cols = "id, job_type, status, attempts, max_attempts, created_at, started_at, finished_at, run_after, last_error"
+    c.execute(f"SELECT {cols} FROM jobs WHERE status='running' ORDER BY started_at ASC")
+    running = c.fetchall()
+    c.execute(f"SELECT {cols} FROM jobs WHERE status='queued' ORDER BY priority DESC, id ASC LIMIT ?", (limit,))
+    queued = c.fetchall()
+    c.execute(f"SELECT {cols} FROM jobs WHERE status IN ('done', 'failed') ORDER BY finished_at DESC LIMIT ?", (limit,))
+    finished = c.fetchall()
+    conn.close()
+    return running, queued, finished
+
+async def wait_for_job(job_id, timeout=None):
+    """
+    Wait until a job finishes. Returns (status, result).
+    status is 'done', 'failed' or 'timeout'.
+    """
+    row = db_get_job(job_id)
+    if row and row[0] in ("done", "failed"):
+        return row[0], json.loads(row[1]) if row[1] else None
+
+    fut = _job_waiters.get(job_id)
+    if fut is None:
+        fut = asyncio.get_running_loop().create_future()
+        _job_waiters[job_id] = fut
+    try:
+        return await asyncio.wait_for(asyncio.shield(fut), timeout)
+    except asyncio.TimeoutError:
+        return "timeout", None
+
+def _resolve_job_waiter(job_id, status, result):
+    fut = _job_waiters.pop(job_id, None)
+    if fut and not fut.done():
+        fut.set_result((status, result))
+
+async def _job_heartbeat(job_id):
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            db_extend_job_lease(job_id)
+        except Exception as e:
+            log_error(f"[JOBS] Lease extend failed for #{job_id}: {e}")
+
+async def job_worker(lane):
+    """Run jobs of one lane, one at a time, forever"""
+    job_types = JOB_LANES[lane]
+    log_info(f"[JOBS] Worker '{lane}' started ({', '.join(job_types)})")
+    while True:
+        try:
+            job = db_claim_job(job_types)
+            if not job:
+                _job_wakeup.clear()
+                try:
+                    await asyncio.wait_for(_job_wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, job_type, payload, attempts, max_attempts = job
+            handler = JOB_HANDLERS.get(job_type)
+            if not handler:
+                db_fail_job(job_id, f"No handler for {job_type}", max_attempts, max_attempts)
+                _resolve_job_waiter(job_id, "failed", None)
+                continue
+
+            log_info(f"[JOBS] Running #{job_id} {job_type} (attempt {attempts}/{max_attempts})")
+            _cos_priority.set(JOB_COS_PRIORITIES.get(job_type, COS_PRIORITY_INTERACTIVE))
+            started = datetime.utcnow()
+            heartbeat = asyncio.create_task(_job_heartbeat(job_id))
+            try:
+                result = await handler(payload)
+                db_finish_job(job_id, result)
+                _resolve_job_waiter(job_id, "done", result)
+                elapsed = (datetime.utcnow() - started).total_seconds()
+                log_info(f"[JOBS] Done #{job_id} {job_type} in {elapsed:.1f}s")
+            except Exception as e:
+                status = db_fail_job(job_id, f"{type(e).__name__}: {e}", attempts, max_attempts)
+                log_error(f"[JOBS] #{job_id} {job_type} failed (attempt {attempts}/{max_attempts}, now {status}): {e}")
+                if status == "failed":
+                    _resolve_job_waiter(job_id, "failed", None)
+            finally:
+                heartbeat.cancel()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log_error(f"[JOBS] Worker '{lane}' error: {e}")
+            await asyncio.sleep(JOB_POLL_SECONDS)
+
+def start_job_workers():
+    """Start one worker per lane (safe to call on every on_ready)"""
+    if not _job_worker_tasks:
+        try:
+            db_requeue_orphaned_jobs()
+        except Exception as e:
+            log_error(f"[JOBS] Startup requeue error: {e}")
+    for lane in JOB_LANES:
+        task = _job_worker_tasks.get(lane)
+        if task is None or task.done():
+            _job_worker_tasks[lane] = asyncio.create_task(job_worker(lane))
+
+def _fmt_duration(seconds):
+    seconds = int(max(seconds, 0))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{(seconds // 60) % 60:02d}m"
+
+@job_handler("backup")
+async def run_backup_job(payload):
+    path = make_backup()
+    await upload_backup(path)
+    return {"path": path}
+
+@job_handler("anomaly_report")
+async def run_anomaly_report_job(payload):
+    """Post newly quarantined snapshots to the backup channel"""
+    rows = db_get_quarantine(unreported_only=True)
+    if not rows:
+        return {"reported": 0}
+    channel = bot.get_channel(BACKUP_CHANNEL_ID)
+    if not channel:
+        raise RuntimeError(f"Channel {BACKUP_CHANNEL_ID} not found")
+    
+    lines = [
+        f"`#{row['id']}` **{row['lord_name']}** ({row['account_id']}) {row['data_date']}: {'; '.join(row['reasons'])}"
+        for row in rows
+    ]
+    description = ""
+    for i, line in enumerate(lines):
+        if len(description) + len(line) > 3800:
+            description += f"… and {len(lines) - i} more (`!quarantine`)"
+            break
+        description += line + "\n"
+    embed = discord.Embed(
+        title=f"🚧 {len(rows)} snapshot(s) quarantined",
+        description=description,
+        color=0xFFA500
+    )
+    embed.set_footer(text="!quarantine release <id> to store anyway  •  !quarantine drop <id> to discard")
+    await outbox_send(channel, embed)
+    db_mark_quarantine_reported([row["id"] for row in rows])
+    return {"reported": len(rows)}
+
+@bot.command(name="quarantine")
+async def quarantine_cmd(ctx, action: str = None, quarantine_id: int = None):
+    """[OWNER ONLY] Snapshots held back as anomalies. Usage: !quarantine | !quarantine release 12 | !quarantine drop 12"""
+    if ctx.author.id != OWNER_ID:
+        return await ctx.send("❌ Owner only.")
+    
+    if not action:
+        rows = db_get_quarantine()
+        if not rows:
+            return await ctx.send("✅ No quarantined snapshots.")
+        output = "🚧 Quarantined snapshots\n"
+        for row in rows:
+            output += f"#{row['id']} {row['lord_name']} {row['data_date']}: {'; '.join(row['reasons'])}\n"
+        for chunk in split_message(output, DISCORD_MESSAGE_LIMIT - 6):
+            await ctx.send(f"```{chunk}```")
+        return
+    
+    action = action.lower()
+    if action not in ("release", "drop") or quarantine_id is None:
+        return await ctx.send("❌ Usage: `!quarantine [release|drop] <id>`")
+    row = next((r for r in db_get_quarantine() if r["id"] == quarantine_id), None)
+    if not row:
+        return await ctx.send(f"❌ No quarantined snapshot #{quarantine_id}.")
+    
+    if action == "release":
+        saved = await asyncio.to_thread(
+            db_save_season_progress, row["season_id"], row["account_id"], row["lord_name"],
+            row["stats"], row["data_date"], False
+        )
+        if not saved:
+            return await ctx.send("❌ Error saving the snapshot.")
+    db_delete_quarantine(quarantine_id)
+    verb = "Stored" if action == "release" else "Discarded"
+    await ctx.send(f"✅ {verb} {row['lord_name']}'s snapshot for {row['data_date']}.")
+
+@bot.command(name="jobs")
+async def jobs_cmd(ctx):
+    """[OWNER ONLY] Show queued, running and recently finished background jobs"""
+    if ctx.author.id != OWNER_ID:
+        return await ctx.send("❌ Owner only.")
+
+    running, queued, finished = db_get_jobs_overview()
+    now = datetime.utcnow()
 
-    await inter.response.defer(ephemeral=True)  # ✅ CRITICAL
+    def ts(s):
+        return datetime.fromisoformat(s) if s else None
+
+    output = "```🧾 Background Jobs\n\n"
+    output += f"▶️ Running ({len(running)})\n"
+    for job_id, job_type, status, attempts, max_attempts, created, started, finished_at, run_after, err in running:
+        output += f"  #{job_id} {job_type} — {_fmt_duration((now - ts(started)).total_seconds())} so far (try {attempts}/{max_attempts})\n"
+    if not running:
+        output += "  —\n"
+
+    output += f"\n⏳ Queued ({len(queued)})\n"
+    for job_id, job_type, status, attempts, max_attempts, created, started, finished_at, run_after, err in queued:
+        wait = (now - ts(created)).total_seconds()
+        line = f"  #{job_id} {job_type} — waiting {_fmt_duration(wait)}"
+        if ts(run_after) > now:
+            line += f", retry in {_fmt_duration((ts(run_after) - now).total_seconds())}"
+        if err:
+            line += f" (last error: {err[:60]})"
+        output += line + "\n"
+    if not queued:
+        output += "  —\n"
+
+    output += "\n✅ Recently finished\n"
+    for job_id, job_type, status, attempts, max_attempts, created, started, finished_at, run_after, err in finished:
+        icon = "✅" if status == "done" else "❌"
+        took = _fmt_duration((ts(finished_at) - ts(started)).total_seconds()) if started and finished_at else "?"
+        queued_for = _fmt_duration((ts(started) - ts(created)).total_seconds()) if started else "?"
+        line = f"  {icon} #{job_id} {job_type} — ran {took}, queued {queued_for}, {finished_at[:16].replace('T', ' ')}"
+        if status == "failed" and err:
+            line += f"\n      {err[:80]}"
+        output += line + "\n"
+    if not finished:
+        output += "  —\n"
+
+    queued_cos = _cos_gate.queued_by_priority()
+    output += f"\n🌐 Call of Stats: {_cos_gate.in_flight}/{_cos_gate.capacity} in flight ({_cos_gate.reserved} reserved for interactive)\n"
+    for p, name in COS_PRIORITY_NAMES.items():
+        served = _cos_gate.served[p]
+        avg_wait = _cos_gate.total_wait[p] / served if served else 0
+        output += f"  {name}: {served} served, {queued_cos[p]} waiting, avg wait {avg_wait:.1f}s\n"
+
+    output += "```"
+    await ctx.send(output)
 
-    select = Select(
-        placeholder="Select a backup to restore",
-        options=[discord.SelectOption(label=f, value=f) for f in files]
-    )
 
-    async def cb(i):
-        await i.response.defer(ephemeral=True)
+# ============================================================
+# ON READY
+# ============================================================
 
-        path = os.path.join(BACKUP_DIR, select.values[0])
 
-        with zipfile.ZipFile(path, "r") as z:
-            z.extractall(".")
+# ============================================================
+# ACCOUNT FRESHNESS
+# ============================================================
+# Tracks the newest data date and a hash of the last snapshot fetched per
+# account, so a refresh only touches accounts that can actually have changed.
 
-        await i.followup.send(
-            f"♻️ Restored `{select.values[0]}`. Restarting bot...",
-            ephemeral=True
-        )
+FRESHNESS_INACTIVE_STREAK = 3        # Unchanged refreshes in a row before an account counts as inactive
+FRESHNESS_INACTIVE_PROBE_DAYS = 3    # Inactive accounts are only re-fetched this often
+FRESHNESS_LATE_RETRY_SECONDS = 1800  # Re-check accounts whose data wasn't published yet after this long
+FRESHNESS_LATE_MAX_RETRIES = 6
 
-        await asyncio.sleep(2)
-       # auto-restart on Koyeb
+def stats_content_hash(stats):
+    return hashlib.sha1(json.dumps(stats, sort_keys=True, default=str).encode()).hexdigest()
 
-    select.callback = cb
-    view = View(timeout=60)
-    view.add_item(select)
+def latest_published_data_date():
+    """Latest Call of Stats data date as YYYY-MM-DD, or None"""
+    last_known = db_get_last_known_data_date()
+    if not last_known:
+        return None
+    try:
+        return datetime.strptime(last_known, "%d/%m/%Y").date().isoformat()
+    except ValueError:
+        return None
 
-    await inter.followup.send("Choose a backup to restore:", view=view, ephemeral=True)
+def db_get_account_freshness(season_id):
+    """{account_id: (last_data_date, content_hash, unchanged_streak, last_checked_at)} for a season"""
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute(
+        "SELECT account_id, last_data_date, content_hash, unchanged_streak, last_checked_at FROM account_freshness WHERE season_id=?",
+        (season_id,)
+    )
+    rows = {r[0]: r[1:] for r in c.fetchall()}
+    conn.close()
+    return rows
 
-# ============================================================
-# ON READY
-# ============================================================
+def db_update_account_freshness(season_id, account_id, data_date, content_hash, unchanged_streak, changed):
+    now = datetime.utcnow().isoformat()
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO account_freshness (account_id, season_id, last_data_date, content_hash, unchanged_streak, last_checked_at, last_changed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(account_id) DO UPDATE SET
+            season_id = excluded.season_id,
+            last_data_date = excluded.last_data_date,
+            content_hash = excluded.content_hash,
+            unchanged_streak = excluded.unchanged_streak,
+            last_checked_at = excluded.last_checked_at,
+            last_changed_at = COALESCE(excluded.last_changed_at, account_freshness.last_changed_at)
+    """, (account_id, season_id, data_date, content_hash, unchanged_streak, now, now if changed else None))
+    conn.commit()
+    conn.close()
 
 
-async def force_refresh_all_stats():
+async def force_refresh_all_stats(account_ids=None, late_retry=0, progress=None):
     """
-    Force-fetch and cache all members' stats for current season.
+    Fetch and cache members' stats for current season.
     Called when Call of Stats update is detected.
     Saves progress to database for future !oldprogress queries.
+
+    Accounts already on the latest data date are skipped, accounts whose data
+    hasn't changed for a while are only probed every few days, and accounts
+    still on an older date are requeued as a delayed refresh for just them.
+    `progress` is an optional ProgressReporter to keep updated.
     """
     try:
         season = db_get_current_season()
@@ -1784,71 +4094,452 @@ async def force_refresh_all_stats():
         
         season_id, season_name, start_date, created_at = season
         today = date.today().isoformat()
+        expected_date = min(latest_published_data_date() or today, today)
         
         guild = bot.get_guild(bot.guilds[0].id) if bot.guilds else None
-        if not guild:
-            log_info("[CACHE REFRESH] No guild found")
-            return
-        
-        lords = get_all_lords_from_guild(guild)
-        accounts_to_refresh = []
-        
-        # Add lords from guild roles
-        for lord in lords:
-            accounts_to_refresh.append(lord["account_id"])
+        if account_ids is None:
+            if not guild:
+                log_info("[CACHE REFRESH] No guild found")
+                return
+            
+            # Guild lords + registry accounts (like Havi)
+            account_ids = get_tracked_account_ids(guild)
+        accounts_to_refresh = list(dict.fromkeys(account_ids))
         
-        # Add mapped accounts (like Havi)
-        for discord_id, account_id in DISCORD_TO_ACCOUNT_ID.items():
-            accounts_to_refresh.append(account_id)
+        freshness = db_get_account_freshness(season_id)
+        now = datetime.utcnow()
         
-        log_info(f"[CACHE REFRESH] Starting bulk refresh for {len(accounts_to_refresh)} members")
+        log_info(f"[CACHE REFRESH] Starting refresh for {len(accounts_to_refresh)} members (expecting {expected_date})")
         
         # Fetch and cache stats for each member
-        count = 0
-        for account_id in accounts_to_refresh:
+        count = unchanged = skipped_fresh = skipped_inactive = carried_forward = 0
+        late = []
+        saved = {}
+        saved_since = "9999-12-31"
+        if progress:
+            progress.total = len(accounts_to_refresh)
+        for index, account_id in enumerate(accounts_to_refresh):
+            if progress:
+                await progress.tick(done=index, detail=f"💾 Saved {count} | ⏭️ Skipped {skipped_fresh + skipped_inactive} | 🐢 Late {len(late)}")
+            known = freshness.get(account_id)
+            if known:
+                last_date, last_hash, streak, last_checked = known
+                if last_date and last_date >= expected_date:
+                    skipped_fresh += 1
+                    stored = db_get_latest_season_progress(season_id, account_id)
+                    if stored:
+                        set_cached_stats(account_id, start_date, today, stored)
+                    continue
+                if streak >= FRESHNESS_INACTIVE_STREAK and last_checked and \
+                        now - datetime.fromisoformat(last_checked) < timedelta(days=FRESHNESS_INACTIVE_PROBE_DAYS):
+                    skipped_inactive += 1
+                    stored = db_get_latest_season_progress(season_id, account_id)
+                    if stored and stored["data_date"] < expected_date:
+                        # Not re-fetched, but unchanged for a while: carry the last snapshot forward
+                        # so rankings, alliance totals and windows still have this lord on the day
+                        carried = {k: v for k, v in stored.items() if k != "data_date"}
+                        if db_save_season_progress(season_id, account_id, stored["lord_name"], carried, expected_date):
+                            saved_since = min(saved_since, expected_date)
+                            carried_forward += 1
+                            stored = {**carried, "data_date": expected_date}
+                    if stored:
+                        set_cached_stats(account_id, start_date, today, stored)
+                    continue
             try:
-                # Fetch today's stats (will fallback if needed)
-                stats_today, actual_date_today = await fetch_stats_with_fallback(account_id, start_date, today)
+                # Fetch the latest published day's stats (will fallback if needed)
+                stats_today, actual_date_today = await fetch_stats_with_fallback(account_id, start_date, expected_date)
                 
                 if stats_today:
+                    # SAVE to database with actual date (handles missed dates like 24/03);
+                    # quarantined snapshots must not reach the cache either
+                    if not db_save_season_progress(season_id, account_id, stats_today.get("lord_name", account_id), stats_today, actual_date_today):
+                        log_info(f"[FORCEFETCH] ⚠️ Not saved {account_id} for {actual_date_today} (quarantined or error)")
+                        continue
+                    saved_since = min(saved_since, actual_date_today)
+                    log_info(f"[FORCEFETCH] Saved today {account_id} for {actual_date_today}")
+                    
                     # Cache today's stats (in-memory)
                     set_cached_stats(account_id, start_date, today, stats_today)
                     log_info(f"[FORCEFETCH] Cached today {account_id} for {today}")
+                    saved[account_id] = actual_date_today
                     
-                    # SAVE to database with actual date (handles missed dates like 24/03)
-                    db_save_season_progress(season_id, account_id, stats_today.get("lord_name", account_id), stats_today, actual_date_today)
-                    log_info(f"[FORCEFETCH] Saved today {account_id} for {actual_date_today}")
+                    # Only a newer data date with identical stats counts towards inactivity;
+                    # the same old date again just means the account is published late
+                    content_hash = stats_content_hash(stats_today)
+                    changed = not known or known[1] != content_hash
+                    if changed:
+                        streak = 0
+                    elif actual_date_today != known[0]:
+                        streak = known[2] + 1
+                    else:
+                        streak = known[2]
+                    db_update_account_freshness(season_id, account_id, actual_date_today, content_hash, streak, changed)
+                    if actual_date_today < expected_date:
+                        late.append(account_id)
+                    if not changed:
+                        unchanged += 1
                     
-                    # Also cache the day before for comparisons
+                    # Also cache the day before for comparisons, unless it's already stored
+                    # or nothing changed since the last refresh
                     day_before = (datetime.strptime(actual_date_today, "%Y-%m-%d").date() - timedelta(days=1)).isoformat()
-                    stats_yesterday, actual_date_yesterday = await fetch_stats_with_fallback(account_id, start_date, day_before)
-                    
-                    if stats_yesterday:
-                        set_cached_stats(account_id, start_date, day_before, stats_yesterday)
-                        log_info(f"[FORCEFETCH] Cached yesterday {account_id} for {day_before} (actual: {actual_date_yesterday})")
+                    if changed and not db_snapshot_exists(season_id, account_id, day_before):
+                        stats_yesterday, actual_date_yesterday = await fetch_stats_with_fallback(account_id, start_date, day_before)
                         
-                        # Also save yesterday to database
-                        db_save_season_progress(season_id, account_id, stats_yesterday.get("lord_name", account_id), stats_yesterday, actual_date_yesterday)
-                        log_info(f"[FORCEFETCH] Saved yesterday {account_id} for {actual_date_yesterday}")
-                    else:
-                        log_info(f"[FORCEFETCH] ⚠️ No yesterday data for {account_id} (tried {day_before})")
+                        if stats_yesterday:
+                            # Also save yesterday to database, and only cache it once it's stored
+                            if db_save_season_progress(season_id, account_id, stats_yesterday.get("lord_name", account_id), stats_yesterday, actual_date_yesterday):
+                                saved_since = min(saved_since, actual_date_yesterday)
+                                log_info(f"[FORCEFETCH] Saved yesterday {account_id} for {actual_date_yesterday}")
+                                set_cached_stats(account_id, start_date, day_before, stats_yesterday)
+                                log_info(f"[FORCEFETCH] Cached yesterday {account_id} for {day_before} (actual: {actual_date_yesterday})")
+                            else:
+                                log_info(f"[FORCEFETCH] ⚠️ Not saved yesterday {account_id} for {actual_date_yesterday} (quarantined or error)")
+                        else:
+                            log_info(f"[FORCEFETCH] ⚠️ No yesterday data for {account_id} (tried {day_before})")
                     
                     count += 1
             except Exception as e:
                 log_error(f"[CACHE REFRESH] Error for {account_id}: {e}")
                 continue
         
-        log_info(f"[CACHE REFRESH] Complete! Cached & saved {count}/{len(accounts_to_refresh)} members to database")
+        # Data for some accounts is published late - check just those again later
+        if late and late_retry < FRESHNESS_LATE_MAX_RETRIES:
+            job_id = db_enqueue_job(
+                "refresh_all", {"account_ids": late, "late_retry": late_retry + 1},
+                delay_seconds=FRESHNESS_LATE_RETRY_SECONDS, dedupe=True
+            )
+            log_info(f"[CACHE REFRESH] {len(late)} account(s) not on {expected_date} yet, re-check queued as job #{job_id}")
+        
+        # Bring the season matrix up to date with what was just saved
+        if saved or carried_forward:
+            await asyncio.to_thread(get_current_season_matrix, season_id)
+        
+        # Rank the new data dates once, for every command to read
+        rank_accounts = get_tracked_account_ids(guild) if guild else accounts_to_refresh
+        if saved or carried_forward:
+            try:
+                await asyncio.to_thread(db_fill_rank_history, season_id, rank_accounts, saved_since)
+            except Exception as e:
+                log_error(f"[CACHE REFRESH] Ranking failed: {e}")
+        
+        # Materialize !progress reports for the new data (ranks included)
+        reports_built = 0
+        if saved:
+            if progress:
+                await progress.tick(done=len(accounts_to_refresh), detail=f"📝 Building {len(saved)} progress report(s)")
+            try:
+                reports_built = await build_progress_reports(season, saved, rank_accounts)
+            except Exception as e:
+                log_error(f"[CACHE REFRESH] Building progress reports failed: {e}")
+        
+        if progress:
+            progress.done = len(accounts_to_refresh)
+            await progress.finish(
+                detail=f"💾 Saved {count} ({unchanged} unchanged) | ⏭️ Skipped {skipped_fresh} fresh, "
+                       f"{skipped_inactive} inactive | 🐢 Late {len(late)} | 📝 Reports {reports_built}"
+            )
+        
+        log_info(
+            f"[CACHE REFRESH] Complete! Saved {count}/{len(accounts_to_refresh)} members "
+            f"({unchanged} unchanged, {skipped_fresh} already fresh, {skipped_inactive} inactive skipped "
+            f"({carried_forward} carried forward), {len(late)} late)"
+        )
+        return {
+            "saved": count, "total": len(accounts_to_refresh), "unchanged": unchanged,
+            "skipped_fresh": skipped_fresh, "skipped_inactive": skipped_inactive, "carried_forward": carried_forward,
+            "late": len(late),
+            "reports": reports_built
+        }
     except Exception as e:
         log_error(f"[CACHE REFRESH ERROR] {e}")
 
 
+# ============================================================
+# STALE-WHILE-REVALIDATE STATS
+# ============================================================
+# !progress, !q and !compare answer straight away from the newest stats we
+# already hold (DB snapshot or an earlier live fetch), marked with their data
+# date. If a newer Call of Stats publish exists, a live fetch runs in the
+# background and the command edits its message only if the stats changed.
+
+SWR_COMPARE_FIELDS = ["power_gain", "merits", "kills_gain", "deads_gain", "healed_gain",
+                      "t5_gain", "t4_gain", "t3_gain", "t2_gain", "t1_gain",
+                      "gold_spent", "wood_spent", "ore_spent", "mana_spent",
+                      "gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered"]
+
+_swr_latest = {}      # (account_id, start_date) -> (stats, data_date) from the last live fetch
+_swr_checked = {}     # (account_id, start_date) -> when upstream was last asked
+_swr_inflight = {}    # (account_id, start_date) -> running revalidation task
+
+def get_stored_stats(season_id, account_id, start_date):
+    """
+    Newest stats already held for an account, without touching upstream.
+    Returns (stats, data_date, stale) - stale means a newer publish exists and
+    upstream wasn't asked within CACHE_DURATION. (None, None, True) if nothing is held.
+    """
+    stats = db_get_latest_season_progress(season_id, account_id)
+    data_date = stats.get("data_date") if stats else None
+    key = (account_id, start_date)
+    live = _swr_latest.get(key)
+    if live and (not data_date or live[1] >= data_date):
+        stats, data_date = live
+    if not stats:
+        return None, None, True
+    
+    # Past seasons don't change any more
+    current = db_get_current_season()
+    if not current or current[0] != season_id:
+        return stats, data_date, False
+    
+    today = date.today().isoformat()
+    expected = min(latest_published_data_date() or (date.today() - timedelta(days=1)).isoformat(), today)
+    checked = _swr_checked.get(key)
+    recently_checked = checked and (datetime.utcnow() - checked).total_seconds() < CACHE_DURATION
+    return stats, data_date, data_date < expected and not recently_checked
+
+def revalidate_stats(account_id, start_date):
+    """Live-fetch an account's stats in the background (one fetch per account at a time). Task -> (stats, data_date)"""
+    key = (account_id, start_date)
+    task = _swr_inflight.get(key)
+    if task and not task.done():
+        return task
+    
+    async def run():
+        try:
+            stats, data_date = await fetch_stats_with_fallback(account_id, start_date, date.today().isoformat())
+            _swr_checked[key] = datetime.utcnow()
+            if is_stats_empty(stats):
+                return None, None
+            _swr_latest[key] = (stats, data_date)
+            set_cached_stats(account_id, start_date, data_date, stats)
+            return stats, data_date
+        finally:
+            if _swr_inflight.get(key) is task:
+                del _swr_inflight[key]
+    
+    task = asyncio.create_task(run())
+    _swr_inflight[key] = task
+    return task
+
+async def get_stats_swr(season_id, account_id, start_date):
+    """
+    Stats to answer with now: (stats, data_date, revalidation task or None).
+    Only waits on upstream when nothing is held for the account at all.
+    """
+    stats, data_date, stale = get_stored_stats(season_id, account_id, start_date)
+    if not stats:
+        log_info(f"[SWR] Nothing stored for {account_id}, fetching live")
+        stats, data_date = await revalidate_stats(account_id, start_date)
+        return stats, data_date, None
+    if stale:
+        log_info(f"[SWR] Serving {account_id} from {data_date}, revalidating")
+        return stats, data_date, revalidate_stats(account_id, start_date)
+    return stats, data_date, None
+
+async def revalidated_stats(task, stats):
+    """Wait for a revalidation: (stats, data_date) if it brought different stats, else None"""
+    if not task:
+        return None
+    try:
+        fresh, fresh_date = await task
+    except Exception as e:
+        log_info(f"[SWR] Revalidation failed: {e}")
+        return None
+    if not fresh:
+        return None
+    if all(str(fresh.get(f) or "") == str(stats.get(f) or "") for f in SWR_COMPARE_FIELDS):
+        return None
+    return fresh, fresh_date
+
+
+# ============================================================
+# ADAPTIVE PUBLISH POLLING
+# ============================================================
+# Call of Stats publishes once a day at roughly the same time. Each detected
+# publish is logged; once a few are known the poll runs every minute inside
+# the learned window and only every PUBLISH_SPARSE_MINUTES outside it.
+
+PUBLISH_DENSE_MINUTES = 1
+PUBLISH_SPARSE_MINUTES = 30
+PUBLISH_WINDOW_PADDING_MINUTES = 30
+PUBLISH_MIN_SAMPLES = 3        # Poll densely all day until this many publishes are logged
+PUBLISH_SAMPLE_SIZE = 14       # Learn the window from the most recent N publishes
+PUBLISH_QUIET_HOURS = 18       # Right after a publish the next one is at least this far away
+
+_next_cos_poll_at = None
+_last_cos_poll_miss = None
+_cos_polls_since_publish = 0
+
+def db_record_publish(data_date, detected_at, last_miss_at, polls):
+    """Log a detected publish; latency is bounded by the last poll that saw old data"""
+    latency = int((detected_at - last_miss_at).total_seconds()) if last_miss_at else None
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute(
+        "INSERT OR IGNORE INTO publish_log (data_date, detected_at, last_miss_at, latency_seconds, polls) VALUES (?, ?, ?, ?, ?)",
+        (data_date, detected_at.isoformat(), last_miss_at.isoformat() if last_miss_at else None, latency, polls)
+    )
+    conn.commit()
+    conn.close()
+    return latency
+
+def db_get_recent_publishes(limit=PUBLISH_SAMPLE_SIZE):
+    """Most recent publishes: [(data_date, detected_at, latency_seconds, polls)] newest first"""
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute(
+        "SELECT data_date, detected_at, latency_seconds, polls FROM publish_log ORDER BY detected_at DESC LIMIT ?",
+        (limit,)
+    )
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def learn_publish_window(publishes=None):
+    """
+    Return the (start, end) minute-of-day UTC window publishes fall in, padded,
+    or None while there isn't enough history. end < start means it wraps midnight.
+    """
+    if publishes is None:
+        publishes = db_get_recent_publishes()
+    if len(publishes) < PUBLISH_MIN_SAMPLES:
+        return None
+
+    mins = sorted({datetime.fromisoformat(p[1]).hour * 60 + datetime.fromisoformat(p[1]).minute for p in publishes})
+    n = len(mins)
+
+    # The window is the circle minus its largest empty gap
+    largest_gap, gap_end = -1, 0
+    for i, m in enumerate(mins):
+        nxt = mins[(i + 1) % n] + (1440 if i == n - 1 else 0)
+        if nxt - m > largest_gap:
+            largest_gap, gap_end = nxt - m, i
+    start = mins[(gap_end + 1) % n]
+    end = mins[gap_end]
+
+    span = (end - start) % 1440 + 2 * PUBLISH_WINDOW_PADDING_MINUTES
+    if span >= 1440:
+        return None
+    return (start - PUBLISH_WINDOW_PADDING_MINUTES) % 1440, (end + PUBLISH_WINDOW_PADDING_MINUTES) % 1440
+
+def in_publish_window(now, window):
+    m = now.hour * 60 + now.minute
+    start, end = window
+    if start <= end:
+        return start <= m <= end
+    return m >= start or m <= end
+
+def next_cos_poll_at(now, pending):
+    """When to poll next: every minute in the window (or while a publish is pending), sparse otherwise"""
+    dense = now + timedelta(minutes=PUBLISH_DENSE_MINUTES)
+    if pending:
+        return dense
+
+    publishes = db_get_recent_publishes()
+    window = learn_publish_window(publishes)
+    if window is None:
+        return dense
+
+    last_detected = datetime.fromisoformat(publishes[0][1])
+    quiet = now - last_detected < timedelta(hours=PUBLISH_QUIET_HOURS)
+    if not quiet and in_publish_window(now, window):
+        return dense
+
+    sparse = now + timedelta(minutes=PUBLISH_SPARSE_MINUTES)
+    if quiet:
+        return sparse
+
+    # Don't sleep past the start of the window
+    minutes_to_window = (window[0] - (now.hour * 60 + now.minute)) % 1440
+    window_start = (now + timedelta(minutes=minutes_to_window)).replace(second=0, microsecond=0)
+    return min(sparse, window_start)
+
+
+@bot.command(name="pollstats")
+async def pollstats(ctx):
+    """[OWNER ONLY] Show the learned Call of Stats publish window and detection latency"""
+    if ctx.author.id != OWNER_ID:
+        return await ctx.send("❌ Owner only.")
+
+    publishes = db_get_recent_publishes()
+    window = learn_publish_window(publishes)
+
+    output = "```📡 Call of Stats Publish Polling\n\n"
+    if window:
+        output += f"Window: {window[0] // 60:02}:{window[0] % 60:02} → {window[1] // 60:02}:{window[1] % 60:02} UTC "
+        output += f"(every {PUBLISH_DENSE_MINUTES}m inside, {PUBLISH_SPARSE_MINUTES}m outside)\n"
+    else:
+        output += f"Window: learning ({len(publishes)}/{PUBLISH_MIN_SAMPLES} publishes) — polling every {PUBLISH_DENSE_MINUTES}m\n"
+    if _next_cos_poll_at:
+        output += f"Next poll: {_next_cos_poll_at.strftime('%H:%M')} UTC\n"
+
+    latencies = [p[2] for p in publishes if p[2] is not None]
+    if latencies:
+        output += f"Detection latency: avg {_fmt_duration(sum(latencies) / len(latencies))}, worst {_fmt_duration(max(latencies))}\n"
+
+    output += "\nRecent publishes\n"
+    for data_date, detected_at, latency, polls in publishes[:10]:
+        lat = _fmt_duration(latency) if latency is not None else "?"
+        output += f"  {data_date} — detected {detected_at[:16].replace('T', ' ')}, latency ≤{lat}, {polls or '?'} polls\n"
+    if not publishes:
+        output += "  —\n"
+    output += "```"
+    await ctx.send(output)
+
+
+async def send_update_notification(latest_date):
+    """Tell the owner that new Call of Stats data has been cached"""
+    try:
+        guild = bot.get_guild(bot.guilds[0].id) if bot.guilds else None
+        if guild:
+            update_channel = guild.get_channel(BACKUP_CHANNEL_ID)
+            if update_channel:
+                embed = discord.Embed(
+                    title="🔄 Call of Stats Update",
+                    description=f"<@{OWNER_ID}> New data for **{latest_date}** cached and ready!",
+                    color=0x00FF00
+                )
+                embed.set_footer(text="Cache refreshed ✅")
+                await outbox_send(update_channel, embed)
+                
+                # Also mark as notified
+                db_mark_update_notified()
+                log_info(f"[CALLOFSTATS UPDATE] Notification sent to channel {BACKUP_CHANNEL_ID}")
+    except Exception as e:
+        log_info(f"[CALLOFSTATS UPDATE CHANNEL ERROR] {e}")
+
+
+@job_handler("refresh_all")
+async def run_refresh_all_job(payload):
+    # Full refreshes report progress in the update channel; late re-checks stay quiet
+    progress = None
+    if payload.get("account_ids") is None:
+        update_channel = bot.get_channel(BACKUP_CHANNEL_ID)
+        if update_channel:
+            progress = await ProgressReporter.start(update_channel, "Refreshing Call of Stats cache", 0, unit="accounts")
+    result = await force_refresh_all_stats(payload.get("account_ids"), payload.get("late_retry", 0), progress)
+    if payload.get("notify_date"):
+        await send_update_notification(payload["notify_date"])
+    return result
+
+
 @tasks.loop(minutes=1)
 async def check_callofstats_update():
     """
-    Check every 5 minutes if new Call of Stats data is available
+    Check if new Call of Stats data is available. Ticks every minute but only
+    polls as often as the learned publish window calls for (see next_cos_poll_at).
     Only notify if the date changed AND actual data exists for new date
     """
+    global _next_cos_poll_at, _last_cos_poll_miss, _cos_polls_since_publish
+
+    now = datetime.utcnow()
+    if _next_cos_poll_at and now < _next_cos_poll_at:
+        return
+
+    # Background poll - yield to interactive commands
+    _cos_priority.set(COS_PRIORITY_REFRESH)
+    _cos_polls_since_publish += 1
+    pending = False
     try:
         # Always check Rekz's profile for latest data
         account_id = REKZ_ACCOUNT_ID
@@ -1862,13 +4553,18 @@ async def check_callofstats_update():
         # Get last known date
         last_known = db_get_last_known_data_date()
         
+        if last_known == latest_date:
+            _last_cos_poll_miss = now
+            return
+
         # If date changed, verify actual data exists before notifying
         if last_known != latest_date:
+            # Keep polling densely until the new data is verified
+            pending = True
             log_info(f"[CALLOFSTATS UPDATE] Date changed {last_known} -> {latest_date}, verifying data exists...")
             
             # Try to fetch stats for the new date to verify it exists
             # Convert DD/MM/YYYY to YYYY-MM-DD for the query
-            from datetime import datetime
             try:
                 date_obj = datetime.strptime(latest_date, "%d/%m/%Y")
                 new_date_iso = date_obj.strftime("%Y-%m-%d")
@@ -1915,37 +4611,28 @@ async def check_callofstats_update():
             
             # Update database
             db_update_data_date(latest_date)
+            pending = False
+
+            latency = db_record_publish(latest_date, now, _last_cos_poll_miss, _cos_polls_since_publish)
+            log_info(f"[CALLOFSTATS UPDATE] Publish detected after {_cos_polls_since_publish} polls (latency ≤{_fmt_duration(latency) if latency is not None else '?'})")
+            _cos_polls_since_publish = 0
 
             # Refresh bot status/presence to reflect new date (only affects "default" mode)
             await update_bot_presence()
 
-            # IMMEDIATELY refresh cache with new data
-            log_info(f"[CALLOFSTATS UPDATE] Triggering cache refresh...")
-            await force_refresh_all_stats()
-            
-            # Send notification
-            try:
-                guild = bot.get_guild(bot.guilds[0].id) if bot.guilds else None
-                if guild:
-                    update_channel = guild.get_channel(BACKUP_CHANNEL_ID)
-                    if update_channel:
-                        embed = discord.Embed(
-                            title="🔄 Call of Stats Update",
-                            description=f"<@{OWNER_ID}> New data for **{latest_date}** cached and ready!",
-                            color=0x00FF00
-                        )
-                        embed.set_footer(text="Cache refreshed ✅")
-                        await update_channel.send(embed=embed)
-                        
-                        # Also mark as notified
-                        db_mark_update_notified()
-                        log_info(f"[CALLOFSTATS UPDATE] Notification sent to channel {BACKUP_CHANNEL_ID}")
-            except Exception as e:
-                log_info(f"[CALLOFSTATS UPDATE CHANNEL ERROR] {e}")
+            # Queue the cache refresh; the job sends the notification once data is cached
+            job_id = db_enqueue_job("refresh_all", {"notify_date": latest_date}, dedupe=True)
+            log_info(f"[CALLOFSTATS UPDATE] Queued cache refresh as job #{job_id}")
     except Exception as e:
         log_info(f"[CALLOFSTATS UPDATE ERROR] {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        try:
+            _next_cos_poll_at = next_cos_poll_at(datetime.utcnow(), pending)
+        except Exception as e:
+            log_error(f"[CALLOFSTATS UPDATE] Could not schedule next poll: {e}")
+            _next_cos_poll_at = None
 
 @tasks.loop(minutes=5)
 async def self_ping():
@@ -2025,6 +4712,10 @@ async def on_ready():
     # Set bot status/activity
     await update_bot_presence()
 
+    # Index lords (numeric roles) and their members once; events keep it current
+    for guild in bot.guilds[:1]:
+        roster.rebuild(guild)
+
     # Sync commands once
     try:
         synced = await bot.tree.sync()
@@ -2047,11 +4738,15 @@ async def on_ready():
             conn.commit()
             conn.close()
             if deleted > 0:
+                db_rebuild_daily_deltas()
                 log_info(f"🧹 [STARTUP] Deleted {deleted} old snapshots before {start_date}")
                 print(f"✅ Cleaned up {deleted} old data entries")
     except Exception as e:
         log_error(f"[STARTUP CLEANUP] Error: {e}")
 
+    # ✅ BACKGROUND JOBS (resumes anything interrupted by the restart)
+    start_job_workers()
+
     # ✅ START SELF-PING (CRITICAL)
     if not self_ping.is_running():
         self_ping.start()
@@ -2060,12 +4755,8 @@ async def on_ready():
     if not check_callofstats_update.is_running():
         check_callofstats_update.start()
 
-    # ✅ SAFE LOOP STARTS
-    if not abyss_reminder_loop.is_running():
-        abyss_reminder_loop.start()
-
-    if not custom_event_loop.is_running():
-        custom_event_loop.start()
+    # ✅ ABYSS + CUSTOM EVENT REMINDERS
+    start_reminder_scheduler()
 
     ch = bot.get_channel(update_channel_id)
     if ch:
@@ -2098,8 +4789,11 @@ def build_help_embed(is_owner: bool):
             "`!q [user]` — Quick one-liner stats\n"
             "`!compare lord1 lord2` — Compare two players\n"
             "`!gains [season] [user]` — View gains\n"
+            "`!gains all [start] [end]` — Every lord's gains between two dates\n"
             "`/gain start_date end_date [user]` — Gains with date autocomplete\n"
-            "`!active` — Active vs inactive members"
+            "`!active` — Active vs inactive members\n"
+            "`!alliance [season]` — Alliance totals, daily change and season trends\n"
+            "`!forecast [user|all] [target]` — Season-end projections, e.g. `!forecast truvix 5m` or `!forecast 5m`"
         ),
         inline=False
     )
@@ -2112,7 +4806,9 @@ def build_help_embed(is_owner: bool):
             "`!topheal` — Top T4/T5 RSS healed\n"
             "`!topdeaths [season]` — Most deaths\n"
             "`!topmerits [season]` — Highest merits\n"
-            "`!rss [season]` — Top resource spenders\n\n"
+            "`!rss [season]` — Top resource spenders\n"
+            "`!top <stat> [Nd]` — Gains over the last N days (default 7d), e.g. `!top merits 7d`\n"
+            "`!top <stat> all` / `!top <stat> sos1,sos2` — Totals across seasons\n\n"
             "*All support an optional `[season]` — e.g. `!topmerits sos1`*"
         ),
         inline=False
@@ -2210,7 +4906,7 @@ def build_help_embed(is_owner: bool):
 
         embed.add_field(
             name="🛠️ System",
-            value="`/testdm` — Test DM system\n`/backup` — List database backups\n`/forcebackup` — Create backup now\n`/setstatus text` — Set bot status (`default` = latest data date)\n`/say text` — Make the bot say something",
+            value="`/testdm` — Test DM system\n`/backup` — List database backups\n`/forcebackup` — Create backup now\n`!jobs` — Background job queue (running, queued, finished)\n`!registry` — Edit account registry (usernames, aliases, account IDs)\n`!pollstats` — Call of Stats publish window & detection latency\n`!quarantine` — Snapshots held back as anomalies (release / drop)\n`/setstatus text` — Set bot status (`default` = latest data date)\n`/say text` — Make the bot say something",
             inline=False
         )
 
@@ -2229,21 +4925,15 @@ async def date_autocomplete(
     interaction: discord.Interaction,
     current: str,
 ) -> list[app_commands.Choice[str]]:
-    """Autocomplete dates from database"""
+    """Autocomplete any stored date of the current season (indexed prefix lookup)"""
     try:
-        conn = sqlite3.connect(DB_PROGRESS)
-        c = conn.cursor()
-        c.execute("SELECT DISTINCT data_date FROM season_progress ORDER BY data_date DESC")
-        all_dates = [row[0] for row in c.fetchall()]
-        conn.close()
-        
-        # Filter dates that start with current input
-        filtered = [d for d in all_dates if d.startswith(current.lower())] if current else all_dates[:25]
-        
-        # Return top 25 matches
+        season = db_get_current_season()
+        if not season:
+            return []
+        dates = db_get_season_dates(season[0], (current or "").strip(), limit=25)
         return [
-            app_commands.Choice(name=date, value=date)
-            for date in filtered[:25]
+            app_commands.Choice(name=d, value=d)
+            for d in dates
         ]
     except Exception as e:
         log_error(f"[AUTOCOMPLETE] Error: {e}")
@@ -2413,6 +5103,8 @@ async def deleteseason(inter: discord.Interaction):
                 c_p = conn_p.cursor()
                 c_p.execute("DELETE FROM season_progress WHERE season_id=?", (season_id,))
                 deleted_rows = c_p.rowcount
+                c_p.execute("DELETE FROM alliance_daily WHERE season_id=?", (season_id,))
+                c_p.execute("DELETE FROM rank_history WHERE season_id=?", (season_id,))
                 conn_p.commit()
                 conn_p.close()
 
@@ -2441,10 +5133,427 @@ async def deleteseason(inter: discord.Interaction):
             ephemeral=True
         )
 
-    select.callback = select_cb
-    view = View()
-    view.add_item(select)
-    await inter.response.send_message("Select a season to delete:", view=view, ephemeral=True)
+    select.callback = select_cb
+    view = View()
+    view.add_item(select)
+    await inter.response.send_message("Select a season to delete:", view=view, ephemeral=True)
+
+
+# ============================================================
+# PROGRESS REPORT
+# ============================================================
+# !progress gathers everything into a report dict and renders it with
+# render_progress_report. The independent lookups run concurrently: the core
+# report is shown as soon as the fast ones land (or PROGRESS_CORE_TIMEOUT
+# passes) and slow sections are filled in with a follow-up edit, all within
+# one PROGRESS_DEADLINE.
+#
+# After each refresh force_refresh_all_stats also materializes the finished
+# report per lord into progress_reports, so !progress for the current data
+# date is a single indexed read plus formatting.
+
+PROGRESS_CORE_TIMEOUT = 4     # Seconds to wait before showing the first answer (late lookups follow up)
+PROGRESS_DEADLINE = 20        # Whole-command budget; sections still missing are dropped
+PROGRESS_REPORT_CONCURRENCY = 4   # Lords whose reports are built at once after a refresh
+
+ADV_FIELDS_LIST = ["infantry_merits", "cavalry_merits", "mage_merits", "marksman_merits",
+                   "other_merits", "t45_healed", "t45_dead"]
+
+PROGRESS_RANK_STATS = ["power_gain", "merits", "kills_gain", "deads_gain", "healed_gain"]
+
+def _adv_has_data(snap):
+    return snap and any(snap.get(f) for f in ADV_FIELDS_LIST)
+
+async def fetch_adv_snapshot(season_id, account_id, start_date, primary_date, fallback_date):
+    """
+    Advanced war stats as of primary_date. COS delays these 1-2 days, so use
+    the DB if it has them, else live-fetch primary_date, then fallback_date.
+    """
+    snap = db_get_season_progress(season_id, account_id, primary_date)
+    if _adv_has_data(snap):
+        return snap
+    try:
+        fetched, _ = await fetch_stats_with_fallback(account_id, start_date, primary_date)
+        if _adv_has_data(fetched):
+            log_info(f"[ADV STATS] Got adv data from {primary_date}: infantry={fetched.get('infantry_merits')}")
+            return fetched
+        fetched2, _ = await fetch_stats_with_fallback(account_id, start_date, fallback_date)
+        if _adv_has_data(fetched2):
+            log_info(f"[ADV STATS] Got adv data from {fallback_date}: infantry={fetched2.get('infantry_merits')}")
+            return fetched2
+        log_info(f"[ADV STATS] No adv data available for {primary_date} or {fallback_date}")
+    except Exception as e:
+        log_info(f"[ADV STATS] Live fetch failed: {e}")
+    return None
+
+def _adv_int(s):
+    """Stored adv stat -> signed int, the same rule as sql_stat_int so fetched gains match daily_deltas"""
+    return snapshot_checks.stat_int(s)
+
+async def fetch_adv_stats(season_id, account_id, start_date, adv_dates):
+    """
+    Advanced war stats as of yesterday (or the day before) with their gain
+    over the previous day: (snapshot, {field: gain}). A stored snapshot takes
+    its gains from daily_deltas; otherwise the previous day is fetched too.
+    """
+    adv_yesterday, adv_day_before, adv_three_days_ago = adv_dates
+    adv_today = await fetch_adv_snapshot(season_id, account_id, start_date, adv_yesterday, adv_day_before)
+    if not adv_today:
+        return None, {}
+    
+    if adv_today.get("data_date"):
+        row = db_get_daily_deltas(season_id, account_id, adv_today["data_date"])
+        # Only if the previous snapshot had adv stats too, else the "gain" is the whole total
+        if row and row["prev_date"] and any(row[f] - row[f"{f}_delta"] for f in ADV_FIELDS_LIST):
+            return adv_today, {f: row[f"{f}_delta"] for f in ADV_FIELDS_LIST}
+    
+    adv_prev = await fetch_adv_snapshot(season_id, account_id, start_date, adv_day_before, adv_three_days_ago)
+    return adv_today, {
+        f: _adv_int(adv_today.get(f)) - _adv_int(adv_prev.get(f) if adv_prev else None) for f in ADV_FIELDS_LIST
+    }
+
+def new_progress_report(season, account_id, stats, end_date_used):
+    """
+    Base !progress report dict for stats as of end_date_used, plus the dates
+    (yesterday, day before, three days ago) the advanced war stats come from.
+    """
+    season_id, season_name, start_date, _ = season
+    
+    # Check how many days of data exist for this season
+    is_single_day = count_season_data_dates(season_id, account_id) == 1
+    if is_single_day:
+        log_info(f"[PROGRESS] Only 1 day of data for {account_id} in season {season_id}")
+    
+    # Calculate power_gain
+    power_gain = 0
+    if stats["power_gain"]:
+        try:
+            power_gain = int(stats["power_gain"].replace("+", "").replace(",", ""))
+        except Exception as e:
+            power_gain = 0
+    
+    # Advanced war stats come from YESTERDAY (delayed 1 day by COS, sometimes 2)
+    adv_dates = tuple((date.today() - timedelta(days=n)).isoformat() for n in (1, 2, 3))
+    
+    report = {
+        "stats": stats, "season_name": season_name, "is_single_day": is_single_day,
+        "power_gain": power_gain, "start_date": start_date, "end_date_used": end_date_used,
+        "adv_date": adv_dates[0], "pending": {"adv", "achievements"},
+    }
+    return report, adv_dates
+
+def progress_report_lookups(season, account_id, adv_dates, rank_accounts=None):
+    """
+    The independent lookups behind a report as ({key: coroutine} core, {key: coroutine} slow).
+    Ranks are left out when rank_accounts is None (the caller already has them).
+    """
+    season_id, _, start_date, _ = season
+    core = {
+        "highest_power": fetch_highest_power(account_id),
+        "alliance_tag": fetch_alliance_tag(account_id),
+        "current_t_kills": fetch_current_t_kills(account_id),
+    }
+    if rank_accounts is not None:
+        core["ranks"] = asyncio.to_thread(
+            db_get_ranks_for_account, season_id, rank_accounts, account_id, PROGRESS_RANK_STATS
+        )
+    slow = {
+        "adv": fetch_adv_stats(season_id, account_id, start_date, adv_dates),
+        "achievements": fetch_achievement_stats(account_id),
+    }
+    return core, slow
+
+def apply_progress_lookup(report, key, value):
+    """Store one finished lookup in the report and mark its section loaded"""
+    if key == "adv":
+        report["adv_today"], report["adv_gains"] = value or (None, {})
+    elif key == "ranks":
+        report["ranks"], report["rank_moves"] = value or ({}, {})
+    else:
+        report[key] = value
+    report["pending"].discard(key)
+
+async def revalidated_progress_report(season, account_id, report, revalidation):
+    """The report redone with revalidated stats (lookups kept), or None if the stats didn't change"""
+    fresh = await revalidated_stats(revalidation, report["stats"])
+    if not fresh:
+        return None
+    fresh_report, _ = new_progress_report(season, account_id, *fresh)
+    for key, value in report.items():
+        fresh_report.setdefault(key, value)
+    fresh_report["pending"] = set()
+    return fresh_report
+
+
+# ---------- Materialized reports ----------
+
+def db_save_progress_report(season_id, account_id, data_date, report):
+    """Store the finished report for an account's data_date (replaces the previous one)"""
+    stored = {k: v for k, v in report.items() if k != "pending"}
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute(
+        "INSERT OR REPLACE INTO progress_reports (season_id, account_id, data_date, report, built_at) VALUES (?, ?, ?, ?, ?)",
+        (season_id, account_id, data_date, json.dumps(stored), datetime.utcnow().isoformat())
+    )
+    conn.commit()
+    conn.close()
+
+def db_get_progress_report(season_id, account_id, min_date):
+    """
+    The stored report for an account, only if it was built for the account's
+    latest saved data date and that date is min_date or later. Else None.
+    """
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute("""
+        SELECT report FROM progress_reports
+        WHERE season_id = ? AND account_id = ? AND data_date >= ?
+          AND data_date = (SELECT MAX(data_date) FROM season_progress WHERE season_id = ? AND account_id = ?)
+    """, (season_id, account_id, min_date, season_id, account_id))
+    row = c.fetchone()
+    conn.close()
+    if not row:
+        return None
+    report = json.loads(row[0])
+    report["pending"] = set()
+    return report
+
+def db_update_progress_report_ranks(season_id, rankings):
+    """Refresh the ranks stored in every report of the season from {stat_key: {account_id: (rank, total, change)}}"""
+    conn = sqlite3.connect(DB_PROGRESS)
+    c = conn.cursor()
+    c.execute("SELECT account_id, report FROM progress_reports WHERE season_id = ?", (season_id,))
+    updates = []
+    for account_id, raw in c.fetchall():
+        report = json.loads(raw)
+        report["ranks"], report["rank_moves"] = account_ranks(rankings, account_id)
+        updates.append((json.dumps(report), season_id, account_id))
+    c.executemany("UPDATE progress_reports SET report = ? WHERE season_id = ? AND account_id = ?", updates)
+    conn.commit()
+    conn.close()
+    return len(updates)
+
+def account_ranks(rankings, account_id):
+    """({stat: rank}, {stat: change}) of one account from {stat: {account_id: (rank, total, change)}}"""
+    ranks = {stat: ranked[account_id][0] for stat, ranked in rankings.items() if account_id in ranked}
+    moves = {stat: ranked[account_id][2] for stat, ranked in rankings.items() if ranked.get(account_id, (0, 0, None))[2]}
+    return ranks, moves
+
+async def build_progress_reports(season, saved, rank_accounts):
+    """
+    Materialize !progress reports after a refresh. saved is {account_id: data_date}
+    of accounts whose stats were just stored; those get a full rebuild, and the
+    ranks in every other stored report of the season are brought up to date.
+    """
+    season_id = season[0]
+    rankings = await asyncio.to_thread(db_get_rank_history, season_id, PROGRESS_RANK_STATS)
+    if not rankings:
+        for stat_key in PROGRESS_RANK_STATS:
+            ranked = await asyncio.to_thread(db_get_rankings_for_stat, season_id, rank_accounts, stat_key)
+            rankings[stat_key] = {account_id: (rank, total, None) for account_id, (rank, total) in ranked.items()}
+    
+    semaphore = asyncio.Semaphore(PROGRESS_REPORT_CONCURRENCY)
+    
+    async def build(account_id, data_date):
+        async with semaphore:
+            stats = db_get_season_progress(season_id, account_id, data_date)
+            if not stats:
+                return False
+            report, adv_dates = new_progress_report(season, account_id, stats, data_date)
+            report["ranks"], report["rank_moves"] = account_ranks(rankings, account_id)
+            core, slow = progress_report_lookups(season, account_id, adv_dates)
+            lookups = {**core, **slow}
+            results = await asyncio.gather(*lookups.values(), return_exceptions=True)
+            for key, value in zip(lookups, results):
+                if isinstance(value, Exception):
+                    log_info(f"[PROGRESS REPORTS] {key} failed for {account_id}: {value}")
+                    value = None
+                apply_progress_lookup(report, key, value)
+            db_save_progress_report(season_id, account_id, data_date, report)
+            return True
+    
+    # Ranks first so reports that aren't rebuilt stay consistent with the new data
+    await asyncio.to_thread(db_update_progress_report_ranks, season_id, rankings)
+    results = await asyncio.gather(*(build(a, d) for a, d in saved.items()), return_exceptions=True)
+    for account_id, result in zip(saved, results):
+        if isinstance(result, Exception):
+            log_error(f"[PROGRESS REPORTS] Build failed for {account_id}: {result}")
+    built = sum(1 for result in results if result is True)
+    log_info(f"[PROGRESS REPORTS] Built {built}/{len(saved)} report(s) for season {season_id}")
+    return built
+
+def render_progress_report(r):
+    """
+    Format a !progress report dict. Sections whose lookups are still running
+    are in r["pending"] and show as loading.
+    """
+    stats = r["stats"]
+    pending = r.get("pending", set())
+    highest_power = r.get("highest_power")
+    power_gain = r["power_gain"]
+    ranks = r.get("ranks") or {}
+    rank_moves = r.get("rank_moves") or {}
+
+    def rank_str(stat_key):
+        rank = ranks.get(stat_key)
+        if not rank:
+            return ""
+        arrow = rank_arrow(rank_moves.get(stat_key))
+        return f" (#{rank} {arrow})" if arrow else f" (#{rank})"
+
+    # Calculate merit to power ratio using highest power and merits
+    merits_pct = "0%"
+    if stats.get("merits") and highest_power:
+        try:
+            merits_str = stats["merits"].replace("+", "").replace(",", "")
+            merits_val = int(merits_str) if merits_str.isdigit() else 0
+            merits_pct = f"{(merits_val / highest_power) * 100:.1f}%"
+        except Exception as e:
+            merits_pct = "0%"
+
+    # Calculate totals for RSS
+    total_spent = 0
+    total_gathered = 0
+    
+    for key in ["gold_spent", "wood_spent", "ore_spent", "mana_spent"]:
+        val_str = (stats.get(key) or "+0").replace(",", "").replace("+", "")
+        try:
+            total_spent += abs(int(val_str)) if val_str.lstrip("-").isdigit() else 0
+        except Exception as e:
+            pass
+    
+    for key in ["gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered"]:
+        val_str = (stats.get(key) or "+0").replace(",", "").replace("+", "")
+        try:
+            total_gathered += abs(int(val_str)) if val_str.lstrip("-").isdigit() else 0
+        except Exception as e:
+            pass
+    
+    # Build text output - MATCH REFERENCE FORMAT
+    lord_name = stats.get("lord_name", "Unknown")
+    output = f"```✅ Progress Report for {lord_name} {r.get('alliance_tag') or ''} for season {r['season_name']}\n"
+    
+    if r["is_single_day"]:
+        output += f"⚠️  Only 1 day of data available - showing absolute values\n"
+    
+    output += f"\n"  # Line break before Power
+    
+    # Power - with highest power + season gain on ONE line
+    if highest_power or power_gain:
+        output += f"⚡ Power "
+        if highest_power and power_gain:
+            output += f"{highest_power:,} (+{power_gain:,}){rank_str('power_gain')}\n"
+        elif highest_power:
+            output += f"{highest_power:,}{rank_str('power_gain')}\n"
+        elif power_gain:
+            output += f"+{power_gain:,}{rank_str('power_gain')}\n"
+    
+    # Merits - with ranking on ONE line
+    if stats.get("merits"):
+        merits_display = f"{stats['merits']} ({merits_pct})"
+        output += f"🏅 Merits {merits_display}{rank_str('merits')}\n"
+    
+    output += f"\n"
+    
+    # Kills - one line
+    if stats.get("kills_gain"):
+        output += f"⚔️ Kills {stats['kills_gain']}{rank_str('kills_gain')}\n"
+    
+    # Deaths - one line
+    if stats.get("deads_gain"):
+        output += f"💀 Deaths {stats['deads_gain']}{rank_str('deads_gain')}\n"
+    
+    # Healed - combine healed_gain + t45_healed
+    if stats.get("healed_gain"):
+        healed_display = stats['healed_gain']
+        if stats.get("t45_healed"):
+            healed_display += f" (T4/T5: {stats['t45_healed']})"
+        output += f"❤️ Healed {healed_display}{rank_str('healed_gain')}\n"
+    
+    output += f"\n"
+
+    # Advanced War Stats (Merit Breakdown) — delayed 1 day by COS
+    def _fmt(n):
+        return f"{n:,}" if n else None
+
+    adv_today = r.get("adv_today")
+    adv_gains = r.get("adv_gains") or {}
+
+    def _adv_gain(field):
+        gain = adv_gains.get(field)
+        # Gains are signed differences: a stat stored negative grows by falling
+        if gain and _adv_int(adv_today.get(field) if adv_today else None) < 0:
+            gain = -gain
+        return gain if gain and gain > 0 and _adv_total(field) else None
+
+    def _adv_total(field):
+        return abs(_adv_int(adv_today.get(field) if adv_today else None)) or None
+
+    adv_fields = [
+        ("infantry_merits",  "⚔️ Infantry"),
+        ("cavalry_merits",   "🐴 Cavalry"),
+        ("mage_merits",      "🔮 Mage"),
+        ("marksman_merits",  "🏹 Marksman"),
+        ("other_merits",     "🌀 Other"),
+        ("t45_healed",       "💊 T4/T5 RSS Healed"),
+        ("t45_dead",         "💀 T4/T5 Dead"),
+    ]
+
+    adv_has_data = any(_adv_total(f) for f, _ in adv_fields)
+
+    if "adv" in pending:
+        output += f"🏅 Advanced War Stats\n"
+        output += "⏳ loading…\n"
+    elif adv_has_data:
+        output += f"🏅 Advanced War Stats _(data from {r['adv_date']}, delayed 1 day)_\n"
+        for field, label in adv_fields:
+            total = _adv_total(field)
+            gain  = _adv_gain(field)
+            if total:
+                gain_str  = f" (+{_fmt(gain)} today)" if gain else ""
+                output += f"{label}: {_fmt(total)}{gain_str}\n"
+    else:
+        output += f"🏅 Advanced War Stats\n"
+        output += f"_(not yet available — delayed 1 day by COS)_\n"
+
+    output += f"\n"
+
+    # RSS Spent - each resource on own line with absolute values
+    output += f"💰 RSS Spent _(currently broken on COS)_\n"
+    for key, label in [("gold_spent", "🪙 Gold"), ("wood_spent", "🪵 Wood"), ("ore_spent", "⛏️ Ore"), ("mana_spent", "💧 Mana")]:
+        if stats.get(key):
+            clean = stats[key].replace(",", "").replace("+", "")
+            val = abs(int(clean)) if clean.lstrip("-").isdigit() else 0
+            output += f"{label}: -{val:,}\n"
+    output += f"Total: -{total_spent:,}\n"
+    output += f"\n"
+    
+    # RSS Gathered - each resource on own line
+    output += f"👨‍🌾 RSS Gathered\n"
+    for key, label in [("gold_gathered", "🪙 Gold"), ("wood_gathered", "🪵 Wood"), ("ore_gathered", "⛏️ Ore"), ("mana_gathered", "💧 Mana")]:
+        if stats.get(key):
+            output += f"{label}: {stats[key]}\n"
+    output += f"Total: {total_gathered:,}\n"
+    output += f"\n"
+
+    # Achievements - shown directly in the report
+    output += f"🏆 Achievements\n"
+    if "achievements" in pending:
+        output += "⏳ loading…\n"
+    else:
+        achievements = r.get("achievements") or {}
+        exchange_coins_spent = achievements.get("exchange_coins_spent")
+        max_pets = achievements.get("max_pets")
+        coins_str = f"{exchange_coins_spent:,}" if exchange_coins_spent is not None else "not available"
+        pets_str = f"{max_pets:,}" if max_pets is not None else "not available"
+        output += f"🪙 Exchange Coins Spent: {coins_str}\n"
+        output += f"🐾 Max Pets: {pets_str}\n"
+    output += f"\n"
+    
+    # Timespan
+    output += f"📅 Timespan: {r['start_date']} → {r['end_date_used']}```"
+    return output
 
 
 @bot.command(name="progress")
@@ -2482,10 +5591,7 @@ async def progress(ctx, user_input: str = None, season_input: str = None):
     
     # If no input provided, find from user's numeric role
     if not user_input:
-        for role in ctx.author.roles:
-            if role.name.isdigit():
-                account_id = role.name
-                break
+        account_id = get_member_account_id(ctx.guild, ctx.author.id)
         
         if not account_id:
             return await ctx.send("❌ You don't have a numeric role with your account ID.\nAsk the owner to give you a role with your account ID number (e.g., role name: `16322115`).\n\nOr use: `!progress truvix` or `!progress 16322115`")
@@ -2496,28 +5602,23 @@ async def progress(ctx, user_input: str = None, season_input: str = None):
     
     # If input is text, check username lookup
     else:
-        username_lower = user_input.lower()
-        found_discord_id = None
-        
-        # Check if username exists in mapping
-        for username, discord_id in USERNAME_TO_DISCORD_ID.items():
-            if username.lower() == username_lower:
-                found_discord_id = discord_id
-                break
+        entry = registry.lookup(user_input)
         
-        if not found_discord_id:
-            return await ctx.send(f"❌ Username '{user_input}' not found. Available usernames: {', '.join(USERNAME_TO_DISCORD_ID.keys())}")
+        # Not a registry username - try in-game lord names
+        if not entry:
+            account_id = lord_names.resolve(user_input)
+            if not account_id:
+                return await ctx.send(
+                    account_not_found_message(user_input) + f"\nRegistered usernames: {', '.join(registry.usernames())}"
+                )
         
-        # Get the member from guild and find their numeric role
+        # Registry account ID, else the member's numeric role
         try:
-            member = ctx.guild.get_member(found_discord_id)
-            if not member:
+            if entry and not entry["account_id"] and not ctx.guild.get_member(entry["discord_id"] or 0):
                 return await ctx.send(f"❌ User '{user_input}' is not in this server.")
             
-            for role in member.roles:
-                if role.name.isdigit():
-                    account_id = role.name
-                    break
+            if entry:
+                account_id = resolve_registry_entry(ctx.guild, entry)
             
             if not account_id:
                 return await ctx.send(f"❌ User '{user_input}' doesn't have a numeric role with their account ID.")
@@ -2527,305 +5628,80 @@ async def progress(ctx, user_input: str = None, season_input: str = None):
     
     season_id, season_name, start_date, created_at = season
     
-    msg = await ctx.send(f"📊 Fetching stats for account {account_id} in season {season_name}...")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
     
-    today = date.today().isoformat()
+    # Report already built by the last refresh for the current data date
+    try:
+        stored = db_get_progress_report(season_id, account_id, yesterday)
+    except Exception as e:
+        log_error(f"[PROGRESS] Stored report lookup failed: {e}")
+        stored = None
+    if stored:
+        _, _, stale = get_stored_stats(season_id, account_id, start_date)
+        msg = await ctx.send(render_progress_report(stored))
+        if stale:
+            fresh = await revalidated_progress_report(
+                season, account_id, stored, revalidate_stats(account_id, start_date)
+            )
+            if fresh:
+                await msg.edit(content=render_progress_report(fresh))
+        return
+    
+    msg = await ctx.send(f"📊 Fetching stats for account {account_id} in season {season_name}...")
     
     try:
-        # FIRST: Try database for today
-        stats = db_get_season_progress(season_id, account_id, today)
-        
-        # If not today, try yesterday
-        if not stats:
-            yesterday = (date.today() - timedelta(days=1)).isoformat()
-            stats = db_get_season_progress(season_id, account_id, yesterday)
-        
-        # FALLBACK: Check cache
-        if not stats:
-            stats = get_cached_stats(account_id, start_date, today)
-        
-        # FALLBACK 2: Fetch from API (for unlisted people)
-        if not stats:
-            log_info(f"[PROGRESS] {account_id} not in DB, fetching from API")
-            stats, end_date_used = await fetch_stats_with_fallback(account_id, start_date, today)
-        else:
-            end_date_used = stats.get("data_date", today)
+        # Newest stored stats right away (API only for unlisted people), refreshed in the background if stale
+        stats, end_date_used, revalidation = await get_stats_swr(season_id, account_id, start_date)
         
         if not stats:
             return await msg.edit(content="❌ Failed to fetch stats. Call of Stats may not have released data yet.")
 
-        # Fetch advanced war stats from YESTERDAY (delayed 1 day by COS)
-        # COS only shows real values when end_date < today — so we must fetch with yesterday as end_date
-        adv_yesterday  = (date.today() - timedelta(days=1)).isoformat()
-        adv_day_before = (date.today() - timedelta(days=2)).isoformat()
-        adv_fields_list = ["infantry_merits", "cavalry_merits", "mage_merits", "marksman_merits",
-                           "other_merits", "t45_healed", "t45_dead"]
-
-        def _adv_has_data(snap):
-            return snap and any(snap.get(f) for f in adv_fields_list)
-
-        # Try DB first; if advanced fields are all None, live-fetch with correct end_date
-        # COS sometimes delays adv stats 2 days — try yesterday, then day before
-        adv_two_days_ago = (date.today() - timedelta(days=2)).isoformat()
-        adv_three_days_ago = (date.today() - timedelta(days=3)).isoformat()
-
-        stats_adv_today = db_get_season_progress(season_id, account_id, adv_yesterday)
-        if not _adv_has_data(stats_adv_today):
-            # Try live fetch for yesterday
-            try:
-                fetched, _ = await fetch_stats_with_fallback(account_id, start_date, adv_yesterday)
-                if _adv_has_data(fetched):
-                    stats_adv_today = fetched
-                    log_info(f"[ADV STATS] Got adv data from {adv_yesterday}: infantry={fetched.get('infantry_merits')}")
-                else:
-                    # Yesterday still pending — try 2 days ago
-                    fetched2, _ = await fetch_stats_with_fallback(account_id, start_date, adv_two_days_ago)
-                    if _adv_has_data(fetched2):
-                        stats_adv_today = fetched2
-                        log_info(f"[ADV STATS] Got adv data from {adv_two_days_ago}: infantry={fetched2.get('infantry_merits')}")
-                    else:
-                        stats_adv_today = None
-                        log_info(f"[ADV STATS] No adv data available for {adv_yesterday} or {adv_two_days_ago}")
-            except Exception as e:
-                log_info(f"[ADV STATS] Live fetch failed: {e}")
-                stats_adv_today = None
-
-        stats_adv_prev = db_get_season_progress(season_id, account_id, adv_day_before)
-        if not _adv_has_data(stats_adv_prev):
-            try:
-                fetched_p, _ = await fetch_stats_with_fallback(account_id, start_date, adv_day_before)
-                if _adv_has_data(fetched_p):
-                    stats_adv_prev = fetched_p
-                else:
-                    fetched_p2, _ = await fetch_stats_with_fallback(account_id, start_date, adv_three_days_ago)
-                    stats_adv_prev = fetched_p2 if _adv_has_data(fetched_p2) else None
-            except Exception as e:
-                log_info(f"[ADV STATS] Live fetch prev failed: {e}")
-                stats_adv_prev = None
-
-        def _adv_int(s):
-            if not s:
-                return 0
-            try:
-                return int(str(s).replace(",", "").replace("+", "").replace("-", "").strip())
-            except:
-                return 0
-
-        def _adv_gain(field):
-            t = _adv_int(stats_adv_today.get(field) if stats_adv_today else None)
-            p = _adv_int(stats_adv_prev.get(field) if stats_adv_prev else None)
-            return t - p if t and t > p else None
-
-        def _adv_total(field):
-            return _adv_int(stats_adv_today.get(field) if stats_adv_today else None) or None
-
-        # Check how many days of data exist for this season
-        data_date_count = count_season_data_dates(season_id, account_id)
-        is_single_day = data_date_count == 1
-        
-        if is_single_day:
-            log_info(f"[PROGRESS] Only 1 day of data for {account_id} in season {season_id}")
-        
-        # Get highest power from normal profile (only if not in database)
-        highest_power = await fetch_highest_power(account_id)
+        report, adv_dates = new_progress_report(season, account_id, stats, end_date_used)
         
-        # Get alliance tag fresh from Call of Stats
-        alliance_tag = await fetch_alliance_tag(account_id)
+        # All lookups are independent - run them at once
+        core, slow = progress_report_lookups(season, account_id, adv_dates, get_tracked_account_ids(ctx.guild))
+        core = {key: asyncio.create_task(coro) for key, coro in core.items()}
+        slow = {key: asyncio.create_task(coro) for key, coro in slow.items()}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + PROGRESS_DEADLINE
         
-        # Get current T-kills from normal profile (only if not in database)
-        current_t_kills = await fetch_current_t_kills(account_id)
-
-        # Get Exchange Coins Spent + Max Pets (achievement stats, shown via "Show More" button)
-        achievement_stats = await fetch_achievement_stats(account_id)
-        exchange_coins_spent = achievement_stats["exchange_coins_spent"]
-        max_pets = achievement_stats["max_pets"]
-        
-        # Calculate merit to power ratio using highest power and merits
-        if stats.get("merits") and highest_power:
-            try:
-                merits_str = stats["merits"].replace("+", "").replace(",", "")
-                merits_val = int(merits_str) if merits_str.isdigit() else 0
-                
-                # Calculate ratio: (Merits / Highest Power) × 100
-                if highest_power > 0:
-                    ratio = (merits_val / highest_power) * 100
-                    stats["merits_pct"] = f"{ratio:.1f}%"
+        def collect(tasks):
+            for key, task in tasks.items():
+                if not task.done() or task.cancelled():
+                    continue
+                if task.exception():
+                    log_info(f"[PROGRESS] {key} failed: {task.exception()}")
+                    value = None
                 else:
-                    stats["merits_pct"] = "0%"
-            except Exception as e:
-                stats["merits_pct"] = "0%"
-        else:
-            stats["merits_pct"] = "0%"
-        
-        # Debug: log what we parsed
-        log_info(f"[PROGRESS] Parsed stats: {stats}")
-        log_info(f"[PROGRESS] Highest power: {highest_power}")
-        log_info(f"[PROGRESS] Merit ratio: {stats.get('merits_pct')}")
-        log_info(f"[PROGRESS] Current T-kills: {current_t_kills}")
-        
-        # Get rankings for all stats
-        power_rank = await get_rankings_for_stat(ctx, "power_gain", start_date, end_date_used)
-        merits_rank = await get_rankings_for_stat(ctx, "merits", start_date, end_date_used)
-        kills_rank = await get_rankings_for_stat(ctx, "kills_gain", start_date, end_date_used)
-        deads_rank = await get_rankings_for_stat(ctx, "deads_gain", start_date, end_date_used)
-        healed_rank = await get_rankings_for_stat(ctx, "healed_gain", start_date, end_date_used)
-        
-        # Calculate power_gain
-        power_gain = 0
-        if stats["power_gain"]:
-            power_gain_str = stats["power_gain"].replace("+", "")
-            try:
-                power_gain = int(power_gain_str.replace(",", ""))
-            except Exception as e:
-                power_gain = 0
-        
-        # Build ranking strings
-        power_rank_str = f" (#{power_rank[account_id][0]})" if account_id in power_rank else ""
-        merits_rank_str = f" (#{merits_rank[account_id][0]})" if account_id in merits_rank else ""
-        kills_rank_str = f" (#{kills_rank[account_id][0]})" if account_id in kills_rank else ""
-        deads_rank_str = f" (#{deads_rank[account_id][0]})" if account_id in deads_rank else ""
-        healed_rank_str = f" (#{healed_rank[account_id][0]})" if account_id in healed_rank else ""
-        
-        
-        # Calculate totals for RSS
-        total_spent = 0
-        total_gathered = 0
-        
-        for key in ["gold_spent", "wood_spent", "ore_spent", "mana_spent"]:
-            val_str = stats.get(key, "+0").replace(",", "").replace("+", "")
-            try:
-                total_spent += abs(int(val_str)) if val_str.lstrip("-").isdigit() else 0
-            except Exception as e:
-                pass
-        
-        for key in ["gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered"]:
-            val_str = stats.get(key, "+0").replace(",", "").replace("+", "")
-            try:
-                total_gathered += abs(int(val_str)) if val_str.lstrip("-").isdigit() else 0
-            except Exception as e:
-                pass
-        
-        # Build text output - MATCH REFERENCE FORMAT
-        lord_name = stats.get("lord_name", "Unknown")
-        output = f"```✅ Progress Report for {lord_name} {alliance_tag} for season {season_name}\n"
-        
-        if is_single_day:
-            output += f"⚠️  Only 1 day of data available - showing absolute values\n"
-        
-        output += f"\n"  # Line break before Power
-        
-        # Power - with highest power + season gain on ONE line
-        if highest_power or power_gain:
-            output += f"⚡ Power "
-            if highest_power and power_gain:
-                output += f"{highest_power:,} (+{power_gain:,}){power_rank_str}\n"
-            elif highest_power:
-                output += f"{highest_power:,}{power_rank_str}\n"
-            elif power_gain:
-                output += f"+{power_gain:,}{power_rank_str}\n"
-        
-        # Merits - with ranking on ONE line
-        if stats.get("merits"):
-            merits_display = f"{stats['merits']}"
-            if stats.get("merits_pct"):
-                merits_display += f" ({stats['merits_pct']})"
-            output += f"🏅 Merits {merits_display}{merits_rank_str}\n"
-        
-        output += f"\n"
-        
-        # Kills - one line
-        if stats.get("kills_gain"):
-            output += f"⚔️ Kills {stats['kills_gain']}{kills_rank_str}\n"
-        
-        # Deaths - one line
-        if stats.get("deads_gain"):
-            output += f"💀 Deaths {stats['deads_gain']}{deads_rank_str}\n"
-        
-        # Healed - combine healed_gain + t45_healed
-        if stats.get("healed_gain"):
-            healed_display = stats['healed_gain']
-            if stats.get("t45_healed"):
-                healed_display += f" (T4/T5: {stats['t45_healed']})"
-            output += f"❤️ Healed {healed_display}{healed_rank_str}\n"
-        
-        output += f"\n"
-
-        # Advanced War Stats (Merit Breakdown) — delayed 1 day by COS
-        def _fmt(n):
-            return f"{n:,}" if n else None
-
-        adv_fields = [
-            ("infantry_merits",  "⚔️ Infantry"),
-            ("cavalry_merits",   "🐴 Cavalry"),
-            ("mage_merits",      "🔮 Mage"),
-            ("marksman_merits",  "🏹 Marksman"),
-            ("other_merits",     "🌀 Other"),
-            ("t45_healed",       "💊 T4/T5 RSS Healed"),
-            ("t45_dead",         "💀 T4/T5 Dead"),
-        ]
-
-        adv_has_data = any(_adv_total(f) for f, _ in adv_fields)
-
-        if adv_has_data:
-            output += f"🏅 Advanced War Stats _(data from {adv_yesterday}, delayed 1 day)_\n"
-            for field, label in adv_fields:
-                total = _adv_total(field)
-                gain  = _adv_gain(field)
-                if total:
-                    gain_str  = f" (+{_fmt(gain)} today)" if gain else ""
-                    output += f"{label}: {_fmt(total)}{gain_str}\n"
-        else:
-            output += f"🏅 Advanced War Stats\n"
-            output += f"_(not yet available — delayed 1 day by COS)_\n"
-
-        output += f"\n"
-
-        # RSS Spent - each resource on own line with absolute values
-        output += f"💰 RSS Spent _(currently broken on COS)_\n"
-        if stats.get("gold_spent"):
-            gold_clean = stats['gold_spent'].replace(",", "").replace("+", "")
-            gold_val = abs(int(gold_clean)) if gold_clean.lstrip("-").isdigit() else 0
-            output += f"🪙 Gold: -{gold_val:,}\n"
-        if stats.get("wood_spent"):
-            wood_clean = stats['wood_spent'].replace(",", "").replace("+", "")
-            wood_val = abs(int(wood_clean)) if wood_clean.lstrip("-").isdigit() else 0
-            output += f"🪵 Wood: -{wood_val:,}\n"
-        if stats.get("ore_spent"):
-            ore_clean = stats['ore_spent'].replace(",", "").replace("+", "")
-            ore_val = abs(int(ore_clean)) if ore_clean.lstrip("-").isdigit() else 0
-            output += f"⛏️ Ore: -{ore_val:,}\n"
-        if stats.get("mana_spent"):
-            mana_clean = stats['mana_spent'].replace(",", "").replace("+", "")
-            mana_val = abs(int(mana_clean)) if mana_clean.lstrip("-").isdigit() else 0
-            output += f"💧 Mana: -{mana_val:,}\n"
-        output += f"Total: -{total_spent:,}\n"
-        output += f"\n"
-        
-        # RSS Gathered - each resource on own line
-        output += f"👨‍🌾 RSS Gathered\n"
-        if stats.get("gold_gathered"):
-            output += f"🪙 Gold: {stats['gold_gathered']}\n"
-        if stats.get("wood_gathered"):
-            output += f"🪵 Wood: {stats['wood_gathered']}\n"
-        if stats.get("ore_gathered"):
-            output += f"⛏️ Ore: {stats['ore_gathered']}\n"
-        if stats.get("mana_gathered"):
-            output += f"💧 Mana: {stats['mana_gathered']}\n"
-        output += f"Total: {total_gathered:,}\n"
-        output += f"\n"
-
-        # Achievements - shown directly in the report
-        output += f"🏆 Achievements\n"
-        coins_str = f"{exchange_coins_spent:,}" if exchange_coins_spent is not None else "not available"
-        pets_str = f"{max_pets:,}" if max_pets is not None else "not available"
-        output += f"🪙 Exchange Coins Spent: {coins_str}\n"
-        output += f"🐾 Max Pets: {pets_str}\n"
-        output += f"\n"
-        
-        # Timespan
-        output += f"📅 Timespan: {start_date} → {end_date_used}```"
-
-        await msg.edit(content=output)
+                    value = task.result()
+                apply_progress_lookup(report, key, value)
+        
+        # First answer as soon as the core lookups land (or the core timeout passes);
+        # slow sections that already finished are included too
+        await asyncio.wait(core.values(), timeout=PROGRESS_CORE_TIMEOUT)
+        collect(core)
+        collect(slow)
+        
+        log_info(f"[PROGRESS] Highest power: {report.get('highest_power')}, current T-kills: {report.get('current_t_kills')}")
+        await msg.edit(content=render_progress_report(report))
+        
+        # Follow-up: fill in late core lookups and slow sections that arrive before the deadline
+        lookups = {**core, **slow}
+        still_running = [t for t in lookups.values() if not t.done()]
+        if still_running:
+            await asyncio.wait(still_running, timeout=max(0, deadline - loop.time()))
+            for key, task in lookups.items():
+                if not task.done():
+                    task.cancel()
+                    log_info(f"[PROGRESS] {key} missed the {PROGRESS_DEADLINE}s deadline")
+            collect(lookups)
+            report["pending"].clear()
+            await msg.edit(content=render_progress_report(report))
+        
+        # Stale stats: edit once more only if the live fetch changed them
+        fresh = await revalidated_progress_report(season, account_id, report, revalidation)
+        if fresh:
+            await msg.edit(content=render_progress_report(fresh))
         
     except Exception as e:
         log_info(f"[PROGRESS ERROR] {e}")
@@ -2867,30 +5743,15 @@ async def oldprogress(ctx, user_input: str = None):
     account_id = None
     
     if not user_input:
-        for role in ctx.author.roles:
-            if role.name.isdigit():
-                account_id = role.name
-                break
+        account_id = get_member_account_id(ctx.guild, ctx.author.id)
         if not account_id:
             return await ctx.send("❌ You don't have a numeric role. Ask the owner to give you one.")
     elif user_input.isdigit():
         account_id = user_input
     else:
-        username_lower = user_input.lower()
-        for username, discord_id in USERNAME_TO_DISCORD_ID.items():
-            if username.lower() == username_lower:
-                try:
-                    member = ctx.guild.get_member(discord_id)
-                    if member:
-                        for role in member.roles:
-                            if role.name.isdigit():
-                                account_id = role.name
-                                break
-                except Exception as e:
-                    pass
-                break
+        account_id = get_account_id_for_name(ctx.guild, user_input) or lord_names.resolve(user_input)
         if not account_id:
-            return await ctx.send(f"❌ Could not find account ID for '{user_input}'")
+            return await ctx.send(account_not_found_message(user_input))
     
     if not account_id:
         return await ctx.send("❌ Could not determine account ID.")
@@ -3039,19 +5900,37 @@ async def forcefetch(ctx):
     if ctx.author.id != OWNER_ID:
         return await ctx.send("❌ Owner only.")
     
+    if not db_get_current_season():
+        return await ctx.send("❌ No season active. Use `/newseason` to start one.")
+    
+    job_id = db_enqueue_job("forcefetch", {"channel_id": ctx.channel.id}, dedupe=True)
+    await ctx.send(f"🧾 Force fetch queued as job #{job_id} — results will be posted here (`!jobs` to follow it).")
+
+
+@job_handler("forcefetch")
+async def run_forcefetch_job(payload):
+    """Background part of !forcefetch"""
+    channel = bot.get_channel(payload["channel_id"])
+    if not channel:
+        raise RuntimeError(f"Channel {payload['channel_id']} not found")
+    
     season = db_get_current_season()
     if not season:
-        return await ctx.send("❌ No season active. Use `/newseason` to start one.")
+        await channel.send("❌ No season active. Use `/newseason` to start one.")
+        return None
     
     season_id, season_name, start_date, created_at = season
     today = date.today().isoformat()
     
     # Get all lords from server members
-    lords = get_all_lords_from_guild(ctx.guild)
+    lords = get_all_lords_from_guild(channel.guild)
     if not lords:
-        return await ctx.send("❌ No members with numeric roles found.")
+        await channel.send("❌ No members with numeric roles found.")
+        return {"fetched": 0, "failed": 0}
     
-    await ctx.send(f"⏳ Fetching stats for {len(lords)} members from season {season_name}...")
+    progress = await ProgressReporter.start(
+        channel, f"Fetching stats for {len(lords)} members from season {season_name}", len(lords), unit="members"
+    )
     
     fetched = 0
     failed = 0
@@ -3071,6 +5950,9 @@ async def forcefetch(ctx):
         except Exception as e:
             failed += 1
             log_info(f"[FORCEFETCH] ERROR {name}: {e}")
+        await progress.tick(detail=f"✅ Fetched {fetched} | ❌ Failed {failed}")
+    
+    await progress.finish()
     
     embed = discord.Embed(
         title="📊 Force Fetch Complete",
@@ -3082,7 +5964,8 @@ async def forcefetch(ctx):
     embed.add_field(name="💾 Cache", value=f"All data cached for 3 days", inline=False)
     embed.set_footer(text=f"Fetched: {start_date} → {today}")
     
-    await ctx.send(embed=embed)
+    await channel.send(embed=embed)
+    return {"fetched": fetched, "failed": failed}
 
 
 @bot.command(name="loadhistory")
@@ -3098,37 +5981,88 @@ async def loadhistory(ctx, mode: str = None):
     if ctx.author.id != OWNER_ID:
         return await ctx.send("❌ Owner only.")
     
+    if not db_get_current_season():
+        return await ctx.send("❌ No season active.")
+    
+    mode = "all" if mode and mode.lower() == "all" else "season"
+    job_id = db_enqueue_job("loadhistory", {"channel_id": ctx.channel.id, "mode": mode}, dedupe=True)
+    await ctx.send(f"🧾 History load ({mode}) queued as job #{job_id} — progress will be posted here (`!jobs` to follow it).")
+
+
+@job_handler("loadhistory")
+async def run_loadhistory_job(payload):
+    """Background part of !loadhistory"""
+    channel = bot.get_channel(payload["channel_id"])
+    if not channel:
+        raise RuntimeError(f"Channel {payload['channel_id']} not found")
+    mode = payload.get("mode")
+    
     season = db_get_current_season()
     if not season:
-        return await ctx.send("❌ No season active.")
+        await channel.send("❌ No season active.")
+        return None
     
     season_id, season_name, season_start_date, created_at = season
     today = date.today()
     
     # Get all members to fetch for
-    lords = get_all_lords_from_guild(ctx.guild)
-    for discord_id, account_id in DISCORD_TO_ACCOUNT_ID.items():
-        if not any(l["account_id"] == account_id for l in lords):
+    lords = get_all_lords_from_guild(channel.guild)
+    lord_ids = {l["account_id"] for l in lords}
+    for account_id in registry.tracked_account_ids():
+        if account_id not in lord_ids:
             lords.append({"account_id": account_id, "name": f"Account {account_id}"})
     
+    # Per-account first day worth fetching (days before it are known to be empty)
+    lord_start_dates = {}
+    failed_lords = []    # Members whose earliest date couldn't be determined - not loaded
+    
     # Determine start date
     if mode and mode.lower() == "all":
-        msg = await ctx.send(f"🔍 Scanning Call of Stats starting from Dec 1, 2025...\nThis may take 2-3 minutes...")
+        msg = await channel.send(f"🔍 Searching Call of Stats for each member's earliest data (from {HISTORY_FLOOR_DATE.isoformat()})...")
         
-        # Start from December 1, 2025
-        start = date(2025, 12, 1)
+        # Find each account's earliest non-empty date instead of walking every empty day
+        total_probes = 0
+        lords_with_data = []
+        for lord in lords:
+            try:
+                earliest, probes = await find_earliest_data_date(lord["account_id"], HISTORY_FLOOR_DATE, today)
+            except RuntimeError as e:
+                log_error(f"[LOADHISTORY] Earliest date search failed for {lord['account_id']}: {e}")
+                failed_lords.append(lord.get("name", lord["account_id"]))
+                continue
+            total_probes += probes
+            if earliest:
+                lord_start_dates[lord["account_id"]] = earliest
+                lords_with_data.append(lord)
+        
+        if not lords_with_data:
+            failed_text = f"\n⚠️ Search failed for: {', '.join(failed_lords)} — run it again later." if failed_lords else ""
+            await msg.edit(content=f"❌ No Call of Stats data found for any member since {HISTORY_FLOOR_DATE.isoformat()}.{failed_text}")
+            return {"saved": 0, "skipped": 0, "failed": len(failed_lords)}
+        
+        skipped_members = len(lords) - len(lords_with_data) - len(failed_lords)
+        lords = lords_with_data
+        start = min(lord_start_dates.values())
         date_range_text = f"{start.isoformat()} → {today.isoformat()} (ALL available data!)"
         load_mode = "all"
+        log_info(
+            f"[LOADHISTORY] Earliest data {start.isoformat()} found with {total_probes} probes, "
+            f"{skipped_members} member(s) without data, {len(failed_lords)} failed"
+        )
         
     else:
         start = datetime.strptime(season_start_date, "%Y-%m-%d").date()
         date_range_text = f"{start.isoformat()} → {today.isoformat()}"
         load_mode = "season"
-        msg = await ctx.send(f"⏳ Loading historical data...\n📅 {date_range_text}")
+        msg = await channel.send(f"⏳ Loading historical data...\n📅 {date_range_text}")
     
     total_days = (today - start).days + 1
     
-    await msg.edit(content=f"⏳ Loading historical data...\n📅 {date_range_text}\n👥 {len(lords)} members × {total_days} days = {total_days * len(lords)} snapshots\nThis may take 5-30 minutes depending on data size...")
+    progress = ProgressReporter(
+        msg, "Loading historical data...", total_days * len(lords),
+        header=f"📅 {date_range_text}\n👥 {len(lords)} members × {total_days} days", unit="snapshots"
+    )
+    await msg.edit(content=progress.render())
     
     # Fetch data for each day - fetch EACH DAY INDIVIDUALLY
     current_date = start
@@ -3146,6 +6080,10 @@ async def loadhistory(ctx, mode: str = None):
                 account_id = lord["account_id"]
                 name = lord.get("name", account_id)
                 
+                # Before this account's earliest data - nothing to fetch
+                if account_id in lord_start_dates and current_date < lord_start_dates[account_id]:
+                    continue
+                
                 # CHECK: Does this snapshot already exist?
                 if db_snapshot_exists(season_id, account_id, date_str):
                     # Already saved, skip it!
@@ -3163,9 +6101,11 @@ async def loadhistory(ctx, mode: str = None):
                     continue
                 
                 if stats:
-                    # Save to database with the correct date
-                    db_save_season_progress(season_id, account_id, stats.get("lord_name", name), stats, actual_date)
-                    saved_count += 1
+                    # Save to database with the correct date (quarantined snapshots count as skipped)
+                    if db_save_season_progress(season_id, account_id, stats.get("lord_name", name), stats, actual_date):
+                        saved_count += 1
+                    else:
+                        skipped_count += 1
                 else:
                     failed_count += 1
                     
@@ -3173,17 +6113,19 @@ async def loadhistory(ctx, mode: str = None):
                 log_error(f"[LOADHISTORY] Error for {account_id} on {date_str}: {e}")
                 failed_count += 1
                 continue
-        
-        # Update progress message every 5 days or on last day
-        if day_num % 5 == 0 or current_date == today:
-            progress = (day_num / total_days) * 100
-            try:
-                await msg.edit(content=f"⏳ Loading historical data...\n📅 {date_range_text}\nDay {day_num}/{total_days} ({progress:.0f}%)\n✅ Saved {saved_count} | ⏭️ Skipped {skipped_count}")
-            except:
-                pass
+            finally:
+                await progress.tick(detail=f"Day {day_num}/{total_days} — ✅ Saved {saved_count} | ⏭️ Skipped {skipped_count}")
         
         current_date += timedelta(days=1)
     
+    await progress.finish(detail=f"✅ Saved {saved_count} | ⏭️ Skipped {skipped_count} | ❌ Failed {failed_count}")
+    
+    if saved_count:
+        try:
+            await asyncio.to_thread(db_fill_rank_history, season_id, get_tracked_account_ids(channel.guild), start.isoformat())
+        except Exception as e:
+            log_error(f"[LOADHISTORY] Ranking failed: {e}")
+    
     # Create result embed
     embed = discord.Embed(
         title="📚 Historical Data Load Complete",
@@ -3196,11 +6138,18 @@ async def loadhistory(ctx, mode: str = None):
     embed.add_field(name="📊 Snapshots Saved", value=str(saved_count), inline=True)
     embed.add_field(name="⏭️ Snapshots Skipped", value=str(skipped_count), inline=True)
     embed.add_field(name="📈 Total Days Covered", value=str(total_days), inline=True)
+    if failed_lords:
+        embed.add_field(
+            name="⚠️ Not Loaded",
+            value=f"Earliest-date search failed for {', '.join(failed_lords)} — run `!loadhistory all` again later."[:1024],
+            inline=False
+        )
     embed.add_field(name="✅ Status", value="Complete database created!\n\n🎯 You can now use `!gains` with dates from this entire range!", inline=False)
     embed.set_footer(text="!gains is now fully powered with all available historical data")
     
-    await ctx.send(embed=embed)
+    await channel.send(embed=embed)
     log_info(f"[LOADHISTORY] Complete! Mode={load_mode}, Saved {saved_count}, Skipped {skipped_count} from {start.isoformat()} to {today.isoformat()}")
+    return {"saved": saved_count, "skipped": skipped_count, "failed": failed_count + len(failed_lords)}
 
 
 @bot.command(name="seasonhistory")
@@ -3364,6 +6313,11 @@ class CleanupModal(discord.ui.Modal, title="🗑️ Delete Data"):
             conn.commit()
             conn.close()
             
+            # Snapshots that lost their predecessor need new deltas, and every table
+            # derived from the deleted snapshots has to drop them
+            if deleted_count:
+                db_rebuild_daily_deltas()
+            
             embed = discord.Embed(
                 title="🗑️ Data Cleanup Complete",
                 description=f"Deleted data {mode_display}",
@@ -3475,41 +6429,23 @@ class GainsDateSelector(discord.ui.View):
         
         await interaction.response.defer()
         
-        # Get stats for both dates
-        stats_start = db_get_season_progress(self.season_id, self.account_id, self.selected_start)
-        stats_end = db_get_season_progress(self.season_id, self.account_id, self.selected_end)
-        
-        if not stats_start:
-            stats_start = get_cached_stats(self.account_id, self.start_date, self.selected_start)
-        if not stats_end:
-            stats_end = get_cached_stats(self.account_id, self.start_date, self.selected_end)
-        
-        if not stats_start or not stats_end:
+        # Range gain straight from the cumulative daily_deltas rows of both dates
+        rows = db_get_gains_between(self.season_id, self.selected_start, self.selected_end, [self.account_id])
+        if not rows:
             return await interaction.followup.send("❌ Missing data for selected dates")
+        gains = rows[0]
         
-        # Helper to parse stats
-        def parse_stat(s):
-            if not s:
-                return 0
-            return int(str(s).replace("+", "").replace(",", "") or 0)
-        
-        # Calculate gains
-        power_gain = parse_stat(stats_end.get("power_gain", "0")) - parse_stat(stats_start.get("power_gain", "0"))
-        merits_gain = parse_stat(stats_end.get("merits", "0")) - parse_stat(stats_start.get("merits", "0"))
-        kills_gain = parse_stat(stats_end.get("kills_gain", "0")) - parse_stat(stats_start.get("kills_gain", "0"))
-        deaths_gain = parse_stat(stats_end.get("deads_gain", "0")) - parse_stat(stats_start.get("deads_gain", "0"))
-        mana_gain = parse_stat(stats_end.get("mana_gathered", "0")) - parse_stat(stats_start.get("mana_gathered", "0"))
-        mana_spent = abs(parse_stat(stats_end.get("mana_spent", "0")))
-        gold_spent = abs(parse_stat(stats_end.get("gold_spent", "0")))
-        wood_spent = abs(parse_stat(stats_end.get("wood_spent", "0")))
-        ore_spent = abs(parse_stat(stats_end.get("ore_spent", "0")))
-        
-        # Debug logging
-        log_info(f"[GAINS DEBUG] Start date {self.selected_start}: power_gain={stats_start.get('power_gain')}")
-        log_info(f"[GAINS DEBUG] End date {self.selected_end}: power_gain={stats_end.get('power_gain')}")
-        log_info(f"[GAINS DEBUG] Calculated power_gain: {power_gain}")
-        
-        lord_name = stats_end.get("lord_name", self.account_id)
+        power_gain = gains["power"]
+        merits_gain = gains["merits"]
+        kills_gain = gains["kills"]
+        deaths_gain = gains["deaths"]
+        mana_gain = gains["mana"]
+        mana_spent = gains["mana_spent"]
+        gold_spent = gains["gold_spent"]
+        wood_spent = gains["wood_spent"]
+        ore_spent = gains["ore_spent"]
+        
+        lord_name = gains["lord_name"] or self.account_id
         
         # Create columnar display
         day_count = (datetime.strptime(self.selected_end, "%Y-%m-%d").date() - 
@@ -3539,16 +6475,105 @@ class GainsDateSelector(discord.ui.View):
         await interaction.followup.send(embed=embed)
 
 
+GAINS_PAGE_SIZE = 10    # Lords per page; keeps a page under the 2000 char limit
+
+def render_gains_page(rows, season_name, start, end, page, skipped=0):
+    """One page of the ranked gains report as a code block"""
+    pages = max(1, -(-len(rows) // GAINS_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+    output = f"```📊 Gains {start} → {end} - {season_name} (page {page + 1}/{pages})\n"
+    output += "⚔️ Power | 🏆 Merits | 💀 Kills | ☠️ Deaths | 💧 Mana | 💰 RSS Spent\n\n"
+    first = page * GAINS_PAGE_SIZE
+    for rank, row in enumerate(rows[first:first + GAINS_PAGE_SIZE], start=first + 1):
+        rss_spent = sum(row[column] for column in GAINS_SPENT_FIELDS)
+        output += f"{rank}. {row['lord_name']}\n"
+        output += (
+            f"   ⚔️ {row['power']:+,} | 🏆 {row['merits']:+,} | 💀 {row['kills']:+,} | "
+            f"☠️ {row['deaths']:+,} | 💧 {row['mana']:+,} | 💰 {rss_spent:,}\n"
+        )
+    if not rows:
+        output += "No lords have data on both dates.\n"
+    if skipped:
+        output += f"\n⚠️ {skipped} lord(s) without data on both dates\n"
+    output += "```"
+    return output
+
+
+class GainsPageView(discord.ui.View):
+    """◀ / ▶ paging for the gains report"""
+    
+    def __init__(self, rows, season_name, start, end, skipped=0):
+        super().__init__(timeout=300)
+        self.rows = rows
+        self.season_name = season_name
+        self.start = start
+        self.end = end
+        self.skipped = skipped
+        self.page = 0
+        self.pages = max(1, -(-len(rows) // GAINS_PAGE_SIZE))
+    
+    def render(self):
+        return render_gains_page(self.rows, self.season_name, self.start, self.end, self.page, self.skipped)
+    
+    async def turn(self, interaction: discord.Interaction, step):
+        self.page = (self.page + step) % self.pages
+        await interaction.response.edit_message(content=self.render(), view=self)
+    
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.turn(interaction, -1)
+    
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.turn(interaction, 1)
+
+
+def build_gains_report(season, start, end, account_ids):
+    """
+    Ranked gains between two stored dates: (content, view or None).
+    Missing dates default to the first / latest stored date of the season.
+    """
+    season_id, season_name, _, _ = season
+    dates = db_get_season_dates(season_id)
+    if not dates:
+        return f"❌ No saved data found in {season_name}. Run `!loadhistory` first.", None
+    start = start or dates[-1]
+    end = end or dates[0]
+    for d in (start, end):
+        if d not in dates:
+            return f"❌ No data stored for {d}. Stored dates: {dates[-1]} → {dates[0]} ({len(dates)} days)", None
+    if start >= end:
+        return "❌ Start date must be before end date", None
+    
+    rows = db_get_gains_between(season_id, start, end, account_ids)
+    skipped = len(set(account_ids)) - len(rows) if account_ids is not None else 0
+    view = GainsPageView(rows, season_name, start, end, skipped)
+    return view.render(), view if view.pages > 1 else None
+
+
 @bot.command(name="gains")
-async def gains(ctx, param1: str = None, param2: str = None):
+async def gains(ctx, param1: str = None, param2: str = None, param3: str = None):
     """
     Interactive GUI to view gains.
     
     Usage: 
       !gains rekz (current season for rekz)
       !gains rekz sos1 (Season 1 data for rekz)
+      !gains all 2026-01-05 2026-01-20 (every lord between two stored dates)
     """
     
+    # Alliance-wide report between two dates
+    if param1 and param1.lower() == "all":
+        season = db_get_current_season()
+        if not season:
+            return await ctx.send("❌ No active season found.")
+        try:
+            content, view = build_gains_report(season, param2, param3, get_tracked_account_ids(ctx.guild))
+        except Exception as e:
+            log_error(f"[GAINS ALL] Error: {e}")
+            return await ctx.send("❌ Error loading data. Try again later.")
+        return await ctx.send(content, view=view) if view else await ctx.send(content)
+    
     # Identify user and season from parameters
     season = None
     user_input = None
@@ -3578,7 +6603,7 @@ async def gains(ctx, param1: str = None, param2: str = None):
     # Get account ID
     account_id = await get_account_id_from_input(ctx, user_input)
     if not account_id:
-        return await ctx.send("❌ Could not find account ID.")
+        return await ctx.send(account_not_found_message(user_input) if user_input else "❌ Could not find account ID.")
     
     # Get available dates for the season
     try:
@@ -3618,6 +6643,34 @@ async def gains(ctx, param1: str = None, param2: str = None):
         await ctx.send("❌ Error loading data. Try again later.")
 
 
+@bot.tree.command(name="gain", description="Gains between two stored dates (all lords, or one)")
+@app_commands.describe(start_date="First date", end_date="Last date", user="Username, lord name or account ID (default: everyone)")
+@app_commands.autocomplete(start_date=date_autocomplete, end_date=date_autocomplete)
+async def gain_slash(inter: discord.Interaction, start_date: str, end_date: str, user: str = None):
+    season = db_get_current_season()
+    if not season:
+        return await inter.response.send_message("❌ No active season found.", ephemeral=True)
+    
+    if user:
+        account_id = user if user.isdigit() else (get_account_id_for_name(inter.guild, user) or lord_names.resolve(user))
+        if not account_id:
+            return await inter.response.send_message(account_not_found_message(user), ephemeral=True)
+        account_ids = [account_id]
+    else:
+        account_ids = get_tracked_account_ids(inter.guild)
+    
+    await inter.response.defer()
+    try:
+        content, view = build_gains_report(season, start_date.strip(), end_date.strip(), account_ids)
+    except Exception as e:
+        log_error(f"[GAIN] Error: {e}")
+        return await inter.followup.send("❌ Error loading data. Try again later.")
+    if view:
+        await inter.followup.send(content, view=view)
+    else:
+        await inter.followup.send(content)
+
+
 @bot.command(name="topmana")
 async def topmana(ctx, season_name: str = None):
     """Leaderboard for mana gathered. Usage: !topmana (current) or !topmana sos1 (specific season)"""
@@ -3641,14 +6694,15 @@ async def topmana(ctx, season_name: str = None):
     if not lords:
         return await ctx.send("❌ No members with numeric roles found. Create roles with account IDs as names (e.g., `16322115`).")
     
-    await ctx.send(f"⏳ Fetching leaderboard data for {len(lords)} lords...")
+    progress = await ProgressReporter.start(ctx.channel, "Fetching leaderboard data", len(lords), unit="lords")
     
     # Fetch all lords in parallel with fallback
     fetch_tasks = [
         fetch_stats_with_fallback(lord["account_id"], start_date, today)
         for lord in lords
     ]
-    results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    results = await gather_with_progress(fetch_tasks, progress)
+    await progress.finish()
     
     leaderboard = []
     actual_end_date = today
@@ -3682,6 +6736,7 @@ async def topmana(ctx, season_name: str = None):
                 lord_name = lord["name"]
             
             leaderboard.append({
+                "account_id": lord["account_id"],
                 "name": lord_name,
                 "mana": mana_num,
                 "mana_str": mana_str
@@ -3689,6 +6744,7 @@ async def topmana(ctx, season_name: str = None):
         except Exception as e:
             log_info(f"[TOPMANA ERROR] {lord['account_id']}: {e}")
             leaderboard.append({
+                "account_id": lord["account_id"],
                 "name": lord["name"],
                 "mana": 0,
                 "mana_str": "+0"
@@ -3697,13 +6753,15 @@ async def topmana(ctx, season_name: str = None):
     # Sort by mana descending
     leaderboard.sort(key=lambda x: x["mana"], reverse=True)
     
+    moves = await leaderboard_moves(season_id, "mana_gathered")
+    
     # Build text output - compact
     output = f"```🏆 Top Mana Gathered - {season_name_display}\n"
     medals = ["🥇", "🥈", "🥉"]
     
     for i, lord in enumerate(leaderboard):
         medal = medals[i] if i < 3 else f"{i+1}."
-        output += f"{medal} {lord['name']}: {lord['mana_str']}\n"
+        output += f"{medal} {lord['name']}: {lord['mana_str']}{moves.get(lord['account_id'], '')}\n"
     
     output += f"📅 {start_date} → {actual_end_date}```"
     await ctx.send(output)
@@ -3732,14 +6790,15 @@ async def topdeaths(ctx, season_name: str = None):
     if not lords:
         return await ctx.send("❌ No members with numeric roles found. Create roles with account IDs as names (e.g., `16322115`).")
     
-    await ctx.send(f"⏳ Fetching leaderboard data for {len(lords)} lords...")
+    progress = await ProgressReporter.start(ctx.channel, "Fetching leaderboard data", len(lords), unit="lords")
     
     # Fetch all lords in parallel with fallback
     fetch_tasks = [
         fetch_stats_with_fallback(lord["account_id"], start_date, today)
         for lord in lords
     ]
-    results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    results = await gather_with_progress(fetch_tasks, progress)
+    await progress.finish()
     
     leaderboard = []
     actual_end_date = today
@@ -3773,6 +6832,7 @@ async def topdeaths(ctx, season_name: str = None):
                 lord_name = lord["name"]
             
             leaderboard.append({
+                "account_id": lord["account_id"],
                 "name": lord_name,
                 "deaths": deaths_num,
                 "deaths_str": deaths_str
@@ -3780,6 +6840,7 @@ async def topdeaths(ctx, season_name: str = None):
         except Exception as e:
             log_info(f"[TOPDEATHS ERROR] {lord['account_id']}: {e}")
             leaderboard.append({
+                "account_id": lord["account_id"],
                 "name": lord["name"],
                 "deaths": 0,
                 "deaths_str": "+0"
@@ -3788,13 +6849,15 @@ async def topdeaths(ctx, season_name: str = None):
     # Sort by deaths descending
     leaderboard.sort(key=lambda x: x["deaths"], reverse=True)
     
+    moves = await leaderboard_moves(season_id, "deads_gain")
+    
     # Build text output - compact
     output = f"```💀 Most Deaths - {season_name_display}\n"
     medals = ["🥇", "🥈", "🥉"]
     
     for i, lord in enumerate(leaderboard):
         medal = medals[i] if i < 3 else f"{i+1}."
-        output += f"{medal} {lord['name']}: {lord['deaths_str']}\n"
+        output += f"{medal} {lord['name']}: {lord['deaths_str']}{moves.get(lord['account_id'], '')}\n"
     
     output += f"📅 {start_date} → {actual_end_date}```"
     await ctx.send(output)
@@ -3823,10 +6886,11 @@ async def topmerits(ctx, season_name: str = None):
     if not lords:
         return await ctx.send("❌ No members with numeric roles found.")
     
-    await ctx.send(f"⏳ Fetching leaderboard data for {len(lords)} lords...")
+    progress = await ProgressReporter.start(ctx.channel, "Fetching leaderboard data", len(lords), unit="lords")
     
     fetch_tasks = [fetch_stats_with_fallback(lord["account_id"], start_date, today) for lord in lords]
-    results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    results = await gather_with_progress(fetch_tasks, progress)
+    await progress.finish()
     
     leaderboard = []
     actual_end_date = today
@@ -3847,18 +6911,19 @@ async def topmerits(ctx, season_name: str = None):
                         merits_clean = merits_str.replace(",", "").replace("+", "")
                         merits_num = abs(int(merits_clean)) if merits_clean.lstrip("-").isdigit() else 0
             
-            leaderboard.append({"name": lord_name, "merits": merits_num, "merits_str": merits_str})
+            leaderboard.append({"account_id": lord["account_id"], "name": lord_name, "merits": merits_num, "merits_str": merits_str})
         except Exception as e:
             log_info(f"[TOPMERITS ERROR] {lord.get('account_id')}: {e}")
-            leaderboard.append({"name": lord["name"], "merits": 0, "merits_str": "+0"})
+            leaderboard.append({"account_id": lord["account_id"], "name": lord["name"], "merits": 0, "merits_str": "+0"})
     
     leaderboard.sort(key=lambda x: x["merits"], reverse=True)
+    moves = await leaderboard_moves(season_id, "merits")
     
     output = f"```🏅 Top Merits - {season_name_display}\n"
     medals = ["🥇", "🥈", "🥉"]
     for i, lord in enumerate(leaderboard):
         medal = medals[i] if i < 3 else f"{i+1}."
-        output += f"{medal} {lord['name']}: {lord['merits_str']}\n"
+        output += f"{medal} {lord['name']}: {lord['merits_str']}{moves.get(lord['account_id'], '')}\n"
     output += f"📅 {start_date} → {actual_end_date}```"
     await ctx.send(output)
 
@@ -3896,7 +6961,7 @@ async def _top_adv_merit(ctx, season_name, field, emoji, label, tag):
         except:
             return 0
 
-    await ctx.send(f"⏳ Fetching {label} leaderboard...")
+    progress = await ProgressReporter.start(ctx.channel, f"Fetching {label} leaderboard", len(lords), unit="lords")
 
     async def fetch_adv_snap(account_id, primary_date, fallback_date):
         """Get DB snapshot, live-fetch from COS if advanced fields are None.
@@ -3931,7 +6996,8 @@ async def _top_adv_merit(ctx, season_name, field, emoji, label, tag):
         )
         for lord in lords
     ]
-    all_results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    all_results = await gather_with_progress(fetch_tasks, progress)
+    await progress.finish()
 
     leaderboard = []
     for lord, result in zip(lords, all_results):
@@ -4008,13 +7074,14 @@ async def topheal(ctx, season_name: str = None):
     if not lords:
         return await ctx.send("❌ No members with numeric roles found.")
 
-    await ctx.send(f"⏳ Fetching heal leaderboard for {len(lords)} lords...")
+    progress = await ProgressReporter.start(ctx.channel, "Fetching heal leaderboard", len(lords), unit="lords")
 
     fetch_tasks = [
         fetch_stats_with_fallback(lord["account_id"], start_date, today)
         for lord in lords
     ]
-    results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    results = await gather_with_progress(fetch_tasks, progress)
+    await progress.finish()
 
     leaderboard = []
     actual_end_date = today
@@ -4048,6 +7115,221 @@ async def topheal(ctx, season_name: str = None):
     await ctx.send(output)
 
 
+# Stats for !top: alias -> (season_progress column, label, compare absolute values)
+TOP_STATS = {
+    "power": ("power_gain", "⚡ Power", False),
+    "merits": ("merits", "🏅 Merits", False),
+    "kills": ("kills_gain", "⚔️ Kills", False),
+    "deaths": ("deads_gain", "💀 Deaths", False),
+    "healed": ("healed_gain", "❤️ Healed", False),
+    "mana": ("mana_gathered", "💧 Mana Gathered", False),
+    "gold": ("gold_gathered", "🪙 Gold Gathered", False),
+    "wood": ("wood_gathered", "🪵 Wood Gathered", False),
+    "ore": ("ore_gathered", "⛏️ Ore Gathered", False),
+    "manaspent": ("mana_spent", "💧 Mana Spent", True),
+    "goldspent": ("gold_spent", "🪙 Gold Spent", True),
+    "inf": ("infantry_merits", "⚔️ Infantry Merits", False),
+    "cav": ("cavalry_merits", "🐴 Cavalry Merits", False),
+    "mage": ("mage_merits", "🔮 Mage Merits", False),
+    "archer": ("marksman_merits", "🏹 Marksman Merits", False),
+}
+TOP_DEFAULT_WINDOW = "7d"
+
+async def top_cross_season(ctx, stat, seasons_arg):
+    """!top <stat> all / s1,s2: totals over the seasons' final stored snapshots"""
+    column, label, absolute = TOP_STATS[stat]
+    if seasons_arg == "all":
+        season_ids, scope = None, "All seasons"
+    else:
+        seasons = []
+        for name in filter(None, seasons_arg.split(",")):
+            season = db_get_season_by_name(name.strip())
+            if not season:
+                all_seasons = db_get_all_seasons()
+                season_list = ", ".join([s[1] for s in all_seasons]) if all_seasons else "None"
+                return await ctx.send(f"❌ Season '{name}' not found.\n\nAvailable seasons: {season_list}")
+            seasons.append(season)
+        season_ids, scope = [s[0] for s in seasons], ", ".join(s[1] for s in seasons)
+    
+    try:
+        rows = await asyncio.to_thread(db_get_cross_season_totals, column, season_ids, absolute)
+    except Exception as e:
+        log_error(f"[TOP] Cross-season error: {e}")
+        return await ctx.send("❌ Error loading data. Try again later.")
+    
+    tracked = set(get_tracked_account_ids(ctx.guild))
+    leaderboard = [r for r in rows if r["account_id"] in tracked]
+    if not leaderboard:
+        return await ctx.send(f"❌ No saved data found for {scope}. Run `!loadhistory` first.")
+    
+    multi = season_ids is None or len(season_ids) > 1
+    medals = ["🥇", "🥈", "🥉"]
+    output = f"🏆 Top {label} - {scope}\n"
+    for i, lord in enumerate(leaderboard):
+        medal = medals[i] if i < 3 else f"{i+1}."
+        output += f"{medal} {lord['lord_name']}: {lord['total']:,}"
+        output += f" ({lord['seasons']} seasons)\n" if multi and lord["seasons"] > 1 else "\n"
+    output += "📅 Final stored snapshot of each season"
+    for chunk in split_message(output, DISCORD_MESSAGE_LIMIT - 6):
+        await ctx.send(f"```{chunk}```")
+
+@bot.command(name="top")
+async def top_window(ctx, stat: str = None, window: str = TOP_DEFAULT_WINDOW):
+    """
+    Rolling-window or cross-season leaderboard from stored snapshots (no Call of Stats requests).
+    Usage: !top merits 7d   |   !top kills 3d   |   !top power (last 7 days)   |   !top merits all   |   !top merits sos1,sos2
+    """
+    if not stat or stat.lower() not in TOP_STATS:
+        return await ctx.send(f"❌ Usage: `!top <stat> [Nd|all|season1,season2]` - stats: {', '.join(TOP_STATS)}")
+    
+    window = window.lower()
+    days = window[:-1] if window.endswith("d") else window
+    if not days.isdigit():
+        return await top_cross_season(ctx, stat.lower(), window)
+    if int(days) < 1:
+        return await ctx.send("❌ Window must be a number of days, e.g. `7d`")
+    days = int(days)
+    
+    season = db_get_current_season()
+    if not season:
+        return await ctx.send("❌ No season active. Use `/newseason` to start one.")
+    season_id, season_name_display, start_date, created_at = season
+    
+    column, label, absolute = TOP_STATS[stat.lower()]
+    tracked = get_tracked_account_ids(ctx.guild)
+    try:
+        rows = await asyncio.to_thread(db_get_window_gains, season_id, tracked, column, days, absolute, start_date)
+    except Exception as e:
+        log_error(f"[TOP] Error: {e}")
+        return await ctx.send("❌ Error loading data. Try again later.")
+    
+    if not rows:
+        return await ctx.send(
+            f"❌ No saved data covering the last {days} days in {season_name_display}. "
+            f"Try a shorter window, or run `!loadhistory` first."
+        )
+    
+    # The window ends on the season's latest data date; lords without data at both ends of it
+    # (no snapshot inside it, or none old enough) aren't ranked
+    newest = rows[0]["as_of"]
+    earliest_needed = (datetime.strptime(newest, "%Y-%m-%d").date() - timedelta(days=days)).isoformat()
+    
+    medals = ["🥇", "🥈", "🥉"]
+    output = f"```🏆 Top {label} - last {days}d - {season_name_display}\n"
+    for i, lord in enumerate(rows):
+        medal = medals[i] if i < 3 else f"{i+1}."
+        output += f"{medal} {lord['lord_name']}: {lord['gain']:+,}\n"
+    if len(set(tracked)) > len(rows):
+        output += f"⏸️ {len(set(tracked)) - len(rows)} lord(s) without data covering the whole {days}d window\n"
+    output += f"📅 {max(earliest_needed, start_date)} → {newest}```"
+    await ctx.send(output)
+
+
+FORECAST_ALL_LIMIT = 25
+
+def render_forecast(lord, end_date, target=None):
+    """Projection block for one lord from get_season_forecasts()"""
+    output = f"```🔮 Forecast - {lord['lord_name']} (to {end_date})\n"
+    for column, label in FORECAST_STATS.values():
+        trend = lord.get(column)
+        if not trend:
+            continue
+        value, slope, recent = trend["value"], trend["slope"], trend["recent"]
+        output += f"{label}: {value:,}\n"
+        if slope is None:
+            output += "   Not enough history yet\n"
+            continue
+        output += f"   Season trend {slope:+,.0f}/day → {project(value, slope, lord['data_date'], end_date):,}\n"
+        if recent is not None:
+            output += (
+                f"   Last {FORECAST_RECENT_DAYS}d {recent:+,.0f}/day → "
+                f"{project(value, recent, lord['data_date'], end_date):,}\n"
+            )
+    
+    merits = lord.get("merits")
+    if target and merits:
+        rate = merits["recent"] if merits["recent"] is not None else merits["slope"]
+        remaining = target - merits["value"]
+        days_left = (datetime.strptime(end_date, "%Y-%m-%d") - datetime.strptime(lord["data_date"], "%Y-%m-%d")).days
+        if remaining <= 0:
+            output += f"🎯 {target:,} merits: reached\n"
+        elif rate and rate > 0:
+            reach = datetime.strptime(lord["data_date"], "%Y-%m-%d").date() + timedelta(days=math.ceil(remaining / rate))
+            verdict = "✅ on track" if reach.isoformat() <= end_date else "⚠️ behind"
+            output += f"🎯 {target:,} merits: {verdict}, ~{reach.isoformat()}\n"
+        else:
+            output += f"🎯 {target:,} merits: ⚠️ no recent growth\n"
+        if remaining > 0 and days_left > 0:
+            output += f"   Needs {remaining / days_left:,.0f}/day\n"
+    output += f"📅 Data {lord['data_date']}```"
+    return output
+
+@bot.command(name="forecast")
+async def forecast(ctx, user_input: str = None, target: str = None):
+    """
+    Season-end projections from stored snapshots (no Call of Stats requests).
+    Usage: !forecast   |   !forecast 5m   |   !forecast truvix   |   !forecast truvix 5m (merit target)   |   !forecast all
+    """
+    season = db_get_current_season()
+    if not season:
+        return await ctx.send("❌ No season active. Use `/newseason` to start one.")
+    season_id, season_name_display, start_date, created_at = season
+    end_date = season_end_date(start_date)
+    
+    target_amount = None
+    if target:
+        target_amount = parse_amount(target)
+        if not target_amount:
+            return await ctx.send("❌ Target must be a positive number, e.g. `5m` or `750k`")
+    
+    try:
+        forecasts = await asyncio.to_thread(get_season_forecasts, season_id)
+    except Exception as e:
+        log_error(f"[FORECAST] Error: {e}")
+        return await ctx.send("❌ Error loading data. Try again later.")
+    if forecasts is None:
+        return await ctx.send("❌ Forecasts need NumPy installed on the bot host.")
+    
+    if user_input and not target and parse_amount(user_input):
+        # "!forecast 5m": a lone amount that isn't a known lord is the caller's merit target
+        if await get_account_id_from_input(ctx, user_input) not in forecasts:
+            user_input, target_amount = None, parse_amount(user_input)
+    
+    if user_input and user_input.lower() == "all":
+        tracked = set(get_tracked_account_ids(ctx.guild))
+        rows = []
+        for account_id, lord in forecasts.items():
+            merits = lord.get("merits")
+            if account_id not in tracked or not merits:
+                continue
+            rate = merits["recent"] if merits["recent"] is not None else merits["slope"]
+            rows.append((project(merits["value"], rate, lord["data_date"], end_date), rate, lord))
+        if not rows:
+            return await ctx.send(f"❌ No saved data found in {season_name_display}. Run `!loadhistory` first.")
+        rows.sort(key=lambda r: r[0] if r[0] is not None else r[2]["merits"]["value"], reverse=True)
+        
+        medals = ["🥇", "🥈", "🥉"]
+        output = f"```🔮 Projected 🏅 Merits by {end_date} - {season_name_display}\n"
+        for i, (projected, rate, lord) in enumerate(rows[:FORECAST_ALL_LIMIT]):
+            medal = medals[i] if i < 3 else f"{i+1}."
+            if projected is None:
+                output += f"{medal} {lord['lord_name']}: {lord['merits']['value']:,} (too new)\n"
+            else:
+                output += f"{medal} {lord['lord_name']}: {projected:,} ({rate:+,.0f}/day)\n"
+        if len(rows) > FORECAST_ALL_LIMIT:
+            output += f"… and {len(rows) - FORECAST_ALL_LIMIT} more\n"
+        output += f"Rate: last {FORECAST_RECENT_DAYS}d, season trend if newer```"
+        return await ctx.send(output)
+    
+    account_id = await get_account_id_from_input(ctx, user_input)
+    if not account_id:
+        return await ctx.send(account_not_found_message(user_input) if user_input else "❌ Could not find account ID.")
+    lord = forecasts.get(account_id)
+    if not lord:
+        return await ctx.send(f"❌ No saved data for this lord in {season_name_display}.")
+    await ctx.send(render_forecast(lord, end_date, target_amount))
+
+
 @bot.command(name="rss")
 async def rss_leaderboard(ctx, season_name: str = None):
     """Top resource spenders. Usage: !rss (current) or !rss sos1 (specific season)"""
@@ -4071,10 +7353,11 @@ async def rss_leaderboard(ctx, season_name: str = None):
     if not lords:
         return await ctx.send("❌ No members with numeric roles found.")
     
-    await ctx.send(f"⏳ Fetching leaderboard data for {len(lords)} lords...")
+    progress = await ProgressReporter.start(ctx.channel, "Fetching leaderboard data", len(lords), unit="lords")
     
     fetch_tasks = [fetch_stats_with_fallback(lord["account_id"], start_date, today) for lord in lords]
-    results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+    results = await gather_with_progress(fetch_tasks, progress)
+    await progress.finish()
     
     leaderboard = []
     actual_end_date = today
@@ -4126,26 +7409,52 @@ async def get_rankings_for_stat(ctx, stat_key, start_date, end_date):
     
     season_id, season_name, _, _ = season
     
+    # Get all members from guild + registry accounts
+    return db_get_rankings_for_stat(season_id, get_tracked_account_ids(ctx.guild), stat_key)
+
+
+async def leaderboard_moves(season_id, stat_key):
+    """{account_id: ' ↑2'} rank movement suffixes for a leaderboard, from rank_history"""
+    history = await asyncio.to_thread(db_get_rank_history, season_id, [stat_key])
+    return {
+        account_id: f" {rank_arrow(change)}"
+        for account_id, (_, _, change) in history.get(stat_key, {}).items() if change
+    }
+
+
+def db_get_ranks_for_account(season_id, account_ids, account_id, stat_keys):
+    """
+    ({stat_key: rank}, {stat_key: places gained since the previous data date})
+    for one account - from rank_history, ranking live (without movement) if the
+    season has none yet. Plain sync so it can run in a thread.
+    """
+    history = db_get_rank_history(season_id, stat_keys, account_id)
+    if history:
+        ranks = {stat: ranked[account_id][0] for stat, ranked in history.items()}
+        moves = {stat: ranked[account_id][2] for stat, ranked in history.items() if ranked[account_id][2]}
+        return ranks, moves
+    ranks = {}
+    for stat_key in stat_keys:
+        rankings = db_get_rankings_for_stat(season_id, account_ids, stat_key)
+        if account_id in rankings:
+            ranks[stat_key] = rankings[account_id][0]
+    return ranks, {}
+
+
+def db_get_rankings_for_stat(season_id, account_ids, stat_key):
+    """Rank accounts by their latest value of stat_key: {account_id: (rank, total)}"""
     try:
-        # Get all members from guild + mapped accounts
-        lords = get_all_lords_from_guild(ctx.guild)
-        checked_accounts = set()
-        
-        for lord in lords:
-            checked_accounts.add(lord["account_id"])
-        
-        for discord_id, account_id in DISCORD_TO_ACCOUNT_ID.items():
-            checked_accounts.add(account_id)
+        checked_accounts = set(account_ids)
         
         # Valid stat keys to prevent SQL injection
-        valid_stats = ["power_gain", "merits", "kills_gain", "deads_gain", "healed_gain",
-                      "t5_gain", "t4_gain", "t3_gain", "t2_gain", "t1_gain",
-                      "gold_spent", "wood_spent", "ore_spent", "mana_spent",
-                      "gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered"]
-        
-        if stat_key not in valid_stats:
+        if stat_key not in RANK_STATS:
             return {}
         
+        # Current season: one array sort over the season matrix
+        matrix = get_current_season_matrix(season_id)
+        if matrix:
+            return matrix.ranks(stat_key, account_ids, absolute=stat_key in RANK_ABSOLUTE_STATS)
+        
         # Get stats from database for all members (use latest data per account)
         stats_list = []
         conn = sqlite3.connect(DB_PROGRESS)
@@ -4172,8 +7481,11 @@ async def get_rankings_for_stat(ctx, stat_key, start_date, end_date):
         
         conn.close()
         
-        # Sort by value descending
-        stats_list.sort(key=lambda x: x["value"], reverse=True)
+        # Sort by value descending (spent stats by absolute value)
+        if stat_key in RANK_ABSOLUTE_STATS:
+            stats_list.sort(key=lambda x: abs(x["value"]), reverse=True)
+        else:
+            stats_list.sort(key=lambda x: x["value"], reverse=True)
         
         # Create rank dict
         rankings = {}
@@ -4190,10 +7502,7 @@ async def get_account_id_from_input(ctx, user_input):
     """Helper function to resolve username or account ID to account ID"""
     # If no input, use author's own account ID from role
     if not user_input:
-        for role in ctx.author.roles:
-            if role.name.isdigit():
-                return role.name
-        return None
+        return get_member_account_id(ctx.guild, ctx.author.id)
     
     # If numeric, use as account ID
     if user_input.isdigit():
@@ -4203,41 +7512,178 @@ async def get_account_id_from_input(ctx, user_input):
     if user_input.startswith("<@") and user_input.endswith(">"):
         user_id_str = user_input[2:-1].replace("!", "")
         if user_id_str.isdigit():
-            user_id = int(user_id_str)
-            try:
-                member = ctx.guild.get_member(user_id)
-                if member:
-                    for role in member.roles:
-                        if role.name.isdigit():
-                            return role.name
-            except Exception as e:
-                pass
+            return get_member_account_id(ctx.guild, int(user_id_str))
         return None
     
-    # Check username lookup
-    username_lower = user_input.lower()
-    found_discord_id = None
+    # Check username/alias lookup, then in-game lord names
+    return get_account_id_for_name(ctx.guild, user_input) or lord_names.resolve(user_input)
+
+
+def render_compare(stats1, date1, power1, t_kills1, stats2, date2, power2, t_kills2):
+    """Side-by-side !compare output for two lords"""
+    t_kills1 = t_kills1 or {}
+    t_kills2 = t_kills2 or {}
     
-    for username, discord_id in USERNAME_TO_DISCORD_ID.items():
-        if username.lower() == username_lower:
-            found_discord_id = discord_id
-            break
+    # Build comparison as CODE BLOCK (ORIGINAL FORMAT)
+    name1 = stats1.get("lord_name", "Unknown")
+    name2 = stats2.get("lord_name", "Unknown")
     
-    if not found_discord_id:
-        return None
+    output = f"```⚔️ {name1} vs {name2}\n\n"
     
-    # Get the member from guild and find their numeric role
-    try:
-        member = ctx.guild.get_member(found_discord_id)
-        if not member:
-            return None
+    # Power - side by side with gain
+    if power1 and power2:
+        output += f"⚡ Power\n"
         
-        for role in member.roles:
-            if role.name.isdigit():
-                return role.name
-        return None
-    except Exception as e:
-        return None
+        # Get power gain from seasonal stats
+        power_gain1 = 0
+        power_gain2 = 0
+        
+        if stats1.get("power_gain"):
+            try:
+                pg1_str = stats1.get("power_gain", "+0").replace("+", "").replace(",", "")
+                power_gain1 = int(pg1_str)
+            except Exception as e:
+                power_gain1 = 0
+        
+        if stats2.get("power_gain"):
+            try:
+                pg2_str = stats2.get("power_gain", "+0").replace("+", "").replace(",", "")
+                power_gain2 = int(pg2_str)
+            except Exception as e:
+                power_gain2 = 0
+        
+        output += f"{name1}: {power1:,} (+{power_gain1:,})\n"
+        output += f"{name2}: {power2:,} (+{power_gain2:,})\n"
+        output += f"\n"
+    
+    # Merits - side by side
+    m1 = stats1.get("merits", "+0")
+    m2 = stats2.get("merits", "+0")
+    mp1 = stats1.get("merits_pct", "0%")
+    mp2 = stats2.get("merits_pct", "0%")
+    output += f"🏅 Merits\n"
+    output += f"{name1}: {m1} ({mp1})\n"
+    output += f"{name2}: {m2} ({mp2})\n"
+    output += f"\n"
+    
+    # Kills + Total T-kills combined
+    k1 = stats1.get("kills_gain", "+0")
+    k2 = stats2.get("kills_gain", "+0")
+    d1 = stats1.get("deads_gain", "+0")
+    d2 = stats2.get("deads_gain", "+0")
+    h1 = stats1.get("healed_gain", "+0")
+    h2 = stats2.get("healed_gain", "+0")
+    
+    # Calculate total T-kills
+    total_t1 = sum(t_kills1.values()) if t_kills1 else 0
+    total_t2 = sum(t_kills2.values()) if t_kills2 else 0
+    
+    output += f"💀 Deaths\n"
+    output += f"{name1}: {d1}\n"
+    output += f"{name2}: {d2}\n"
+    output += f"\n"
+    
+    output += f"❤️ Healed\n"
+    output += f"{name1}: {h1}\n"
+    output += f"{name2}: {h2}\n"
+    output += f"\n"
+    
+    output += f"⚔️ Kills\n"
+    output += f"{name1}: {total_t1:,} ({k1})\n"
+    output += f"{name2}: {total_t2:,} ({k2})\n"
+    output += f"\n"
+    
+    # T-Tier Breakdown
+    output += f"T5 Kills\n"
+    t5_1 = t_kills1.get("t5", 0)
+    t5_2 = t_kills2.get("t5", 0)
+    output += f"{name1}: {t5_1:,}\n"
+    output += f"{name2}: {t5_2:,}\n"
+    output += f"\n"
+    
+    output += f"T4 Kills\n"
+    t4_1 = t_kills1.get("t4", 0)
+    t4_2 = t_kills2.get("t4", 0)
+    output += f"{name1}: {t4_1:,}\n"
+    output += f"{name2}: {t4_2:,}\n"
+    output += f"\n"
+    
+    output += f"T3 Kills\n"
+    t3_1 = t_kills1.get("t3", 0)
+    t3_2 = t_kills2.get("t3", 0)
+    output += f"{name1}: {t3_1:,}\n"
+    output += f"{name2}: {t3_2:,}\n"
+    output += f"\n"
+    
+    output += f"T2 Kills\n"
+    t2_1 = t_kills1.get("t2", 0)
+    t2_2 = t_kills2.get("t2", 0)
+    output += f"{name1}: {t2_1:,}\n"
+    output += f"{name2}: {t2_2:,}\n"
+    output += f"\n"
+    
+    output += f"T1 Kills\n"
+    t1_1 = t_kills1.get("t1", 0)
+    t1_2 = t_kills2.get("t1", 0)
+    output += f"{name1}: {t1_1:,}\n"
+    output += f"{name2}: {t1_2:,}\n"
+    output += f"\n"
+    
+    # Mana Gathered
+    mg1 = stats1.get("mana_gathered", "+0")
+    mg2 = stats2.get("mana_gathered", "+0")
+    output += f"💧 Mana Gathered\n"
+    output += f"{name1}: {mg1}\n"
+    output += f"{name2}: {mg2}\n"
+    output += f"\n"
+    
+    # RSS Spent
+    output += f"💰 RSS Spent\n"
+    gs1 = stats1.get("gold_spent", "+0")
+    gs2 = stats2.get("gold_spent", "+0")
+    ws1 = stats1.get("wood_spent", "+0")
+    ws2 = stats2.get("wood_spent", "+0")
+    os1 = stats1.get("ore_spent", "+0")
+    os2 = stats2.get("ore_spent", "+0")
+    ms1 = stats1.get("mana_spent", "+0")
+    ms2 = stats2.get("mana_spent", "+0")
+    
+    # Parse with absolute values
+    gs1_val = abs(int(gs1.replace(",", "").replace("+", ""))) if gs1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    gs2_val = abs(int(gs2.replace(",", "").replace("+", ""))) if gs2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    ws1_val = abs(int(ws1.replace(",", "").replace("+", ""))) if ws1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    ws2_val = abs(int(ws2.replace(",", "").replace("+", ""))) if ws2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    os1_val = abs(int(os1.replace(",", "").replace("+", ""))) if os1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    os2_val = abs(int(os2.replace(",", "").replace("+", ""))) if os2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    ms1_val = abs(int(ms1.replace(",", "").replace("+", ""))) if ms1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    ms2_val = abs(int(ms2.replace(",", "").replace("+", ""))) if ms2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
+    
+    output += f"  Gold: {name1} -{gs1_val:,} | {name2} -{gs2_val:,}\n"
+    output += f"  Wood: {name1} -{ws1_val:,} | {name2} -{ws2_val:,}\n"
+    output += f"  Ore: {name1} -{os1_val:,} | {name2} -{os2_val:,}\n"
+    output += f"  Mana: {name1} -{ms1_val:,} | {name2} -{ms2_val:,}\n"
+    output += f"\n"
+    
+    # RSS Gathered
+    output += f"📦 RSS Gathered\n"
+    gg1 = stats1.get("gold_gathered", "+0")
+    gg2 = stats2.get("gold_gathered", "+0")
+    wg1 = stats1.get("wood_gathered", "+0")
+    wg2 = stats2.get("wood_gathered", "+0")
+    og1 = stats1.get("ore_gathered", "+0")
+    og2 = stats2.get("ore_gathered", "+0")
+    mg1_g = stats1.get("mana_gathered", "+0")
+    mg2_g = stats2.get("mana_gathered", "+0")
+    
+    output += f"  Gold: {name1} {gg1} | {name2} {gg2}\n"
+    output += f"  Wood: {name1} {wg1} | {name2} {wg2}\n"
+    output += f"  Ore: {name1} {og1} | {name2} {og2}\n"
+    output += f"  Mana: {name1} {mg1_g} | {name2} {mg2_g}\n"
+    
+    output += f"\n"
+    output += f"📅 Data: {name1} {date1} | {name2} {date2}\n"
+    output += f"```"
+    return output
 
 
 @bot.command(name="compare")
@@ -4251,7 +7697,6 @@ async def compare(ctx, user1: str = None, user2: str = None):
         return await ctx.send("❌ No season active. Use `/newseason` to start one.")
     
     season_id, season_name, start_date, created_at = season
-    today = date.today().isoformat()
     
     msg = await ctx.send(f"⏳ Comparing {user1} vs {user2}...")
     
@@ -4261,206 +7706,35 @@ async def compare(ctx, user1: str = None, user2: str = None):
         account_id2 = await get_account_id_from_input(ctx, user2)
         
         if not account_id1:
-            return await msg.edit(content=f"❌ Could not find '{user1}'")
+            return await msg.edit(content=account_not_found_message(user1))
         if not account_id2:
-            return await msg.edit(content=f"❌ Could not find '{user2}'")
-        
-        # FIRST: Try database for today
-        stats1 = db_get_season_progress(season_id, account_id1, today)
-        stats2 = db_get_season_progress(season_id, account_id2, today)
-        
-        # If not today, try yesterday
-        if not stats1:
-            yesterday = (date.today() - timedelta(days=1)).isoformat()
-            stats1 = db_get_season_progress(season_id, account_id1, yesterday)
-        if not stats2:
-            yesterday = (date.today() - timedelta(days=1)).isoformat()
-            stats2 = db_get_season_progress(season_id, account_id2, yesterday)
-        
-        # FALLBACK: If not in database, try cache
-        if not stats1:
-            stats1 = get_cached_stats(account_id1, start_date, today)
-        if not stats2:
-            stats2 = get_cached_stats(account_id2, start_date, today)
-        
-        # FALLBACK 2: If still missing, fetch from API (for unlisted people)
-        if not stats1:
-            stats1, _ = await fetch_stats_with_fallback(account_id1, start_date, today)
-        if not stats2:
-            stats2, _ = await fetch_stats_with_fallback(account_id2, start_date, today)
+            return await msg.edit(content=account_not_found_message(user2))
+        
+        # Newest stored stats right away, refreshed in the background if stale
+        (stats1, date1, revalidation1), (stats2, date2, revalidation2) = await asyncio.gather(
+            get_stats_swr(season_id, account_id1, start_date),
+            get_stats_swr(season_id, account_id2, start_date),
+        )
         
         if not stats1 or not stats2:
             return await msg.edit(content="❌ Failed to fetch stats")
         
-        # Get highest power and T-kills for both (only if not in database)
-        power1 = await fetch_highest_power(account_id1)
-        power2 = await fetch_highest_power(account_id2)
-        t_kills1 = await fetch_current_t_kills(account_id1)
-        t_kills2 = await fetch_current_t_kills(account_id2)
-        
-        # Get lord names
-        name1 = stats1.get("lord_name", "Unknown")
-        name2 = stats2.get("lord_name", "Unknown")
-        
-        # Build comparison as CODE BLOCK (ORIGINAL FORMAT)
-        name1 = stats1.get("lord_name", "Unknown")
-        name2 = stats2.get("lord_name", "Unknown")
-        
-        output = f"```⚔️ {name1} vs {name2}\n\n"
-        
-        # Power - side by side with gain
-        if power1 and power2:
-            output += f"⚡ Power\n"
-            
-            # Get power gain from seasonal stats
-            power_gain1 = 0
-            power_gain2 = 0
-            
-            if stats1.get("power_gain"):
-                try:
-                    pg1_str = stats1.get("power_gain", "+0").replace("+", "").replace(",", "")
-                    power_gain1 = int(pg1_str)
-                except Exception as e:
-                    power_gain1 = 0
-            
-            if stats2.get("power_gain"):
-                try:
-                    pg2_str = stats2.get("power_gain", "+0").replace("+", "").replace(",", "")
-                    power_gain2 = int(pg2_str)
-                except Exception as e:
-                    power_gain2 = 0
-            
-            output += f"{name1}: {power1:,} (+{power_gain1:,})\n"
-            output += f"{name2}: {power2:,} (+{power_gain2:,})\n"
-            output += f"\n"
-        
-        # Merits - side by side
-        m1 = stats1.get("merits", "+0")
-        m2 = stats2.get("merits", "+0")
-        mp1 = stats1.get("merits_pct", "0%")
-        mp2 = stats2.get("merits_pct", "0%")
-        output += f"🏅 Merits\n"
-        output += f"{name1}: {m1} ({mp1})\n"
-        output += f"{name2}: {m2} ({mp2})\n"
-        output += f"\n"
-        
-        # Kills + Total T-kills combined
-        k1 = stats1.get("kills_gain", "+0")
-        k2 = stats2.get("kills_gain", "+0")
-        d1 = stats1.get("deads_gain", "+0")
-        d2 = stats2.get("deads_gain", "+0")
-        h1 = stats1.get("healed_gain", "+0")
-        h2 = stats2.get("healed_gain", "+0")
-        
-        # Calculate total T-kills
-        total_t1 = sum(t_kills1.values()) if t_kills1 else 0
-        total_t2 = sum(t_kills2.values()) if t_kills2 else 0
-        
-        output += f"💀 Deaths\n"
-        output += f"{name1}: {d1}\n"
-        output += f"{name2}: {d2}\n"
-        output += f"\n"
-        
-        output += f"❤️ Healed\n"
-        output += f"{name1}: {h1}\n"
-        output += f"{name2}: {h2}\n"
-        output += f"\n"
-        
-        output += f"⚔️ Kills\n"
-        output += f"{name1}: {total_t1:,} ({k1})\n"
-        output += f"{name2}: {total_t2:,} ({k2})\n"
-        output += f"\n"
-        
-        # T-Tier Breakdown
-        output += f"T5 Kills\n"
-        t5_1 = t_kills1.get("t5", 0)
-        t5_2 = t_kills2.get("t5", 0)
-        output += f"{name1}: {t5_1:,}\n"
-        output += f"{name2}: {t5_2:,}\n"
-        output += f"\n"
-        
-        output += f"T4 Kills\n"
-        t4_1 = t_kills1.get("t4", 0)
-        t4_2 = t_kills2.get("t4", 0)
-        output += f"{name1}: {t4_1:,}\n"
-        output += f"{name2}: {t4_2:,}\n"
-        output += f"\n"
-        
-        output += f"T3 Kills\n"
-        t3_1 = t_kills1.get("t3", 0)
-        t3_2 = t_kills2.get("t3", 0)
-        output += f"{name1}: {t3_1:,}\n"
-        output += f"{name2}: {t3_2:,}\n"
-        output += f"\n"
-        
-        output += f"T2 Kills\n"
-        t2_1 = t_kills1.get("t2", 0)
-        t2_2 = t_kills2.get("t2", 0)
-        output += f"{name1}: {t2_1:,}\n"
-        output += f"{name2}: {t2_2:,}\n"
-        output += f"\n"
-        
-        output += f"T1 Kills\n"
-        t1_1 = t_kills1.get("t1", 0)
-        t1_2 = t_kills2.get("t1", 0)
-        output += f"{name1}: {t1_1:,}\n"
-        output += f"{name2}: {t1_2:,}\n"
-        output += f"\n"
-        
-        # Mana Gathered
-        mg1 = stats1.get("mana_gathered", "+0")
-        mg2 = stats2.get("mana_gathered", "+0")
-        output += f"💧 Mana Gathered\n"
-        output += f"{name1}: {mg1}\n"
-        output += f"{name2}: {mg2}\n"
-        output += f"\n"
+        # Get highest power and T-kills for both
+        power1, power2, t_kills1, t_kills2 = await asyncio.gather(
+            fetch_highest_power(account_id1), fetch_highest_power(account_id2),
+            fetch_current_t_kills(account_id1), fetch_current_t_kills(account_id2),
+        )
         
-        # RSS Spent
-        output += f"💰 RSS Spent\n"
-        gs1 = stats1.get("gold_spent", "+0")
-        gs2 = stats2.get("gold_spent", "+0")
-        ws1 = stats1.get("wood_spent", "+0")
-        ws2 = stats2.get("wood_spent", "+0")
-        os1 = stats1.get("ore_spent", "+0")
-        os2 = stats2.get("ore_spent", "+0")
-        ms1 = stats1.get("mana_spent", "+0")
-        ms2 = stats2.get("mana_spent", "+0")
-        
-        # Parse with absolute values
-        gs1_val = abs(int(gs1.replace(",", "").replace("+", ""))) if gs1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        gs2_val = abs(int(gs2.replace(",", "").replace("+", ""))) if gs2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        ws1_val = abs(int(ws1.replace(",", "").replace("+", ""))) if ws1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        ws2_val = abs(int(ws2.replace(",", "").replace("+", ""))) if ws2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        os1_val = abs(int(os1.replace(",", "").replace("+", ""))) if os1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        os2_val = abs(int(os2.replace(",", "").replace("+", ""))) if os2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        ms1_val = abs(int(ms1.replace(",", "").replace("+", ""))) if ms1.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        ms2_val = abs(int(ms2.replace(",", "").replace("+", ""))) if ms2.replace(",", "").replace("+", "").lstrip("-").isdigit() else 0
-        
-        output += f"  Gold: {name1} -{gs1_val:,} | {name2} -{gs2_val:,}\n"
-        output += f"  Wood: {name1} -{ws1_val:,} | {name2} -{ws2_val:,}\n"
-        output += f"  Ore: {name1} -{os1_val:,} | {name2} -{os2_val:,}\n"
-        output += f"  Mana: {name1} -{ms1_val:,} | {name2} -{ms2_val:,}\n"
-        output += f"\n"
+        await msg.edit(content=render_compare(stats1, date1, power1, t_kills1, stats2, date2, power2, t_kills2))
         
-        # RSS Gathered
-        output += f"📦 RSS Gathered\n"
-        gg1 = stats1.get("gold_gathered", "+0")
-        gg2 = stats2.get("gold_gathered", "+0")
-        wg1 = stats1.get("wood_gathered", "+0")
-        wg2 = stats2.get("wood_gathered", "+0")
-        og1 = stats1.get("ore_gathered", "+0")
-        og2 = stats2.get("ore_gathered", "+0")
-        mg1_g = stats1.get("mana_gathered", "+0")
-        mg2_g = stats2.get("mana_gathered", "+0")
-        
-        output += f"  Gold: {name1} {gg1} | {name2} {gg2}\n"
-        output += f"  Wood: {name1} {wg1} | {name2} {wg2}\n"
-        output += f"  Ore: {name1} {og1} | {name2} {og2}\n"
-        output += f"  Mana: {name1} {mg1_g} | {name2} {mg2_g}\n"
-        
-        output += f"```"
-        
-        await msg.edit(content=output)
+        # Edit only if a live fetch changed either side
+        fresh1, fresh2 = await asyncio.gather(
+            revalidated_stats(revalidation1, stats1), revalidated_stats(revalidation2, stats2)
+        )
+        if fresh1 or fresh2:
+            stats1, date1 = fresh1 or (stats1, date1)
+            stats2, date2 = fresh2 or (stats2, date2)
+            await msg.edit(content=render_compare(stats1, date1, power1, t_kills1, stats2, date2, power2, t_kills2))
     except Exception as e:
         log_info(f"[COMPARE ERROR] {e}")
         import traceback
@@ -4472,6 +7746,74 @@ async def compare(ctx, user1: str = None, user2: str = None):
 # QUICK COMMANDS
 # ============================================================
 
+QUICK_RANK_STATS = ["power_gain", "merits", "kills_gain"]
+
+def render_quick_stats(stats, data_date, power, ranks, rank_moves=None):
+    """One-liner for !q. ranks is {stat_key: rank}, rank_moves {stat_key: places gained}."""
+    stats = dict(stats)
+    
+    # Calculate merit to power ratio using highest power and merits
+    if stats.get("merits") and power:
+        try:
+            merits_str = stats["merits"].replace("+", "").replace(",", "")
+            merits_val = int(merits_str) if merits_str.isdigit() else 0
+            
+            # Calculate ratio: (Merits / Highest Power) × 100
+            if power > 0:
+                ratio = (merits_val / power) * 100
+                stats["merits_pct"] = f"{ratio:.1f}%"
+            else:
+                stats["merits_pct"] = "0%"
+        except Exception as e:
+            stats["merits_pct"] = "0%"
+    else:
+        stats["merits_pct"] = "0%"
+    
+    # Extract data with absolute values
+    lord_name = stats.get("lord_name", "Unknown")
+    merits = stats.get("merits", "+0")
+    merits_pct = stats.get("merits_pct", "0%")
+    kills = stats.get("kills_gain", "+0")
+    deaths = stats.get("deads_gain", "+0")
+    healed = stats.get("healed_gain", "+0")
+    
+    # Parse mana_spent with absolute value
+    mana_spent_str = stats.get("mana_spent") or "+0"
+    mana_clean = mana_spent_str.replace(",", "").replace("+", "")
+    mana_spent_val = abs(int(mana_clean)) if mana_clean.lstrip("-").isdigit() else 0
+    mana_spent = f"-{mana_spent_val:,}"
+    
+    # Get ranking positions as strings
+    rank_moves = rank_moves or {}
+    
+    def rank_str(stat_key):
+        if stat_key not in ranks:
+            return ""
+        arrow = rank_arrow(rank_moves.get(stat_key))
+        return f"(#{ranks[stat_key]} {arrow})" if arrow else f"(#{ranks[stat_key]})"
+    
+    power_rank_str = rank_str("power_gain")
+    merits_rank_str = rank_str("merits")
+    kills_rank_str = rank_str("kills_gain")
+    
+    # Format one-liner
+    output = f"**{lord_name}** | "
+    
+    if power:
+        power_gain_str = stats.get("power_gain", "+0")
+        output += f"⚡ {power:,} {power_gain_str} {power_rank_str} | "
+    
+    if merits and merits != "+0":
+        output += f"🏅 {merits} ({merits_pct}) {merits_rank_str} | "
+    
+    output += f"⚔️ {kills} {kills_rank_str} | "
+    output += f"💀 {deaths} | "
+    output += f"❤️ {healed} | "
+    output += f"💧 {mana_spent} | "
+    output += f"📅 {data_date}"
+    return output
+
+
 @bot.command(name="q")
 async def quick_stats(ctx, user_input: str = None):
     """Quick one-liner stats. Usage: !q (your stats) or !q truvix"""
@@ -4480,126 +7822,115 @@ async def quick_stats(ctx, user_input: str = None):
         return await ctx.send("❌ No season active.")
     
     season_id, season_name, start_date, created_at = season
-    today = date.today().isoformat()
     
     # Get account ID
     account_id = await get_account_id_from_input(ctx, user_input)
     if not account_id:
-        return await ctx.send("❌ Could not find account ID.")
+        return await ctx.send(account_not_found_message(user_input) if user_input else "❌ Could not find account ID.")
     
     try:
-        # FIRST: Try database for today
-        stats = db_get_season_progress(season_id, account_id, today)
-        
-        # If not today, try yesterday
-        if not stats:
-            yesterday = (date.today() - timedelta(days=1)).isoformat()
-            stats = db_get_season_progress(season_id, account_id, yesterday)
-        
-        # FALLBACK: Check cache
-        if not stats:
-            stats = get_cached_stats(account_id, start_date, today)
-        
-        # FALLBACK 2: Fetch from API (for unlisted people)
-        if not stats:
-            stats, _ = await fetch_stats_with_fallback(account_id, start_date, today)
+        # Newest stored stats right away, refreshed in the background if stale
+        stats, data_date, revalidation = await get_stats_swr(season_id, account_id, start_date)
         
         if not stats or stats.get("lord_name") == "Unknown":
             return await ctx.send("❌ Failed to fetch stats.")
         
         # Get power and rankings
-        power = await fetch_highest_power(account_id)
-        power_rank = await get_rankings_for_stat(ctx, "power_gain", start_date, today)
-        merits_rank = await get_rankings_for_stat(ctx, "merits", start_date, today)
-        kills_rank = await get_rankings_for_stat(ctx, "kills_gain", start_date, today)
-        
-        # Calculate merit to power ratio using highest power and merits
-        if stats.get("merits") and power:
-            try:
-                merits_str = stats["merits"].replace("+", "").replace(",", "")
-                merits_val = int(merits_str) if merits_str.isdigit() else 0
-                
-                # Calculate ratio: (Merits / Highest Power) × 100
-                if power > 0:
-                    ratio = (merits_val / power) * 100
-                    stats["merits_pct"] = f"{ratio:.1f}%"
-                else:
-                    stats["merits_pct"] = "0%"
-            except Exception as e:
-                stats["merits_pct"] = "0%"
-        else:
-            stats["merits_pct"] = "0%"
-        
-        # Extract data with absolute values
-        lord_name = stats.get("lord_name", "Unknown")
-        merits = stats.get("merits", "+0")
-        merits_pct = stats.get("merits_pct", "0%")
-        kills = stats.get("kills_gain", "+0")
-        deaths = stats.get("deads_gain", "+0")
-        healed = stats.get("healed_gain", "+0")
-        
-        # Parse mana_spent with absolute value
-        mana_spent_str = stats.get("mana_spent", "+0")
-        mana_clean = mana_spent_str.replace(",", "").replace("+", "")
-        mana_spent_val = abs(int(mana_clean)) if mana_clean.lstrip("-").isdigit() else 0
-        mana_spent = f"-{mana_spent_val:,}"
-        
-        # Get ranking positions as strings
-        power_rank_str = f"(#{power_rank[account_id][0]})" if account_id in power_rank else ""
-        merits_rank_str = f"(#{merits_rank[account_id][0]})" if account_id in merits_rank else ""
-        kills_rank_str = f"(#{kills_rank[account_id][0]})" if account_id in kills_rank else ""
-        
-        # Format one-liner
-        output = f"**{lord_name}** | "
-        
-        if power:
-            power_gain_str = stats.get("power_gain", "+0")
-            output += f"⚡ {power:,} {power_gain_str} {power_rank_str} | "
-        
-        if merits and merits != "+0":
-            output += f"🏅 {merits} ({merits_pct}) {merits_rank_str} | "
+        power, (ranks, rank_moves) = await asyncio.gather(
+            fetch_highest_power(account_id),
+            asyncio.to_thread(
+                db_get_ranks_for_account, season_id, get_tracked_account_ids(ctx.guild), account_id, QUICK_RANK_STATS
+            ),
+        )
         
-        output += f"⚔️ {kills} {kills_rank_str} | "
-        output += f"💀 {deaths} | "
-        output += f"❤️ {healed} | "
-        output += f"💧 {mana_spent}"
+        msg = await ctx.send(render_quick_stats(stats, data_date, power, ranks, rank_moves))
         
-        await ctx.send(output)
+        # Edit only if the live fetch changed the stats
+        fresh = await revalidated_stats(revalidation, stats)
+        if fresh:
+            await msg.edit(content=render_quick_stats(fresh[0], fresh[1], power, ranks, rank_moves))
     except Exception as e:
         log_error(f"Quick stats error: {e}")
         await ctx.send("❌ Error fetching stats.")
 
 
+# Stat -> label for !alliance (ALLIANCE_STATS order)
+ALLIANCE_LABELS = {
+    "merits": "🏅 Merits",
+    "kills_gain": "⚔️ Kills",
+    "deads_gain": "💀 Deaths",
+    "mana_gathered": "💧 Mana",
+}
+ALLIANCE_RECENT_DAYS = 7
+
+@bot.command(name="alliance")
+async def alliance_stats(ctx, season_name: str = None):
+    """
+    Alliance totals from the precomputed alliance_daily table (no Call of Stats requests).
+    Usage: !alliance (current season) or !alliance sos1
+    """
+    if season_name:
+        season = db_get_season_by_name(season_name)
+        if not season:
+            all_seasons = db_get_all_seasons()
+            season_list = ", ".join([s[1] for s in all_seasons]) if all_seasons else "None"
+            return await ctx.send(f"❌ Season '{season_name}' not found.\n\nAvailable seasons: {season_list}")
+    else:
+        season = db_get_current_season()
+        if not season:
+            return await ctx.send("❌ No season active. Use `/newseason` to start one.")
+    season_id, season_name_display, start_date, created_at = season
+    
+    try:
+        days, season_totals = await asyncio.gather(
+            asyncio.to_thread(db_get_alliance_daily, season_id, ALLIANCE_RECENT_DAYS + 1),
+            asyncio.to_thread(db_get_alliance_season_totals),
+        )
+    except Exception as e:
+        log_error(f"[ALLIANCE] Error: {e}")
+        return await ctx.send("❌ Error loading data. Try again later.")
+    if not days:
+        return await ctx.send(f"❌ No saved data found in {season_name_display}. Run `!loadhistory` first.")
+    
+    latest = days[0]
+    recent = days[:ALLIANCE_RECENT_DAYS]
+    output = f"```🏰 Alliance - {season_name_display} ({latest['data_date']})\n"
+    output += f"👥 Members {latest['members']} | Published {latest['lords']} | Active {latest['active']}\n\n"
+    for stat in ALLIANCE_STATS:
+        output += f"{ALLIANCE_LABELS[stat]}: {latest[stat]:,}\n"
+        change = f"   Day {latest[stat + '_delta']:+,}"
+        if len(days) > 1:
+            change += f" (prev {days[1][stat + '_delta']:+,})"
+        average = sum(day[stat + "_delta"] for day in recent) / len(recent)
+        output += f"{change} | {len(recent)}d avg {average:+,.0f}\n"
+    
+    output += f"\n📈 Last {len(recent)} days (merits | kills | active)\n"
+    for day in recent:
+        output += f"{day['data_date']}: {day['merits_delta']:+,} | {day['kills_gain_delta']:+,} | {day['active']}\n"
+    
+    # Same stats per season, as a daily average so short and long seasons compare
+    seasons = [(s, season_totals[s[0]]) for s in db_get_all_seasons() if s[0] in season_totals]
+    if len(seasons) > 1:
+        output += "\n📚 Seasons (per day: merits | kills | members)\n"
+        for (sid, name, _, _), totals in seasons:
+            span = (datetime.strptime(totals["last_date"], "%Y-%m-%d") - datetime.strptime(totals["first_date"], "%Y-%m-%d")).days or 1
+            output += f"{name}: {totals['merits'] / span:+,.0f} | {totals['kills_gain'] / span:+,.0f} | {totals['members']}\n"
+    output += "```"
+    await ctx.send(output)
+
+
 @bot.command(name="active")
 async def active_members(ctx):
-    """Show who's active (last 24h) vs inactive with days count - uses cached data"""
+    """Show who's active (since their previous snapshot) vs inactive with days count - from stored snapshots"""
     season = db_get_current_season()
     if not season:
         return await ctx.send("❌ No season active.")
     
     season_id, season_name, start_date, created_at = season
-    today = date.today().isoformat()
     
     try:
-        guild = ctx.guild
-        lords = get_all_lords_from_guild(guild)
-        
-        # Create set to track which account IDs we've already checked (prevent duplicates)
-        checked_accounts = set()
-        accounts_to_check = []
-        
-        # Add lords from guild roles
-        for lord in lords:
-            account_id = lord["account_id"]
-            if account_id not in checked_accounts:
-                checked_accounts.add(account_id)
-                accounts_to_check.append(account_id)
-        
-        # Add mapped accounts (like Havi who's not in server)
-        for discord_id, account_id in DISCORD_TO_ACCOUNT_ID.items():
-            if account_id not in checked_accounts:
-                checked_accounts.add(account_id)
-                accounts_to_check.append(account_id)
+        # Lords from guild roles + registry accounts (like Havi who's not in server)
+        accounts_to_check = get_tracked_account_ids(ctx.guild)
         
         if not accounts_to_check:
             return await ctx.send("❌ No members found.")
@@ -4607,146 +7938,27 @@ async def active_members(ctx):
         active = []
         inactive = []
         
-        for account_id in accounts_to_check:
-            try:
-                # PRIORITY 1: Try cache first (populated by forcefetch)
-                stats_today = get_cached_stats(account_id, start_date, today)
-                actual_today_date = today
-                
-                # PRIORITY 2: Try database if cache miss
-                if not stats_today:
-                    stats_today = db_get_season_progress(season_id, account_id, today)
-                    if stats_today:
-                        actual_today_date = stats_today.get("data_date", today)
-                
-                # PRIORITY 3: Try yesterday in cache
-                if not stats_today:
-                    yesterday = (date.today() - timedelta(days=1)).isoformat()
-                    stats_today = get_cached_stats(account_id, start_date, yesterday)
-                    if stats_today:
-                        actual_today_date = yesterday
-                
-                # PRIORITY 4: Try yesterday in database
-                if not stats_today:
-                    yesterday = (date.today() - timedelta(days=1)).isoformat()
-                    stats_today = db_get_season_progress(season_id, account_id, yesterday)
-                    if stats_today:
-                        actual_today_date = stats_today.get("data_date", yesterday)
-                
-                # If STILL no data, skip this account
-                if not stats_today or not isinstance(stats_today, dict):
-                    log_info(f"[ACTIVE] No stats for {account_id}, skipping")
-                    continue
-                
-                # Now safe to get lord_name
-                lord_name = stats_today.get("lord_name", account_id)
-                if stats_today.get("data_date"):
-                    actual_today_date = stats_today.get("data_date")
-                
-                log_info(f"[ACTIVE] Using {lord_name} data from {actual_today_date}")
-                
-                # Get stats from day before the actual date we got
-                day_before = (datetime.strptime(actual_today_date, "%Y-%m-%d").date() - timedelta(days=1)).isoformat()
-                
-                # Try cache first for yesterday
-                stats_yesterday = get_cached_stats(account_id, start_date, day_before)
-                if stats_yesterday:
-                    log_info(f"[ACTIVE] Found yesterday in CACHE for {account_id}: {day_before}")
-                
-                # Then try database for specific day
-                if not stats_yesterday:
-                    stats_yesterday = db_get_season_progress(season_id, account_id, day_before)
-                    if stats_yesterday:
-                        log_info(f"[ACTIVE] Found yesterday in DB for {account_id}: {day_before}")
-                
-                # If still not found, try to find LATEST data before today (handles skipped dates)
-                if not stats_yesterday:
-                    log_info(f"[ACTIVE] No yesterday data found, searching for earlier data before {actual_today_date}")
-                    try:
-                        conn = sqlite3.connect(DB_PROGRESS)
-                        c = conn.cursor()
-                        c.execute("""
-                            SELECT power_gain, merits, kills_gain, deads_gain, healed_gain,
-                                   t5_gain, t4_gain, t3_gain, t2_gain, t1_gain,
-                                   gold_spent, wood_spent, ore_spent, mana_spent,
-                                   gold_gathered, wood_gathered, ore_gathered, mana_gathered, lord_name, data_date
-                            FROM season_progress
-                            WHERE season_id=? AND account_id=? AND data_date < ?
-                            ORDER BY data_date DESC
-                            LIMIT 1
-                        """, (season_id, account_id, actual_today_date))
-                        row = c.fetchone()
-                        conn.close()
-                        
-                        if row:
-                            stats_yesterday = {
-                                "power_gain": row[0],
-                                "merits": row[1],
-                                "kills_gain": row[2],
-                                "deads_gain": row[3],
-                                "healed_gain": row[4],
-                                "t5_gain": row[5],
-                                "t4_gain": row[6],
-                                "t3_gain": row[7],
-                                "t2_gain": row[8],
-                                "t1_gain": row[9],
-                                "gold_spent": row[10],
-                                "wood_spent": row[11],
-                                "ore_spent": row[12],
-                                "mana_spent": row[13],
-                                "gold_gathered": row[14],
-                                "wood_gathered": row[15],
-                                "ore_gathered": row[16],
-                                "mana_gathered": row[17],
-                                "lord_name": row[18],
-                                "data_date": row[19]
-                            }
-                            log_info(f"[ACTIVE] Found earlier data for {account_id}: {row[19]}")
-                        else:
-                            log_info(f"[ACTIVE] ❌ No earlier data found for {account_id} before {actual_today_date}")
-                    except Exception as e:
-                        log_error(f"[ACTIVE] Error querying earlier dates: {e}")
-                
-                if not stats_yesterday or not isinstance(stats_yesterday, dict):
-                    log_info(f"[ACTIVE] Marking {lord_name} as INACTIVE (no comparison data)")
-                    inactive.append({"name": lord_name, "days": "?"})
-                    continue
-                
-                # Extract stats safely
-                def safe_parse(stat_str):
-                    """Safely parse stat strings like '+12,345' to int"""
-                    if not stat_str:
-                        return 0
-                    return int(str(stat_str).replace("+", "").replace(",", "") or 0)
-                
-                power_today = safe_parse(stats_today.get("power_gain", "0"))
-                power_yesterday = safe_parse(stats_yesterday.get("power_gain", "0"))
-                
-                merits_today = safe_parse(stats_today.get("merits", "0"))
-                merits_yesterday = safe_parse(stats_yesterday.get("merits", "0"))
-                
-                mana_today = safe_parse(stats_today.get("mana_gathered", "0"))
-                mana_yesterday = safe_parse(stats_yesterday.get("mana_gathered", "0"))
-                
-                power_gain_24h = power_today - power_yesterday
-                merits_gain_24h = merits_today - merits_yesterday
-                mana_gain_24h = mana_today - mana_yesterday
-                
-                # Active if any gain
-                if power_gain_24h > 0 or merits_gain_24h > 0 or mana_gain_24h > 0:
-                    active.append({
-                        "name": lord_name,
-                        "power": power_gain_24h,
-                        "merits": merits_gain_24h,
-                        "mana": mana_gain_24h
-                    })
-                else:
-                    inactive.append({"name": lord_name, "days": "?"})
-            except Exception as e:
-                log_error(f"Error checking activity for {account_id}: {e}")
-                import traceback
-                log_error(traceback.format_exc())
+        for row in await asyncio.to_thread(db_get_activity, season_id, accounts_to_check):
+            lord_name = row["lord_name"] or row["account_id"]
+            if row["prev_date"] is None:
+                log_info(f"[ACTIVE] Marking {lord_name} as INACTIVE (no comparison data)")
+                inactive.append({"name": lord_name, "days": None})
                 continue
+            
+            # Lords published a day late still count as current
+            as_of = datetime.strptime(row["as_of"], "%Y-%m-%d").date()
+            current = row["data_date"] >= (as_of - timedelta(days=1)).isoformat()
+            
+            # Active if any gain
+            if current and (row["power"] > 0 or row["merits"] > 0 or row["mana"] > 0):
+                active.append({
+                    "name": lord_name,
+                    "power": row["power"],
+                    "merits": row["merits"],
+                    "mana": row["mana"]
+                })
+            else:
+                inactive.append({"name": lord_name, "days": row["idle_days"]})
         
         # Sort active by power gain
         active.sort(key=lambda x: x["power"], reverse=True)
@@ -4773,7 +7985,10 @@ async def active_members(ctx):
             embed.add_field(name="✅ Active Members", value="None", inline=False)
         
         if inactive:
-            inactive_list = "\n".join([f"• {m['name']}" for m in inactive])
+            inactive.sort(key=lambda m: m["days"] if m["days"] is not None else -1, reverse=True)
+            inactive_list = "\n".join(
+                [f"• {m['name']} ({m['days']}d)" if m["days"] is not None else f"• {m['name']} (?)" for m in inactive]
+            )
             embed.add_field(name=f"⏸️ Inactive ({len(inactive)})", value=inactive_list, inline=False)
         
         await ctx.send(embed=embed)
@@ -4970,7 +8185,13 @@ async def testdm(interaction: discord.Interaction):
         ephemeral=True
     )
 
-    await dm_abyss_role(interaction.guild, embed)
+    result = await dm_abyss_role(interaction.guild, embed)
+    if result:
+        await interaction.followup.send(
+            f"✅ Delivered to {result['sent']}/{result['total']} members in {result['seconds']:.1f}s "
+            f"({result['forbidden']} DMs closed, {result['failed']} failed)",
+            ephemeral=True
+        )
 
 
 
@@ -5224,6 +8445,7 @@ class AbyssConfigView(View):
         ABYSS_DAYS = self.days
         cfg["days"] = self.days
         save_json(ABYSS_CONFIG_FILE, cfg)
+        reschedule_reminders()
         await interaction.response.send_message("Days updated ✔", ephemeral=True)
 
     async def cb_hours(self, interaction):
@@ -5232,6 +8454,7 @@ class AbyssConfigView(View):
         ABYSS_HOURS = self.hours
         cfg["hours"] = self.hours
         save_json(ABYSS_CONFIG_FILE, cfg)
+        reschedule_reminders()
         await interaction.response.send_message("Hours updated ✔", ephemeral=True)
 
     async def cb_rem(self, interaction):
@@ -5240,6 +8463,7 @@ class AbyssConfigView(View):
         REMINDER_HOURS = self.rem
         cfg["reminder_hours"] = self.rem
         save_json(ABYSS_CONFIG_FILE, cfg)
+        reschedule_reminders()
         await interaction.response.send_message("Reminder hours updated ✔", ephemeral=True)
 
     async def set_reminder_mins(self, interaction, mins):
@@ -5248,6 +8472,7 @@ class AbyssConfigView(View):
         REMINDER_MINS = mins
         cfg["reminder_mins"] = mins
         save_json(ABYSS_CONFIG_FILE, cfg)
+        reschedule_reminders()
         await interaction.response.send_message(f"Reminder set to {mins} minutes ✔", ephemeral=True)
 
     async def toggle_round2(self, interaction):
@@ -5256,6 +8481,7 @@ class AbyssConfigView(View):
         ROUND2_ENABLED = self.round2
         cfg["round2"] = self.round2
         save_json(ABYSS_CONFIG_FILE, cfg)
+        reschedule_reminders()
         await interaction.response.send_message(
             f"Round 2 {'enabled' if self.round2 else 'disabled'} ✔",
             ephemeral=True
@@ -5295,92 +8521,228 @@ async def abyssconfig(inter):
 
 
 # ============================================================
-# REMINDER LOOPS
+# REMINDER SCHEDULER
 # ============================================================
+# One task keeps a heap of upcoming reminders (Abyss + custom events) and
+# sleeps until the next one is due. The heap is rebuilt only when events or
+# the Abyss config change (reschedule_reminders) or the horizon runs out.
+# Sent reminders go into reminder_ledger so a restart never sends twice, and
+# reminders missed while offline still go out as long as the event hasn't started.
+# A send that fails is released from the ledger and retried shortly after.
+
+REMINDER_HORIZON_HOURS = 36
+REMINDER_MAX_SLEEP_SECONDS = 3600   # Re-check the clock at least this often
+REMINDER_LEDGER_KEEP_DAYS = 14
+REMINDER_RETRY_SECONDS = 60         # Backoff before retrying a failed send
+
+_reminder_rebuild = asyncio.Event()
+_reminder_task = None
+_reminder_seq = itertools.count()   # Heap tie-breaker, shared by rebuilds and retries
+
+def reschedule_reminders():
+    """Rebuild the reminder schedule (call after events or Abyss config change)"""
+    _reminder_rebuild.set()
+
+def db_claim_reminder(fire_key, fire_at):
+    """Record a reminder as sent. Returns False if it was already sent."""
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute(
+        "INSERT OR IGNORE INTO reminder_ledger (fire_key, fire_at, sent_at) VALUES (?, ?, ?)",
+        (fire_key, fire_at.isoformat(), datetime.utcnow().isoformat())
+    )
+    claimed = c.rowcount == 1
+    conn.commit()
+    conn.close()
+    return claimed
 
-@tasks.loop(minutes=1)
-async def abyss_reminder_loop():
-    try:
-        tz = pytz.timezone(MY_TIMEZONE)
-        now = datetime.now(tz)
-
-        if now.weekday() not in ABYSS_DAYS:
-            return
+def db_release_reminder(fire_key):
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    c.execute("DELETE FROM reminder_ledger WHERE fire_key=?", (fire_key,))
+    conn.commit()
+    conn.close()
 
-        # Calculate when to send: 15 minutes before actual event start
-        # Events actually start at REMINDER_HOURS + 15 minutes
-        # So send at REMINDER_HOURS + (15 - REMINDER_MINS)
-        send_minute = 15 - REMINDER_MINS
+def db_get_sent_reminders(since):
+    """Ledger keys for reminders due since `since`; prunes old entries"""
+    conn = sqlite3.connect(DB)
+    c = conn.cursor()
+    cutoff = (datetime.utcnow() - timedelta(days=REMINDER_LEDGER_KEEP_DAYS)).isoformat()
+    c.execute("DELETE FROM reminder_ledger WHERE fire_at < ?", (cutoff,))
+    c.execute("SELECT fire_key FROM reminder_ledger WHERE fire_at >= ?", (since.isoformat(),))
+    keys = {r[0] for r in c.fetchall()}
+    conn.commit()
+    conn.close()
+    return keys
 
-        # Check if it's time to send Abyss reminder
+def build_reminder_schedule(now):
+    """
+    Heap of (fire_at_utc, seq, fire_key, kind, data) for reminders up to
+    REMINDER_HORIZON_HOURS ahead. Times are naive UTC, like the events table.
+    """
+    heap = []
+    seq = _reminder_seq
+    horizon = now + timedelta(hours=REMINDER_HORIZON_HOURS)
+    events = db_get_events()
+    sent = db_get_sent_reminders(now - timedelta(days=2))
+
+    # Abyss: starts at HH:15 on ABYSS_DAYS, reminder REMINDER_MINS before
+    tz = pytz.timezone(MY_TIMEZONE)
+    local_today = datetime.now(tz).date()
+    for day_offset in range(-1, REMINDER_HORIZON_HOURS // 24 + 2):
+        day = local_today + timedelta(days=day_offset)
+        if day.weekday() not in ABYSS_DAYS:
+            continue
         for event_hour in REMINDER_HOURS:
-            
-            if now.hour == event_hour and now.minute == send_minute:
-                embed = discord.Embed(
-                    title="🕒 Abyss Reminder",
-                    description=f"Abyss starts in **{REMINDER_MINS} minutes**!",
-                    color=0xE74C3C
-                )
-                ch = bot.get_channel(channel_id)
-                if ch and ch.guild:
-                    await dm_abyss_role(ch.guild, embed)
-                else:
-                    log_info("[ABYSS REMINDER] Warning: Channel not found or no guild")
+            starts = tz.localize(datetime.combine(day, time(event_hour, 15))).astimezone(pytz.utc).replace(tzinfo=None)
+            fire_at = starts - timedelta(minutes=REMINDER_MINS)
+            if starts <= now or fire_at > horizon:
+                continue
+            rounds = [1, 2] if ROUND2_ENABLED else [1]
+            for rnd in rounds:
+                key = f"abyss:{starts.isoformat(timespec='minutes')}:r{rnd}"
+                if key not in sent:
+                    heapq.heappush(heap, (fire_at, next(seq), key, "abyss", {"round": rnd, "starts": starts}))
+
+    # Custom events: reminder `rem` minutes before, cleanup 1 hour after
+    for event_id, name, dt, rem in events:
+        dt_obj = datetime.fromisoformat(dt)
+        cleanup_at = dt_obj + timedelta(hours=1)
+        if cleanup_at <= horizon:
+            heapq.heappush(heap, (cleanup_at, next(seq), f"cleanup:{event_id}", "cleanup", {"event_id": event_id}))
+        if rem > 0 and dt_obj > now:
+            fire_at = (dt_obj - timedelta(minutes=rem)).replace(second=0, microsecond=0)
+            # Key includes time and lead so an edited event gets reminded again
+            key = f"event:{event_id}:{dt_obj.isoformat(timespec='minutes')}:{rem}"
+            if fire_at <= horizon and key not in sent:
+                heapq.heappush(heap, (fire_at, next(seq), key, "event", {"name": name, "dt": dt_obj, "rem": rem}))
+
+    # Rebuild when the horizon runs out
+    heapq.heappush(heap, (horizon - timedelta(hours=REMINDER_HORIZON_HOURS // 2), next(seq), "rebuild", "rebuild", {}))
+    return heap
+
+async def fire_abyss_reminders(fire_at, batch):
+    """
+    Send all Abyss reminders due at the same moment as one DM per member.
+    Returns the (key, data) pairs that weren't delivered.
+    """
+    claimed = [(key, data) for key, data in batch if db_claim_reminder(key, fire_at)]
+    if not claimed:
+        return []
 
-            # Round 2 reminder (same timing)
-            if ROUND2_ENABLED and now.hour == event_hour and now.minute == send_minute:
-                embed = discord.Embed(
-                    title="🕒 Abyss Reminder",
-                    description=f"Round 2 starts in **{REMINDER_MINS} minutes**!",
-                    color=0xF1C40F
-                )
-                ch = bot.get_channel(channel_id)
-                if ch and ch.guild:
-                    await dm_abyss_role(ch.guild, embed)
-                else:
-                    log_info("[ABYSS REMINDER] Warning: Channel not found or no guild")
+    minutes_left = max(1, round((claimed[0][1]["starts"] - datetime.utcnow()).total_seconds() / 60))
+    embeds = [
+        discord.Embed(
+            title="🕒 Abyss Reminder",
+            description=(
+                f"Abyss starts in **{minutes_left} minutes**!" if data["round"] == 1
+                else f"Round 2 starts in **{minutes_left} minutes**!"
+            ),
+            color=0xE74C3C if data["round"] == 1 else 0xF1C40F
+        )
+        for key, data in claimed
+    ]
+    try:
+        ch = bot.get_channel(channel_id)
+        if not ch or not ch.guild:
+            raise RuntimeError("channel not found or no guild")
+        result = await dm_abyss_role(ch.guild, embeds=embeds)
+        if result:
+            late = (datetime.utcnow() - fire_at).total_seconds()
+            log_info(f"[REMINDERS] Sent {', '.join(k for k, _ in claimed)} — done {late:.0f}s after schedule")
+        return []
     except Exception as e:
-        log_info(f"[ABYSS REMINDER ERROR] {type(e).__name__}: {e}")
+        # Not delivered - release them so the retry (or a restart) can claim them again
+        for key, _ in claimed:
+            db_release_reminder(key)
+        log_error(f"[ABYSS REMINDER] {type(e).__name__}: {e}")
+        return claimed
+
+async def fire_reminder(fire_key, fire_at, kind, data):
+    """Send one event reminder (or run a cleanup). Returns True if it wasn't delivered."""
+    if kind == "cleanup":
+        db_delete_event(data["event_id"])
+        return False
+    if not db_claim_reminder(fire_key, fire_at):
+        return False
 
-sent_custom = set()
+    minutes_left = max(1, round((data["dt"] - datetime.utcnow()).total_seconds() / 60))
 
-@tasks.loop(minutes=1)
-async def custom_event_loop():
     try:
-        now = datetime.utcnow().replace(second=0, microsecond=0)
         ch = bot.get_channel(channel_id)
         if not ch:
-            return
+            raise RuntimeError(f"channel {channel_id} not found")
+        await outbox_send(
+            ch,
+            f"<@&{EVENT_ANNOUNCEMENT_ROLE_ID}> ⏰ Reminder: **{data['name']}** in {minutes_left} minutes! "
+            f"<t:{int(data['dt'].replace(tzinfo=pytz.utc).timestamp())}:F>"
+        )
+        log_info(f"[REMINDERS] Sent {fire_key}")
+        return False
+    except Exception as e:
+        # Not delivered - release it so the retry (or a restart) can claim it again
+        db_release_reminder(fire_key)
+        log_error(f"[REMINDERS] {fire_key} failed: {type(e).__name__}: {e}")
+        return True
 
-        rows = db_get_events()
-        for ev in rows:
-            event_id, name, dt, rem = ev
-            dt_obj = datetime.fromisoformat(dt)
+def retry_reminder(heap, fire_key, kind, data, starts):
+    """Queue a failed reminder again after REMINDER_RETRY_SECONDS, unless the event starts first"""
+    retry_at = (datetime.utcnow() + timedelta(seconds=REMINDER_RETRY_SECONDS)).replace(microsecond=0)
+    if retry_at >= starts:
+        log_error(f"[REMINDERS] Giving up on {fire_key}: event starts before the next retry")
+        return
+    heapq.heappush(heap, (retry_at, next(_reminder_seq), fire_key, kind, data))
+    log_info(f"[REMINDERS] Retrying {fire_key} at {retry_at.strftime('%H:%M:%S')} UTC")
 
-            # Delete events 1 hour after they pass
-            if now >= dt_obj + timedelta(hours=1):
-                db_delete_event(event_id)
-                continue
+async def reminder_scheduler():
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        _reminder_rebuild.clear()
+        try:
+            heap = build_reminder_schedule(datetime.utcnow())
+        except Exception as e:
+            log_error(f"[REMINDERS] Schedule build failed: {type(e).__name__}: {e}")
+            heap = []
 
-            # Reminder logic (robust, restart-safe)
-            if rem > 0:
-                rtime = (dt_obj - timedelta(minutes=rem)).replace(
-                    second=0,
-                    microsecond=0
-                )
+        if heap:
+            log_info(f"[REMINDERS] {len(heap) - 1} scheduled, next {heap[0][2]} at {heap[0][0].strftime('%Y-%m-%d %H:%M')} UTC")
 
-                if now >= rtime and event_id not in sent_custom:
-                    await ch.send(
-                        f"<@&{EVENT_ANNOUNCEMENT_ROLE_ID}> ⏰ Reminder: **{name}** in {rem} minutes! "
-                        f"<t:{int(dt_obj.timestamp())}:F>"
-                    )
-                    sent_custom.add(event_id)
+        while heap:
+            fire_at, _, fire_key, kind, data = heap[0]
+            delay = (fire_at - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(_reminder_rebuild.wait(), timeout=min(delay, REMINDER_MAX_SLEEP_SECONDS))
+                    break
+                except asyncio.TimeoutError:
+                    continue
+            heapq.heappop(heap)
+            if kind == "rebuild":
+                break
+            try:
+                if kind == "abyss":
+                    # Round 1 and Round 2 fire together - one DM each, not two fan-outs
+                    batch = [(fire_key, data)]
+                    while heap and heap[0][0] == fire_at and heap[0][3] == "abyss":
+                        _, _, next_key, _, next_data = heapq.heappop(heap)
+                        batch.append((next_key, next_data))
+                    for key, failed in await fire_abyss_reminders(fire_at, batch):
+                        retry_reminder(heap, key, "abyss", failed, failed["starts"])
+                elif await fire_reminder(fire_key, fire_at, kind, data):
+                    retry_reminder(heap, fire_key, kind, data, data["dt"])
+            except Exception as e:
+                log_error(f"[REMINDERS] {type(e).__name__}: {e}")
+        else:
+            try:
+                await asyncio.wait_for(_reminder_rebuild.wait(), timeout=REMINDER_MAX_SLEEP_SECONDS)
+            except asyncio.TimeoutError:
+                pass
 
-        # Prevent memory growth
-        if len(sent_custom) > 300:
-            sent_custom.clear()
-    except Exception as e:
-        log_info(f"[CUSTOM EVENT LOOP ERROR] {type(e).__name__}: {e}")
+def start_reminder_scheduler():
+    """Start the reminder scheduler task (safe to call on every on_ready)"""
+    global _reminder_task
+    if _reminder_task is None or _reminder_task.done():
+        _reminder_task = asyncio.create_task(reminder_scheduler())
 
 
 # ============================================================
@@ -5471,7 +8833,7 @@ async def cmd_servertop(message, n):
     try:
         timeout = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
         async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, allow_redirects=True) as resp:
+            async with cos_slot(), session.get(url, allow_redirects=True) as resp:
                 if resp.status != 200:
                     await message.channel.send(f"❌ Failed to fetch rankings (HTTP {resp.status})")
                     return
@@ -5536,19 +8898,21 @@ async def cmd_servertop(message, n):
     if len(full_msg) <= 2000:
         await message.channel.send(full_msg)
     else:
-        # Send title + header separately, then chunk the data rows
-        await message.channel.send(f"{title}\n```\n{col_header}\n{separator}```")
+        # Title + header, then the data rows in code-block chunks; the outbox
+        # packs these into as few messages as fit
+        parts = [f"{title}\n```\n{col_header}\n{separator}```"]
         chunk_lines = []
         chunk_len = 0
         for line in table_lines[2:]:  # skip header+separator already sent
             if chunk_len + len(line) + 1 > 1800:
-                await message.channel.send("```\n" + "\n".join(chunk_lines) + "\n```")
+                parts.append("```\n" + "\n".join(chunk_lines) + "\n```")
                 chunk_lines = []
                 chunk_len = 0
             chunk_lines.append(line)
             chunk_len += len(line) + 1
         if chunk_lines:
-            await message.channel.send("```\n" + "\n".join(chunk_lines) + "\n```")
+            parts.append("```\n" + "\n".join(chunk_lines) + "\n```")
+        await outbox_send(message.channel, *parts)
 
     log_info(f"[SERVERTOP] Displayed top {n} servers")
 
@@ -5562,7 +8926,7 @@ async def cmd_servercheck(message, server_num):
     try:
         timeout = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
         async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, allow_redirects=True) as resp:
+            async with cos_slot(), session.get(url, allow_redirects=True) as resp:
                 if resp.status != 200:
                     await message.channel.send(f"❌ Failed to fetch rankings (HTTP {resp.status})")
                     return
@@ -5647,7 +9011,7 @@ async def kvk_fetch_zones(zone_map, num_zones):
         session = await get_callofstats_session()
         if not session:
             return None, "No authenticated session."
-        async with session.get(url, allow_redirects=True) as resp:
+        async with cos_slot(), session.get(url, allow_redirects=True) as resp:
             if resp.status != 200:
                 return None, f"HTTP {resp.status}"
             html = await resp.text()
@@ -5708,6 +9072,17 @@ async def kvk_fetch_zones(zone_map, num_zones):
     return zones, None
 
 
+KVK_FETCH_TIMEOUT = 180  # Seconds a KvK session waits for its fetch job
+
+
+@job_handler("kvk_fetch")
+async def run_kvk_fetch_job(payload):
+    # JSON turns the zone numbers into strings
+    zone_map = {int(z): servers for z, servers in payload["zone_map"].items()}
+    zones, error = await kvk_fetch_zones(zone_map, payload["num_zones"])
+    return {"zones": zones, "error": error}
+
+
 def kvk_zone_block(z):
     lines = [
         f"Zone {z['zone_num']} \u2014 S{z['servers']} ({z['acronyms']}) \u2014 {z['date']}",
@@ -5805,7 +9180,12 @@ async def kvk_session_handle(message, session):
         zone_map = session["zone_map"]
         zone_display = "  ".join(f"Z{k}:S{','.join(v)}" for k, v in sorted(zone_map.items()))
         msg = await message.channel.send(f"📡 Fetching KvK data for {zone_display}...")
-        zones_data, error = await kvk_fetch_zones(zone_map, num_zones)
+        job_id = db_enqueue_job("kvk_fetch", {"zone_map": zone_map, "num_zones": num_zones}, max_attempts=2)
+        status, result = await wait_for_job(job_id, timeout=KVK_FETCH_TIMEOUT)
+        if status == "done" and result:
+            zones_data, error = result.get("zones"), result.get("error")
+        else:
+            zones_data, error = None, f"fetch job #{job_id} {status}"
         if error or not zones_data:
             del kvk_sessions[message.channel.id]
             await msg.edit(content=f"❌ Failed to fetch KvK data: {error or 'No zones parsed'}")
@@ -5813,10 +9193,10 @@ async def kvk_session_handle(message, session):
         session["zones_data"] = zones_data
         session["step"] = "teams"
         await msg.edit(content=f"✅ Fetched data for {len(zones_data)} zones:")
-        for z_data in zones_data:
-            await message.channel.send(kvk_zone_block(z_data))
         zone_nums = " ".join(str(i+1) for i in range(len(zones_data)))
-        await message.channel.send(
+        await outbox_send(
+            message.channel,
+            *(kvk_zone_block(z_data) for z_data in zones_data),
             f"**Team Assignment** — You have zones: {zone_nums}\n"
             f"Which zones go to **Team 1**? Enter zone numbers separated by commas (e.g. `1,2`).\n"
             f"Remaining zones auto-assigned to Team 2. Type `skip` to skip."
@@ -5837,17 +9217,17 @@ async def kvk_session_handle(message, session):
             return True
         team2_zones = [i+1 for i in range(num_zones) if (i+1) not in team1_zones]
 
-        await message.channel.send("⚔️ **KvK Team Comparison**")
-        await message.channel.send(kvk_team_block("Team 1", team1_zones, zones_data))
+        parts = ["⚔️ **KvK Team Comparison**", kvk_team_block("Team 1", team1_zones, zones_data)]
         if team2_zones:
-            await message.channel.send(kvk_team_block("Team 2", team2_zones, zones_data))
+            parts.append(kvk_team_block("Team 2", team2_zones, zones_data))
 
         t1 = sum(zones_data[i-1]["power"] for i in team1_zones if 0 < i <= len(zones_data))
         t2 = sum(zones_data[i-1]["power"] for i in team2_zones if 0 < i <= len(zones_data)) if team2_zones else 0
         if t2 > 0:
             diff = abs(t1 - t2)
             stronger = "Team 1" if t1 > t2 else "Team 2"
-            await message.channel.send(f"📊 **Power Gap:** {kvk_fmt(diff)} — **{stronger}** has more power.")
+            parts.append(f"📊 **Power Gap:** {kvk_fmt(diff)} — **{stronger}** has more power.")
+        await outbox_send(message.channel, *parts)
 
         def build_totals(zone_indices):
             keys = ["power","merits","hero_power","kills","deads","healed","mana",
@@ -5923,11 +9303,11 @@ async def cmd_matchup_view(message, matchup_id):
         await message.channel.send(f"❌ No matchup found with ID #{matchup_id}.")
         return
 
-    await message.channel.send(f"⚔️ **#{m['id']} — {m['nickname']}** _(saved {m['created_at']})_")
+    parts = [f"⚔️ **#{m['id']} — {m['nickname']}** _(saved {m['created_at']})_"]
 
     # Show each zone
     for z in m["zones_data"]:
-        await message.channel.send(kvk_zone_block(z))
+        parts.append(kvk_zone_block(z))
 
     # Show team totals
     def totals_block(label, t):
@@ -5947,14 +9327,15 @@ async def cmd_matchup_view(message, matchup_id):
         ]
         return f"\u2694\ufe0f **{label}**\n" + "```\n" + "\n".join(lines) + "\n```"
 
-    await message.channel.send(totals_block("Team 1", m["team1_totals"]))
+    parts.append(totals_block("Team 1", m["team1_totals"]))
     if m["team2_totals"]["players"] > 0:
-        await message.channel.send(totals_block("Team 2", m["team2_totals"]))
+        parts.append(totals_block("Team 2", m["team2_totals"]))
         t1p = m["team1_totals"]["power"]
         t2p = m["team2_totals"]["power"]
         diff = abs(t1p - t2p)
         stronger = "Team 1" if t1p > t2p else "Team 2"
-        await message.channel.send(f"📊 **Power Gap:** {kvk_fmt(diff)} — **{stronger}** has more power.")
+        parts.append(f"📊 **Power Gap:** {kvk_fmt(diff)} — **{stronger}** has more power.")
+    await outbox_send(message.channel, *parts)
 
 
 async def cmd_matchup_delete(message, matchup_id):
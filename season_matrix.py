@@ -0,0 +1,199 @@
+"""
+Columnar lords × data dates × stats store for season analytics.
+
+bot.py keeps one SeasonMatrix for the current season (when NumPy is
+installed) and answers rankings, window gains and forecasts from it with
+array operations instead of per-lord loops. Values are the cumulative
+season-to-date integers from the daily_deltas table.
+"""
+
+import numpy as np
+
+
+class SeasonMatrix:
+    """
+    values[lord, date, stat] holds a lord's cumulative stat on a data date,
+    present[lord, date] whether the lord has a snapshot that day. Lords and
+    dates are appended as they show up; dates stay sorted.
+    """
+
+    def __init__(self, season_id, stats):
+        self.season_id = season_id
+        self.stats = list(stats)
+        self.stat_index = {stat: i for i, stat in enumerate(self.stats)}
+        self.accounts = []
+        self.account_index = {}
+        self.names = []
+        self.dates = []
+        self.values = np.zeros((0, 0, len(self.stats)), dtype=np.int64)
+        self.present = np.zeros((0, 0), dtype=bool)
+        self.version = 0      # Bumped on every change, so results can be cached per data epoch
+        self._last_seen = None
+
+    # ---------- Loading ----------
+
+    def copy(self):
+        """Independent copy to update while readers keep using this one"""
+        other = SeasonMatrix(self.season_id, self.stats)
+        other.accounts = list(self.accounts)
+        other.account_index = dict(self.account_index)
+        other.names = list(self.names)
+        other.dates = list(self.dates)
+        other.values = self.values.copy()
+        other.present = self.present.copy()
+        other.version = self.version
+        return other
+
+    def upsert(self, rows):
+        """
+        Store snapshots given as (account_id, lord_name, data_date, *stat values)
+        in self.stats order. Unknown lords and dates grow the arrays.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+        new_accounts = [a for a in dict.fromkeys(row[0] for row in rows) if a not in self.account_index]
+        new_dates = set(row[2] for row in rows).difference(self.dates)
+        if new_accounts or new_dates:
+            self._grow(new_accounts, new_dates)
+
+        date_index = {d: i for i, d in enumerate(self.dates)}
+        lord_rows = np.fromiter((self.account_index[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+        date_cols = np.fromiter((date_index[row[2]] for row in rows), dtype=np.intp, count=len(rows))
+        self.values[lord_rows, date_cols] = np.array([row[3:] for row in rows], dtype=np.int64)
+        self.present[lord_rows, date_cols] = True
+        for row in rows:
+            self.names[self.account_index[row[0]]] = row[1] or row[0]
+        self._last_seen = None
+        self.version += 1
+        return len(rows)
+
+    def _grow(self, new_accounts, new_dates):
+        dates = sorted(set(self.dates).union(new_dates))
+        lords = len(self.accounts) + len(new_accounts)
+        values = np.zeros((lords, len(dates), len(self.stats)), dtype=np.int64)
+        present = np.zeros((lords, len(dates)), dtype=bool)
+        if self.dates and self.accounts:
+            old_cols = np.searchsorted(np.array(dates), np.array(self.dates))
+            values[:len(self.accounts), old_cols] = self.values
+            present[:len(self.accounts), old_cols] = self.present
+        for account_id in new_accounts:
+            self.account_index[account_id] = len(self.accounts)
+            self.accounts.append(account_id)
+            self.names.append(account_id)
+        self.dates = dates
+        self.values = values
+        self.present = present
+
+    # ---------- Building blocks ----------
+
+    @property
+    def day_numbers(self):
+        """Data dates as day numbers (for calendar-day windows and fits)"""
+        return np.array(self.dates, dtype="datetime64[D]").astype(np.int64)
+
+    def last_seen(self):
+        """[lord, date] -> column of the lord's latest snapshot on or before that date (-1 if none)"""
+        if self._last_seen is None:
+            cols = np.where(self.present, np.arange(len(self.dates)), -1)
+            self._last_seen = np.maximum.accumulate(cols, axis=1) if cols.size else cols
+        return self._last_seen
+
+    def rows_for(self, accounts=None):
+        """Row numbers of the given accounts (all lords when None); unknown accounts are skipped"""
+        if accounts is None:
+            return np.arange(len(self.accounts))
+        return np.array([self.account_index[a] for a in accounts if a in self.account_index], dtype=np.intp)
+
+    def column(self, stat, absolute=False):
+        values = self.values[:, :, self.stat_index[stat]]
+        return np.abs(values) if absolute else values
+
+    # ---------- Vectorized analytics ----------
+
+    def latest(self, stat, rows=None, absolute=False):
+        """Each lord's value at their latest snapshot: (values, latest column, has_data)"""
+        rows = self.rows_for() if rows is None else rows
+        if not self.dates or not len(rows):
+            return np.zeros(len(rows), dtype=np.int64), np.full(len(rows), -1), np.zeros(len(rows), dtype=bool)
+        cols = self.last_seen()[rows, -1]
+        has = cols >= 0
+        values = self.column(stat, absolute)[rows, np.maximum(cols, 0)]
+        return np.where(has, values, 0), cols, has
+
+    def ranks(self, stat, accounts=None, absolute=False):
+        """Rank lords by their latest value (highest first): {account_id: (rank, total)}"""
+        rows = self.rows_for(accounts)
+        values, _, has = self.latest(stat, rows, absolute)
+        rows, values = rows[has], values[has]
+        order = np.argsort(-values, kind="stable")
+        total = len(order)
+        return {self.accounts[rows[i]]: (rank + 1, total) for rank, i in enumerate(order)}
+
+    def _window_base(self, stat, days, rows, absolute=False):
+        """
+        Base of a `days`-day window ending on the season's latest data date:
+        each lord's latest snapshot on or before its start. (base columns,
+        base values); the column is -1 when the lord has no snapshot that old.
+        """
+        day_numbers = self.day_numbers
+        target = np.searchsorted(day_numbers, day_numbers[-1] - days, side="right") - 1
+        if target < 0:
+            return np.full(len(rows), -1), np.zeros(len(rows), dtype=np.int64)
+        base_cols = self.last_seen()[rows, target]
+        base = np.where(base_cols >= 0, self.column(stat, absolute)[rows, np.maximum(base_cols, 0)], 0)
+        return base_cols, base
+
+    def window_gains(self, stat, days, accounts=None, absolute=False, from_start=False):
+        """
+        Gain over the last `days` days up to the season's latest data date:
+        each lord's latest value minus their value at the window start. Lords
+        without a snapshot inside the window are left out, and so are lords
+        without one on or before its start - unless from_start (the window
+        reaches back past the season start), when their season-to-date value
+        is their gain. Returns (rows, gains, latest columns, base columns);
+        base column is -1 for those season-to-date gains.
+        """
+        rows = self.rows_for(accounts)
+        values, cols, has = self.latest(stat, rows, absolute)
+        if not has.any():
+            return rows[has], values[has], cols[has], cols[has]
+        day_numbers = self.day_numbers
+        current = has & (day_numbers[np.maximum(cols, 0)] > day_numbers[-1] - days)
+        rows, values, cols = rows[current], values[current], cols[current]
+        base_cols, base = self._window_base(stat, days, rows, absolute)
+        if not from_start:
+            full = base_cols >= 0
+            rows, values, cols, base_cols, base = rows[full], values[full], cols[full], base_cols[full], base[full]
+        return rows, values - base, cols, base_cols
+
+    def trends(self, stat, recent_days=7, accounts=None):
+        """
+        Growth per day of every lord, fitted two ways: the least-squares slope
+        over all their snapshots and the average rate over the last
+        `recent_days` days of the season. Returns (rows, latest values, latest
+        columns, slopes, recent rates); a rate is NaN when there's too little
+        history (or, for the recent rate, no snapshot in that window).
+        """
+        rows = self.rows_for(accounts)
+        latest, cols, has = self.latest(stat, rows)
+        rows, latest, cols = rows[has], latest[has], cols[has]
+        if not len(rows):
+            empty = np.zeros(0)
+            return rows, empty, empty, empty, empty
+
+        day_numbers = self.day_numbers
+        x = (day_numbers - day_numbers[0]).astype(float)
+        y = self.column(stat)[rows].astype(float)
+        w = self.present[rows].astype(float)
+        n = w.sum(axis=1)
+        sx, sy = (w * x).sum(axis=1), (w * y).sum(axis=1)
+        sxx, sxy = (w * x * x).sum(axis=1), (w * x * y).sum(axis=1)
+        denom = n * sxx - sx * sx
+        base_cols, base = self._window_base(stat, recent_days, rows)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = np.where(denom > 0, (n * sxy - sx * sy) / denom, np.nan)
+            span = day_numbers[cols] - day_numbers[np.maximum(base_cols, 0)]
+            recent = np.where((base_cols >= 0) & (span > 0), (latest - base) / span, np.nan)
+
+        return rows, latest, cols, slopes, recent
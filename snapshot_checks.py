@@ -0,0 +1,179 @@
+"""
+Anomaly checks for Call of Stats snapshots before bot.py stores them.
+
+A snapshot is compared with the account's stored neighbours in daily_deltas:
+season-to-date stats must not shrink (nor exceed the next stored snapshot), a
+lord can't drop to all zeros, and a loss in a stat that can legitimately fall
+(power) must stay within ANOMALY_Z standard deviations of the lord's usual
+daily change. The running mean/variance of each lord's daily change per stat
+is kept Welford-style in delta_moments, so a check is a few key lookups.
+
+Upward spikes aren't flagged when they arrive - battle days dwarf normal ones.
+A spike is only recognised once the next snapshot falls back in line with the
+one before it: then the spike is the bad row, not everything after it.
+"""
+
+import math
+from datetime import datetime
+
+# stat -> whether its season-to-date value only grows (by absolute value: RSS spent is stored negative)
+ANOMALY_STATS = {
+    "power_gain": False,
+    "merits": True,
+    "kills_gain": True,
+    "deads_gain": True,
+    "healed_gain": True,
+    "mana_gathered": True,
+    "mana_spent": True,
+}
+ANOMALY_Z = 4.0
+ANOMALY_MIN_SAMPLES = 5        # Daily changes seen before the deviation checks apply
+
+NO_MOMENTS = (0, 0.0, 0.0, "")
+
+
+def stat_int(value):
+    """Stored stat string like '+12,345' -> int (0 when missing)"""
+    text = str(value or "0").replace(",", "").replace("+", "")
+    return int(text) if text.lstrip("-").isdigit() else 0
+
+
+def _days(start, end):
+    return max((datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days, 1)
+
+
+def _std(n, m2):
+    return max(math.sqrt(m2 / (n - 1)), 1.0)
+
+
+def _add_rate(moments, rate, data_date):
+    n, mean, m2, _ = moments
+    n += 1
+    delta = rate - mean
+    mean += delta / n
+    m2 += delta * (rate - mean)
+    return n, mean, m2, data_date
+
+
+def _remove_rate(moments, rate, last_date):
+    """Undo _add_rate for the most recently added rate"""
+    n, mean, m2, _ = moments
+    if n <= 1:
+        return 0, 0.0, 0.0, last_date
+    before = (n * mean - rate) / (n - 1)
+    return n - 1, before, max(m2 - (rate - before) * (rate - mean), 0.0), last_date
+
+
+def _compare(previous, prev_date, values, data_date, moments):
+    """({stat: reason} for values that can't follow `previous`, {stat: per-day change})"""
+    days = _days(prev_date, data_date)
+    reasons, rates = {}, {}
+    for stat, grows in ANOMALY_STATS.items():
+        old, new = previous[stat], values[stat]
+        if grows and abs(new) < abs(old):
+            reasons[stat] = f"{stat} fell {abs(old):,} → {abs(new):,}"
+            continue
+        rate = (new - old) / days
+        n, mean, m2, _ = moments.get(stat, NO_MOMENTS)
+        if not grows and rate < 0 and n >= ANOMALY_MIN_SAMPLES:
+            std = _std(n, m2)
+            if (mean - rate) / std > ANOMALY_Z:
+                reasons[stat] = f"{stat} {new - old:+,} (usually {mean:+,.0f} ± {std:,.0f}/day)"
+                continue
+        rates[stat] = rate
+    return reasons, rates
+
+
+def _unusual_jump(base, base_date, spike, spike_date, stats, moments):
+    """Whether spike rose past the lord's usual spread in one of stats (True without enough history to tell)"""
+    days = _days(base_date, spike_date)
+    judged = False
+    for stat in stats:
+        n, mean, m2, _ = moments.get(stat, NO_MOMENTS)
+        if n < ANOMALY_MIN_SAMPLES:
+            continue
+        judged = True
+        if abs((spike[stat] - base[stat]) / days - mean) / _std(n, m2) > ANOMALY_Z:
+            return True
+    return not judged
+
+
+def check_snapshot(c, season_id, account_id, stats, data_date):
+    """
+    Check a snapshot against the account's stored ones (on cursor c).
+    Returns (reasons, spike): the reasons the snapshot looks wrong, and - when
+    it instead shows that the previous stored snapshot was a spike it undoes -
+    (data_date, reasons) of that spike for the caller to quarantine. When the
+    snapshot is accepted its per-day changes go into delta_moments, only for
+    snapshots newer than any seen, so re-saves and backfills don't count twice.
+    """
+    stat_names = list(ANOMALY_STATS)
+    columns = ", ".join(stat_names)
+    values = {stat: stat_int(stats.get(stat)) for stat in stat_names}
+
+    c.execute(f"""
+        SELECT data_date, {columns} FROM daily_deltas
+        WHERE season_id = ? AND account_id = ? AND data_date > ?
+        ORDER BY data_date LIMIT 1
+    """, (season_id, account_id, data_date))
+    following = c.fetchone()
+    reasons = []
+    if following:
+        after = dict(zip(stat_names, following[1:]))
+        reasons = [
+            f"{stat} {abs(values[stat]):,} is above {abs(after[stat]):,} on {following[0]}"
+            for stat, grows in ANOMALY_STATS.items() if grows and abs(values[stat]) > abs(after[stat])
+        ]
+
+    c.execute(f"""
+        SELECT data_date, {columns} FROM daily_deltas
+        WHERE season_id = ? AND account_id = ? AND data_date < ?
+        ORDER BY data_date DESC LIMIT 2
+    """, (season_id, account_id, data_date))
+    earlier = [(row[0], dict(zip(stat_names, row[1:]))) for row in c.fetchall()]
+    if not earlier:
+        return reasons, None
+    prev_date, previous = earlier[0]
+    if not any(values.values()) and any(previous.values()):
+        return [f"all stats dropped to zero (had data on {prev_date})"], None
+
+    c.execute(
+        "SELECT stat, n, mean, m2, last_date FROM delta_moments WHERE season_id = ? AND account_id = ?",
+        (season_id, account_id)
+    )
+    loaded = {row[0]: tuple(row[1:]) for row in c.fetchall()}
+    moments = dict(loaded)
+    found, rates = _compare(previous, prev_date, values, data_date, moments)
+
+    spike = None
+    if found and not reasons and len(earlier) > 1:
+        # Fell back in line with the snapshot before the previous one: the previous one was the outlier
+        base_date, base = earlier[1]
+        spike_days = _days(base_date, prev_date)
+        without = {
+            stat: _remove_rate(m, (previous[stat] - base[stat]) / spike_days, base_date) if m[3] == prev_date else m
+            for stat, m in moments.items()
+        }
+        undone, undone_rates = _compare(base, base_date, values, data_date, without)
+        if not undone and values != base and _unusual_jump(base, base_date, previous, prev_date, found, without):
+            spike = (prev_date, [
+                f"{stat} jumped {abs(base[stat]):,} → {abs(previous[stat]):,}, then {abs(values[stat]):,} on {data_date}"
+                for stat in found
+            ])
+            found, rates, moments = {}, undone_rates, without
+
+    reasons += found.values()
+    if reasons:
+        return reasons, None
+
+    for stat, rate in rates.items():
+        if data_date > moments.get(stat, NO_MOMENTS)[3]:
+            moments[stat] = _add_rate(moments.get(stat, NO_MOMENTS), rate, data_date)
+    for stat, (n, mean, m2, last_date) in moments.items():
+        if moments[stat] != loaded.get(stat):
+            c.execute(
+                "INSERT OR REPLACE INTO delta_moments (season_id, account_id, stat, n, mean, m2, last_date) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (season_id, account_id, stat, n, mean, m2, last_date)
+            )
+    return [], spike
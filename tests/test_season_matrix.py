@@ -0,0 +1,96 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from season_matrix import SeasonMatrix
+
+STATS = ["merits", "mana_spent"]
+
+
+def matrix(rows):
+    m = SeasonMatrix(1, STATS)
+    m.upsert(rows)
+    return m
+
+
+def value(m, account_id, data_date, stat="merits"):
+    return int(m.values[m.account_index[account_id], m.dates.index(data_date), m.stat_index[stat]])
+
+
+def test_upsert_grows_lords_and_keeps_dates_sorted():
+    m = matrix([("a", "A", "2026-03-02", 200, -20), ("b", "B", "2026-03-04", 400, -40)])
+    m.upsert([("c", "C", "2026-03-03", 300, -30), ("a", "A", "2026-03-01", 100, -10)])
+
+    assert m.accounts == ["a", "b", "c"]
+    assert m.dates == ["2026-03-01", "2026-03-02", "2026-03-03", "2026-03-04"]
+    assert m.values.shape == (3, 4, 2)
+    # Values already stored moved with their dates
+    assert value(m, "a", "2026-03-02") == 200
+    assert value(m, "b", "2026-03-04", "mana_spent") == -40
+    assert value(m, "a", "2026-03-01") == 100
+    assert m.present.tolist() == [
+        [True, True, False, False],
+        [False, False, False, True],
+        [False, False, True, False],
+    ]
+
+
+def test_upsert_overwrites_and_bumps_version():
+    m = matrix([("a", None, "2026-03-01", 100, 0)])
+    version = m.version
+    m.upsert([("a", "Alice", "2026-03-01", 150, 0)])
+
+    assert value(m, "a", "2026-03-01") == 150
+    assert m.names == ["Alice"]
+    assert m.version == version + 1
+    assert m.upsert([]) == 0 and m.version == version + 1
+
+
+def test_last_seen_carries_the_latest_snapshot_forward():
+    m = matrix([
+        ("a", "A", "2026-03-01", 100, 0),
+        ("a", "A", "2026-03-03", 300, 0),
+        ("b", "B", "2026-03-02", 50, 0),
+        ("b", "B", "2026-03-04", 70, 0),
+    ])
+
+    assert m.last_seen().tolist() == [[0, 0, 2, 2], [-1, 1, 1, 3]]
+    values, cols, has = m.latest("merits")
+    assert values.tolist() == [300, 70] and cols.tolist() == [2, 3] and has.all()
+
+    # The cached carry-forward is dropped when new snapshots arrive
+    m.upsert([("a", "A", "2026-03-04", 400, 0)])
+    assert m.last_seen()[0].tolist() == [0, 0, 2, 3]
+
+
+def test_ranks_by_absolute_value():
+    m = matrix([("a", "A", "2026-03-01", 0, -500), ("b", "B", "2026-03-01", 0, -9000)])
+
+    assert m.ranks("mana_spent", absolute=True) == {"b": (1, 2), "a": (2, 2)}
+    assert m.ranks("mana_spent") == {"a": (1, 2), "b": (2, 2)}
+
+
+def test_window_gains_need_a_snapshot_at_both_ends():
+    m = matrix([
+        ("a", "A", "2026-03-01", 100, 0), ("a", "A", "2026-03-10", 900, 0),
+        ("late", "Late", "2026-03-08", 5000, 0), ("late", "Late", "2026-03-10", 5100, 0),
+        ("stale", "Stale", "2026-03-01", 100, 0),
+    ])
+
+    rows, gains, cols, base_cols = m.window_gains("merits", 7)
+    assert [m.accounts[r] for r in rows] == ["a"]
+    assert gains.tolist() == [800] and base_cols.tolist() == [0]
+
+    rows, gains, _, base_cols = m.window_gains("merits", 7, from_start=True)
+    assert dict(zip((m.accounts[r] for r in rows), gains.tolist())) == {"a": 800, "late": 5100}
+    assert base_cols.tolist() == [0, -1]
+
+
+def test_copy_is_independent():
+    m = matrix([("a", "A", "2026-03-01", 100, 0)])
+    other = m.copy()
+    other.upsert([("a", "A", "2026-03-01", 999, 0), ("b", "B", "2026-03-02", 1, 0)])
+
+    assert m.accounts == ["a"] and m.dates == ["2026-03-01"]
+    assert value(m, "a", "2026-03-01") == 100
+    assert value(other, "a", "2026-03-01") == 999
@@ -0,0 +1,102 @@
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from snapshot_checks import ANOMALY_STATS, check_snapshot, stat_int
+
+SEASON, ACCOUNT = 1, "1001"
+
+
+@pytest.fixture
+def c():
+    conn = sqlite3.connect(":memory:")
+    c = conn.cursor()
+    c.execute(f"""
+        CREATE TABLE daily_deltas (
+            season_id INTEGER, account_id TEXT, data_date TEXT,
+            {", ".join(f"{stat} INTEGER NOT NULL DEFAULT 0" for stat in ANOMALY_STATS)},
+            PRIMARY KEY (season_id, account_id, data_date)
+        )
+    """)
+    c.execute("""
+        CREATE TABLE delta_moments (
+            season_id INTEGER, account_id TEXT, stat TEXT, n INTEGER, mean REAL, m2 REAL, last_date TEXT,
+            PRIMARY KEY (season_id, account_id, stat)
+        )
+    """)
+    yield c
+    conn.close()
+
+
+def day(n):
+    return (date(2026, 3, 1) + timedelta(days=n)).isoformat()
+
+
+def save(c, data_date, merits, **stats):
+    """Store a snapshot the way db_save_season_progress does: (stored, spike)"""
+    stats = {"power_gain": "1,000,000", "merits": f"{merits:,}", **stats}
+    reasons, spike = check_snapshot(c, SEASON, ACCOUNT, stats, data_date)
+    if reasons:
+        return False, None
+    if spike:
+        c.execute("DELETE FROM daily_deltas WHERE data_date = ?", (spike[0],))
+    c.execute(
+        f"INSERT OR REPLACE INTO daily_deltas (season_id, account_id, data_date, {', '.join(ANOMALY_STATS)}) "
+        f"VALUES (?, ?, ?, {', '.join('?' * len(ANOMALY_STATS))})",
+        (SEASON, ACCOUNT, data_date, *(stat_int(stats.get(stat)) for stat in ANOMALY_STATS))
+    )
+    return True, spike
+
+
+def stored(c):
+    c.execute("SELECT data_date, merits FROM daily_deltas ORDER BY data_date")
+    return c.fetchall()
+
+
+def test_undone_spike_is_quarantined_instead_of_later_snapshots(c):
+    results = [save(c, day(i), merits) for i, merits in enumerate([100, 200, 300, 3_000_000, 400, 500, 600])]
+
+    assert all(ok for ok, _ in results)
+    spike_date, reasons = results[4][1]
+    assert spike_date == day(3)
+    assert "merits" in reasons[0]
+    assert stored(c) == [(day(i), m) for i, m in [(0, 100), (1, 200), (2, 300), (4, 400), (5, 500), (6, 600)]]
+
+
+def test_drop_below_both_previous_snapshots_is_still_flagged(c):
+    for i, merits in enumerate([100, 200, 300]):
+        save(c, day(i), merits)
+
+    assert save(c, day(3), 150) == (False, None)
+    assert stored(c)[-1] == (day(2), 300)
+
+
+def test_repeat_of_the_snapshot_before_a_jump_is_not_an_undo(c):
+    for i, merits in enumerate([100, 200, 300, 5_000]):
+        save(c, day(i), merits)
+
+    assert save(c, day(4), 300) == (False, None)
+
+
+def test_jump_within_the_usual_spread_is_kept(c):
+    for i, merits in enumerate([0, 1_000, 3_000, 4_000, 7_000, 8_000, 10_000, 12_000]):
+        assert save(c, day(i), merits)[0]
+
+    assert save(c, day(8), 11_000) == (False, None)
+    assert stored(c)[-1] == (day(7), 12_000)
+
+
+def test_backfilled_snapshot_above_the_next_one_is_flagged(c):
+    save(c, day(0), 100)
+    save(c, day(2), 300)
+
+    assert save(c, day(1), 3_000_000) == (False, None)
+    assert save(c, day(1), 200) == (True, None)
+
+
+def test_spending_more_is_not_a_loss(c):
+    for i in range(8):
+        assert save(c, day(i), 100 * (i + 1), mana_spent=f"-{1_000 * i:,}")[0]
+
+    assert save(c, day(8), 900, mana_spent="-500,000") == (True, None)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK: season_matrix vs the per-lord Python loops
+Builds a synthetic season (500 lords × 120 days by default) and times
+rankings and 7-day window gains both ways.
+
+Usage: python tools/bench_season_matrix.py [lords] [days]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from season_matrix import SeasonMatrix
+
+STATS = ["power_gain", "merits", "kills_gain", "deads_gain", "healed_gain",
+         "t5_gain", "t4_gain", "t3_gain", "t2_gain", "t1_gain",
+         "gold_spent", "wood_spent", "ore_spent", "mana_spent",
+         "gold_gathered", "wood_gathered", "ore_gathered", "mana_gathered",
+         "infantry_merits", "cavalry_merits", "mage_merits", "marksman_merits", "other_merits",
+         "t45_healed", "t45_dead"]
+
+def parse_stat(s):
+    """Mirror of the string parsing the bot does on stored snapshots"""
+    if not s:
+        return 0
+    val_str = str(s).replace("+", "").replace(",", "")
+    return int(val_str) if val_str.lstrip("-").isdigit() else 0
+
+def make_season(lords, days):
+    """Snapshots as the bot stores them: {account_id: {date: {stat: '+1,234'}}} plus matrix rows"""
+    random.seed(7)
+    start = date(2026, 1, 1)
+    snapshots, rows = {}, []
+    for n in range(lords):
+        account_id = str(10000000 + n)
+        totals = [0] * len(STATS)
+        snapshots[account_id] = {}
+        for d in range(days):
+            if random.random() < 0.05:
+                continue  # missed publish for this lord
+            totals = [t + random.randint(0, 50000) for t in totals]
+            data_date = (start + timedelta(days=d)).isoformat()
+            snapshots[account_id][data_date] = {s: f"+{t:,}" for s, t in zip(STATS, totals)}
+            rows.append((account_id, f"Lord{n}", data_date, *totals))
+    return snapshots, rows
+
+def timed(label, fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<28} {best * 1000:9.2f} ms")
+    return best, result
+
+# ---------- Per-lord loops (how the commands worked before) ----------
+
+def loop_ranks(snapshots, stat):
+    values = []
+    for account_id, by_date in snapshots.items():
+        latest = by_date[max(by_date)]
+        values.append({"account_id": account_id, "value": parse_stat(latest.get(stat))})
+    values.sort(key=lambda x: x["value"], reverse=True)
+    return {v["account_id"]: (i + 1, len(values)) for i, v in enumerate(values)}
+
+def loop_window_gains(snapshots, stat, days):
+    gains = {}
+    season_latest = max(max(by_date) for by_date in snapshots.values())
+    cutoff = (date.fromisoformat(season_latest) - timedelta(days=days)).isoformat()
+    for account_id, by_date in snapshots.items():
+        dates = sorted(by_date)
+        latest = dates[-1]
+        if latest <= cutoff:
+            continue
+        older = [d for d in dates if d <= cutoff]
+        if not older:
+            continue
+        gains[account_id] = parse_stat(by_date[latest].get(stat)) - parse_stat(by_date[older[-1]].get(stat))
+    return gains
+
+def main():
+    lords = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    print(f"Building synthetic season: {lords} lords × {days} days × {len(STATS)} stats")
+    snapshots, rows = make_season(lords, days)
+
+    print("\nSeasonMatrix")
+    matrix = SeasonMatrix(1, STATS)
+    load_time, _ = timed("full load", lambda: SeasonMatrix(1, STATS).upsert(rows), repeat=1)
+    matrix.upsert(rows)
+    last_day = max(r[2] for r in rows)
+    incremental = [r for r in rows if r[2] == last_day]
+    timed("incremental (1 day)", lambda: matrix.upsert(incremental))
+    m_rank, ranks_m = timed("ranks (merits)", lambda: matrix.ranks("merits"))
+    m_gain, gains_m = timed("window gains (merits, 7d)", lambda: matrix.window_gains("merits", 7))
+
+    print("\nPer-lord Python loops")
+    l_rank, ranks_l = timed("ranks (merits)", lambda: loop_ranks(snapshots, "merits"))
+    l_gain, gains_l = timed("window gains (merits, 7d)", lambda: loop_window_gains(snapshots, "merits", 7))
+
+    # Same answers both ways
+    assert {a: r[0] for a, r in ranks_m.items()} == {a: r[0] for a, r in ranks_l.items()}
+    rows_m, g_m, _, _ = gains_m
+    assert {matrix.accounts[r]: int(g) for r, g in zip(rows_m, g_m)} == gains_l
+
+    print("\nSpeedup")
+    print(f"  ranks          {l_rank / m_rank:6.1f}x")
+    print(f"  window gains   {l_gain / m_gain:6.1f}x")
+
+if __name__ == "__main__":
+    main()